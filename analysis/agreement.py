@@ -0,0 +1,287 @@
+"""
+Inter-annotator agreement for the RQ2/RQ4 labelling rounds: Cohen's kappa (pairwise),
+Fleiss' kappa, Krippendorff's alpha (nominal), confusion matrices and per-class agreement for
+any number of annotator columns, with bootstrap confidence intervals, plus the disagreement
+workbook (replaces `calculate_kappa_and_highlight_disagreements` of RQ2.ipynb and RQ4.ipynb).
+
+Labels are factorized once into an (items, annotators) code matrix; every statistic is then a
+bincount or matrix product over it, and bootstrap replicates reuse those per-item terms with
+multinomial weights (as in `analysis.pac_stats.bootstrap_percent_ci`).
+"""
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class LabelCodes:
+    """
+    Labels of `columns` as integer codes into `categories`; -1 marks a missing label
+    (only when `encode_labels(..., missing=None)`).
+    """
+    codes: np.ndarray
+    categories: List[str]
+    columns: List[str]
+
+    @property
+    def k(self) -> int:
+        return len(self.categories)
+
+
+def encode_labels(df: pd.DataFrame, columns: Sequence[str], missing: Optional[str] = "missing",
+                  normalize: bool = False) -> LabelCodes:
+    """
+    Factorize annotator columns over one shared category list.
+
+    :param missing: Label that replaces NaN (the RQ4 notebook used "missing"), or None to keep
+                    NaN as missing data (skipped by kappa pairs, allowed by alpha).
+    :param normalize: Compare labels case-insensitively with surrounding whitespace stripped.
+    """
+    columns = list(columns)
+    values = df[columns]
+    if missing is not None:
+        values = values.fillna(missing)
+    flat = pd.Series(values.to_numpy(dtype=object).ravel())
+    text = flat.astype(str).str.strip().str.lower() if normalize else flat.astype(str)
+    text = text.where(flat.notna(), None)
+    codes, categories = pd.factorize(text.to_numpy(), sort=True, use_na_sentinel=True)
+    return LabelCodes(codes.reshape(len(df), len(columns)), [str(c) for c in categories], columns)
+
+
+def confusion_matrix(a: np.ndarray, b: np.ndarray, k: int) -> np.ndarray:
+    """ (k, k) counts of (a, b) code pairs; pairs with a missing code are skipped. """
+    keep = (a >= 0) & (b >= 0)
+    return np.bincount(a[keep] * k + b[keep], minlength=k * k).reshape(k, k)
+
+
+def _kappa_from_confusion(cm: np.ndarray) -> np.ndarray:
+    """ Cohen's kappa of one (k, k) or a stack of (..., k, k) confusion matrices. """
+    cm = np.asarray(cm, dtype=np.float64)
+    n = cm.sum(axis=(-2, -1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        po = np.trace(cm, axis1=-2, axis2=-1) / n
+        pe = (cm.sum(axis=-1) * cm.sum(axis=-2)).sum(axis=-1) / n ** 2
+        kappa = (po - pe) / (1 - pe)
+    return np.where(pe == 1, np.where(po == 1, 1.0, 0.0), kappa)
+
+
+def cohen_kappa(a: np.ndarray, b: np.ndarray, k: int) -> float:
+    """ Cohen's kappa of two code vectors (same value as sklearn's `cohen_kappa_score`). """
+    return float(_kappa_from_confusion(confusion_matrix(a, b, k)))
+
+
+def _unit_counts(codes: np.ndarray, k: int) -> np.ndarray:
+    """ (items, k) number of annotators giving each category, missing labels ignored. """
+    n, r = codes.shape
+    rows = np.repeat(np.arange(n), r)
+    flat = codes.ravel()
+    keep = flat >= 0
+    return np.bincount(rows[keep] * k + flat[keep], minlength=n * k).reshape(n, k)
+
+
+def _alpha_terms(counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-item terms of nominal Krippendorff's alpha, zero for items with fewer than two labels:
+    pairable values m_u, the trace of the item's coincidence matrix
+    sum_c n_uc (n_uc - 1) / (m_u - 1), and its per-category value counts.
+    """
+    m = counts.sum(axis=1)
+    pairable = m >= 2
+    scale = np.where(pairable, 1.0 / np.maximum(m - 1, 1), 0.0)
+    agree = (counts * (counts - 1)).sum(axis=1) * scale
+    totals = counts * pairable[:, None]
+    return np.where(pairable, m, 0), agree, totals
+
+
+def _alpha_from_sums(n_values, agree, totals) -> np.ndarray:
+    """ alpha = 1 - (n - 1) (n - sum_c o_cc) / (n^2 - sum_c n_c^2), broadcast over replicates. """
+    n = np.asarray(n_values, dtype=np.float64)
+    expected = n ** 2 - (np.asarray(totals, dtype=np.float64) ** 2).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alpha = 1 - (n - 1) * (n - agree) / expected
+    return np.where(expected == 0, np.nan, alpha)
+
+
+def krippendorff_alpha(codes: np.ndarray, k: int) -> float:
+    """ Nominal Krippendorff's alpha over an (items, annotators) code matrix; -1 = missing. """
+    m, agree, totals = _alpha_terms(_unit_counts(codes, k))
+    return float(_alpha_from_sums(m.sum(), agree.sum(), totals.sum(axis=0)))
+
+
+def fleiss_kappa(codes: np.ndarray, k: int) -> float:
+    """ Fleiss' kappa; items with a missing label are left out (it needs a fixed rater count). """
+    complete = (codes >= 0).all(axis=1)
+    counts = _unit_counts(codes[complete], k).astype(np.float64)
+    n, r = counts.shape[0], codes.shape[1]
+    if n == 0 or r < 2:
+        return float("nan")
+    p_bar = ((counts * (counts - 1)).sum(axis=1) / (r * (r - 1))).mean()
+    p_e = ((counts.sum(axis=0) / (n * r)) ** 2).sum()
+    return float((p_bar - p_e) / (1 - p_e)) if p_e < 1 else 1.0
+
+
+def per_class_agreement(codes: np.ndarray, categories: Sequence[str]) -> pd.DataFrame:
+    """
+    Specific agreement per category: the share of annotator pairs involving the category in
+    which both chose it, sum_u n_uc (n_uc - 1) / sum_u n_uc (m_u - 1). For two annotators
+    this is 2 n_cc / (row_c + col_c).
+    """
+    counts = _unit_counts(codes, len(categories)).astype(np.float64)
+    m = counts.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        specific = (counts * (counts - 1)).sum(axis=0) / (counts * (m - 1)).sum(axis=0)
+    return pd.DataFrame({"labels": counts.sum(axis=0).astype(np.int64), "specific_agreement": specific},
+                        index=pd.Index(list(categories), name="category"))
+
+
+def _bootstrap_weights(n: int, n_boot: int, seed: int, chunk: int = 250) -> Iterator[np.ndarray]:
+    """ Multinomial item weights, `chunk` replicates at a time (resampling items with replacement). """
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_boot, chunk):
+        yield rng.multinomial(n, np.full(n, 1.0 / n), size=min(chunk, n_boot - start))
+
+
+def _weighted_cell_counts(weights: np.ndarray, cells: np.ndarray, size: int) -> np.ndarray:
+    """ Per replicate (row of `weights`), the weighted count of each cell id in 0..size-1. """
+    offsets = np.arange(len(weights))[:, None] * size
+    return np.bincount((offsets + cells).ravel(), weights=weights.ravel(),
+                       minlength=len(weights) * size).reshape(len(weights), size)
+
+
+def _interval(replicates: np.ndarray, alpha: float) -> Tuple[float, float]:
+    replicates = replicates[~np.isnan(replicates)]
+    if len(replicates) == 0:
+        return float("nan"), float("nan")
+    lower, upper = np.percentile(replicates, [alpha / 2 * 100, (1 - alpha / 2) * 100])
+    return float(lower), float(upper)
+
+
+def agreement_report(df: pd.DataFrame, columns: Sequence[str], missing: Optional[str] = "missing",
+                     normalize: bool = False, n_boot: int = 1000, ci: float = 0.95,
+                     seed: int = 0) -> Dict[str, object]:
+    """
+    Every agreement statistic for `columns` in one pass over the code matrix.
+
+    Returns a dict with:
+    - "summary" (pd.DataFrame): one row per statistic (percent agreement, Fleiss' kappa,
+      Krippendorff's alpha and Cohen's kappa per annotator pair) with estimate and bootstrap
+      `lower`/`upper` bounds at `ci`.
+    - "per_class" (pd.DataFrame): `per_class_agreement`.
+    - "confusion" (Dict[Tuple[str, str], pd.DataFrame]): confusion matrix per annotator pair.
+    - "categories" (List[str]) and "n_items" (int).
+    """
+    labels = encode_labels(df, columns, missing, normalize)
+    codes, k = labels.codes, labels.k
+    n = len(codes)
+    alpha_level = 1 - ci
+    pairs = list(combinations(range(len(labels.columns)), 2))
+
+    # Per-item terms shared by the point estimates and the bootstrap replicates.
+    pair_cells = []
+    for i, j in pairs:
+        valid = (codes[:, i] >= 0) & (codes[:, j] >= 0)
+        cells = np.where(valid, codes[:, i] * k + codes[:, j], k * k)  # k*k = "no pair" bucket
+        pair_cells.append(cells)
+    m, agree, totals = _alpha_terms(_unit_counts(codes, k))
+    complete = (codes >= 0).all(axis=1)
+    all_agree = complete & (codes == codes[:, :1]).all(axis=1)
+
+    rows = []
+    estimates = {
+        "percent_agreement": all_agree[complete].mean() * 100 if complete.any() else np.nan,
+        "fleiss_kappa": fleiss_kappa(codes, k),
+        "krippendorff_alpha": float(_alpha_from_sums(m.sum(), agree.sum(), totals.sum(axis=0))),
+    }
+    confusion = {}
+    for (i, j), cells in zip(pairs, pair_cells):
+        cm = np.bincount(cells, minlength=k * k + 1)[:k * k].reshape(k, k)
+        name = (labels.columns[i], labels.columns[j])
+        confusion[name] = pd.DataFrame(cm, index=labels.categories, columns=labels.categories)
+        estimates[f"cohen_kappa[{name[0]} | {name[1]}]"] = float(_kappa_from_confusion(cm))
+
+    replicates: Dict[str, List[np.ndarray]] = {name: [] for name in estimates}
+    if n_boot and n:
+        counts = _unit_counts(codes, k).astype(np.float64)
+        r = codes.shape[1]
+        for weights in _bootstrap_weights(n, n_boot, seed):
+            w = weights.astype(np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                replicates["percent_agreement"].append((w @ all_agree) / (w @ complete) * 100)
+                wc = w * complete
+                p_bar = (wc @ ((counts * (counts - 1)).sum(axis=1) / max(r * (r - 1), 1))) / wc.sum(axis=1)
+                p_j = (wc @ counts) / (wc.sum(axis=1) * r)[:, None]
+                p_e = (p_j ** 2).sum(axis=1)
+                replicates["fleiss_kappa"].append((p_bar - p_e) / (1 - p_e))
+            replicates["krippendorff_alpha"].append(_alpha_from_sums(w @ m, w @ agree, w @ totals))
+            for (i, j), cells in zip(pairs, pair_cells):
+                name = f"cohen_kappa[{labels.columns[i]} | {labels.columns[j]}]"
+                cms = _weighted_cell_counts(w, cells, k * k + 1)[:, :k * k].reshape(-1, k, k)
+                replicates[name].append(_kappa_from_confusion(cms))
+
+    for name, estimate in estimates.items():
+        lower, upper = _interval(np.concatenate(replicates[name]), alpha_level) if replicates[name] else (np.nan, np.nan)
+        rows.append({"statistic": name, "estimate": estimate, "lower": lower, "upper": upper})
+    return {
+        "summary": pd.DataFrame(rows).set_index("statistic"),
+        "per_class": per_class_agreement(codes, labels.categories),
+        "confusion": confusion,
+        "categories": labels.categories,
+        "n_items": n,
+    }
+
+
+def disagreement_mask(df: pd.DataFrame, columns: Sequence[str], missing: Optional[str] = "missing",
+                      normalize: bool = False) -> pd.Series:
+    """ True where the annotators of a row did not all give the same label. """
+    codes = encode_labels(df, columns, missing, normalize).codes
+    return pd.Series(~(codes == codes[:, :1]).all(axis=1), index=df.index)
+
+
+def write_disagreements(df: pd.DataFrame, columns: Sequence[str], output_file: str,
+                        sheet_name: str = 'Kappa Results', missing: Optional[str] = "missing",
+                        normalize: bool = False, color: str = 'FF0000') -> pd.DataFrame:
+    """
+    Save `df` with a `Disagreement` column to Excel and highlight disagreeing rows with one
+    conditional-format rule over the data range (Excel evaluates it; no per-cell fills).
+
+    :return: The frame that was written (with `Disagreement`).
+    """
+    from openpyxl.formatting.rule import FormulaRule
+    from openpyxl.styles import PatternFill
+    from openpyxl.utils import get_column_letter
+
+    out = df.copy()
+    out['Disagreement'] = disagreement_mask(df, columns, missing, normalize).to_numpy()
+    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+        out.to_excel(writer, index=False, sheet_name=sheet_name)
+        sheet = writer.book[sheet_name]
+        flag = get_column_letter(out.columns.get_loc('Disagreement') + 1)
+        last_row = len(out) + 1
+        if last_row > 1:
+            cells = f"A2:{get_column_letter(len(out.columns))}{last_row}"
+            fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
+            sheet.conditional_formatting.add(cells, FormulaRule(formula=[f"${flag}2=TRUE"], fill=fill))
+    return out
+
+
+def calculate_kappa_and_highlight_disagreements(df: pd.DataFrame, column1: str, column2: str, output_file: str) -> float:
+    """
+    Calculate the Cohen's Kappa score for the agreement between two label columns,
+    highlight the disagreement rows, and save the results to an Excel file.
+
+    Parameters:
+    - df (pd.DataFrame): The input DataFrame (gets a 'Disagreement' column, as before).
+    - column1 (str): The name of the first label column (e.g., 'Label_Patrick').
+    - column2 (str): The name of the second label column (e.g., 'Label_Leuson').
+    - output_file (str): The file path to save the resulting DataFrame with highlighted rows.
+
+    Returns:
+    - kappa_score (float): The Cohen's Kappa score (NaN labels count as the label "missing").
+    """
+    labels = encode_labels(df, [column1, column2])
+    written = write_disagreements(df, [column1, column2], output_file)
+    df['Disagreement'] = written['Disagreement'].to_numpy()
+    return cohen_kappa(labels.codes[:, 0], labels.codes[:, 1], labels.k)
@@ -0,0 +1,249 @@
+"""
+Combine the per-tool taxonomy workbooks of an annotator (`<pac>_results_full_<who>.xlsx`) into
+one table with a `pac` column (replaces `combine_pac_excels` of RQ4.ipynb).
+
+Workbooks are parsed with openpyxl's read-only streaming reader (in a process pool for large
+batches), and each parsed sheet is cached as Parquet under a name that includes the file's
+mtime and size. Re-combining after one annotator file was edited therefore parses only that file.
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import pandas as pd
+
+from config.constant import PATH_FILE
+from util import metrics
+from util.log import configure_logger
+
+logger = configure_logger('github-data_logger', 'logging_file.log')
+
+RESULTS_PATTERN = "*_results_full*.xlsx"
+# Workbook bytes to parse below which a process pool costs more than it saves (~3 MB/s per core).
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+_PAC_NAME = re.compile(r"^(.*?)_results", flags=re.IGNORECASE)
+# Cell texts `pd.read_excel` reads as missing by default (its `na_values` defaults).
+NA_STRINGS = frozenset(["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+                        "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"])
+
+# Parquet metadata key listing the columns `_to_parquet` stored as pickled cells.
+_PICKLED_KEY = b"combine_results.pickled_columns"
+
+SheetName = Union[str, int, None]
+
+
+def pac_name(path: Union[str, Path]) -> str:
+    """ Tool name of a results workbook: the part of the file name before '_results' ('aws_config'). """
+    stem = Path(path).stem
+    match = _PAC_NAME.match(stem)
+    return (match.group(1) if match else stem).strip()
+
+
+def _column_names(header: Tuple) -> List[str]:
+    """ Header cells as pandas would name them: 'Unnamed: i' for blanks, '.1' suffixes for repeats. """
+    names, seen = [], {}
+    for i, cell in enumerate(header):
+        name = f"Unnamed: {i}" if cell is None else str(cell)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _sheet_frame(rows) -> pd.DataFrame:
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    names = _column_names(header)
+    records = [[None if isinstance(value, str) and value in NA_STRINGS else value for value in row[:len(names)]]
+               for row in rows if any(value is not None for value in row)]
+    return pd.DataFrame.from_records(records, columns=names)
+
+
+def read_workbook(path: Union[str, Path], sheet_name: SheetName = 0) -> pd.DataFrame:
+    """
+    One sheet (by position or name), or every sheet concatenated when `sheet_name` is None,
+    streamed row by row with `openpyxl.load_workbook(read_only=True)`. The first row is the
+    header, fully empty rows are skipped and NA_STRINGS become missing, as with `pd.read_excel`.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if sheet_name is None:
+            sheets = workbook.worksheets
+        elif isinstance(sheet_name, int):
+            sheets = [workbook.worksheets[sheet_name]]
+        else:
+            sheets = [workbook[sheet_name]]
+        frames = [_sheet_frame(sheet.iter_rows(values_only=True)) for sheet in sheets]
+    finally:
+        workbook.close()
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def _cache_path(path: Path, sheet_name: SheetName, cache_dir: str) -> str:
+    """ Cache file of the current version of `path`: '<digest of path and sheet>-<mtime_ns>-<size>.parquet'. """
+    stat = path.stat()
+    digest = hashlib.sha1(f"{path.resolve()}|{sheet_name!r}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{digest}-{stat.st_mtime_ns}-{stat.st_size}.parquet")
+
+
+def _to_parquet(frame: pd.DataFrame, target: str) -> None:
+    """
+    Atomic Parquet write. Object columns that Arrow cannot type (mixed int/str cells) are stored
+    as pickled cells and listed in the file metadata, so `_read_cache` restores them unchanged.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tmp = f"{target}.tmp{os.getpid()}"
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        pickled = []
+    except (TypeError, ValueError):  # pyarrow.ArrowTypeError / ArrowInvalid subclass these
+        pickled = [c for c in frame.columns if frame[c].dtype == object and _arrow_fails(frame[c])]
+        table = pa.Table.from_pandas(frame.assign(**{c: frame[c].map(pickle.dumps) for c in pickled}),
+                                     preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), _PICKLED_KEY: json.dumps(pickled).encode("utf-8")}
+    pq.write_table(table.replace_schema_metadata(metadata), tmp, compression="zstd")
+    os.replace(tmp, target)
+
+
+def _arrow_fails(column: pd.Series) -> bool:
+    import pyarrow as pa
+
+    try:
+        pa.array(column, from_pandas=True)
+        return False
+    except (TypeError, ValueError):
+        return True
+
+
+def _read_cache(target: str) -> pd.DataFrame:
+    """ A frame written by `_to_parquet`, with its pickled columns decoded. """
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(target)
+    frame = table.to_pandas()
+    for column in json.loads((table.schema.metadata or {}).get(_PICKLED_KEY, b"[]")):
+        frame[column] = frame[column].map(pickle.loads).astype(object)
+    return frame
+
+
+def _parse(job: Tuple[str, SheetName, Optional[str]]) -> pd.DataFrame:
+    """ Parse one workbook and, with a cache target, store it there and drop its older versions. """
+    path, sheet_name, target = job
+    frame = read_workbook(path, sheet_name)
+    if target is not None:
+        _to_parquet(frame, target)
+        cache_dir, name = os.path.split(target)
+        prefix = name.split("-", 1)[0] + "-"
+        for stale in os.listdir(cache_dir):
+            if stale.startswith(prefix) and stale.endswith(".parquet") and stale != name:
+                os.remove(os.path.join(cache_dir, stale))
+    return frame
+
+
+def workbook_paths(input_dir: Union[str, Path], pattern: str = RESULTS_PATTERN) -> List[Path]:
+    """ Workbooks in `input_dir` matching `pattern`, sorted, without Excel's '~$' lock files. """
+    return sorted(p for p in Path(input_dir).glob(pattern) if not p.name.startswith("~$"))
+
+
+def combine_pac_excels(input_dir: Union[str, Path], output_path: Union[str, Path, None] = "combined_pac_results.xlsx",
+                       sheet_name: SheetName = 0, pattern: str = RESULTS_PATTERN, workers: int = 4,
+                       cache_dir: Optional[str] = PATH_FILE['workbook_cache']) -> pd.DataFrame:
+    """
+    Read every results workbook in `input_dir`, add a 'pac' column derived from the file name
+    and optionally write the combined table.
+
+    Parameters
+    ----------
+    input_dir : str | Path
+        Folder containing the Excel files (e.g., r'sampled_policies\\Taxonomy_foalem').
+    output_path : str | Path | None
+        Where to write the combined table (.xlsx, .csv or .parquet), or None to only return it.
+    sheet_name : str | int | None
+        Sheet to read from each workbook (default first sheet); None concatenates all sheets
+        of a file before adding 'pac'.
+    pattern : str
+        File name glob; the notebook's combined outputs (all_pac_taxonomy_*.xlsx) do not match
+        the default, so they are not read back in.
+    workers : int
+        Worker processes parsing workbooks. The pool is only used when the workbooks to parse
+        total at least PARALLEL_MIN_BYTES and more than one CPU is available; smaller batches
+        are parsed in-process, which is faster than starting the pool.
+    cache_dir : str | None
+        Parquet cache of parsed workbooks, keyed by path, sheet, mtime and size; None disables it.
+
+    Returns
+    -------
+    pd.DataFrame
+        The combined dataframe, 'pac' first, in file name order.
+    """
+    input_dir = Path(input_dir)
+    paths = workbook_paths(input_dir, pattern)
+    if not paths:
+        raise FileNotFoundError(f"No files matching {pattern} found in: {input_dir}")
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    targets = [_cache_path(path, sheet_name, cache_dir) if cache_dir else None for path in paths]
+    frames: List[Optional[pd.DataFrame]] = [None] * len(paths)
+    with metrics.stage_timer("combine_read"):
+        for i, target in enumerate(targets):
+            if target is not None and os.path.exists(target):
+                frames[i] = _read_cache(target)
+        misses = [i for i, frame in enumerate(frames) if frame is None]
+        jobs = [(str(paths[i]), sheet_name, targets[i]) for i in misses]
+        workers = min(workers, len(jobs), os.cpu_count() or 1)
+        if workers > 1 and sum(paths[i].stat().st_size for i in misses) >= PARALLEL_MIN_BYTES:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parsed = list(pool.map(_parse, jobs))
+        else:
+            parsed = [_parse(job) for job in jobs]
+        for i, frame in zip(misses, parsed):
+            frames[i] = frame
+    metrics.incr("workbooks_cached", len(paths) - len(misses))
+    metrics.incr("workbooks_parsed", len(misses))
+    logger.info(f"Combined {len(paths)} workbooks from {input_dir} ({len(paths) - len(misses)} from cache)")
+
+    frames = [frame.assign(pac=pac_name(path))[["pac"] + [c for c in frame.columns if c != "pac"]]
+              for path, frame in zip(paths, frames)]
+    combined = pd.concat(frames, ignore_index=True)
+
+    if output_path is not None:
+        output_path = str(output_path)
+        if output_path.endswith(".parquet"):
+            combined.to_parquet(output_path, index=False)
+        elif output_path.endswith(".csv"):
+            combined.to_csv(output_path, index=False)
+        else:
+            combined.to_excel(output_path, index=False, engine="openpyxl")
+    return combined
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Combine per-tool taxonomy result workbooks into one table.')
+    parser.add_argument('input_dir')
+    parser.add_argument('--output', default='combined_pac_results.xlsx', help='.xlsx, .csv or .parquet')
+    parser.add_argument('--pattern', default=RESULTS_PATTERN)
+    parser.add_argument('--sheet', default=None, help='Sheet name (default: the first sheet).')
+    parser.add_argument('--all-sheets', action='store_true', help='Concatenate every sheet of each workbook.')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    sheet = None if args.all_sheets else (args.sheet if args.sheet is not None else 0)
+    combined = combine_pac_excels(args.input_dir, args.output, sheet, args.pattern, args.workers,
+                                  None if args.no_cache else PATH_FILE['workbook_cache'])
+    print(combined.groupby("pac").size().to_string())
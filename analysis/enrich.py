@@ -0,0 +1,90 @@
+""" Join PaC usage counts with repository metadata and READMEs on `full_name`. """
+from typing import List, Optional, Union
+
+import pandas as pd
+from pandas.errors import MergeError
+
+from util.log import configure_logger
+
+logger = configure_logger('github-data_logger', 'logging_file.log')
+
+
+def dedupe(frame: pd.DataFrame, on: str = "full_name", keep: Union[str, bool] = "first") -> pd.DataFrame:
+    """
+    Apply the duplicate-key policy to a right-hand frame before joining.
+
+    :param keep: "first" or "last" keeps one row per key; False keeps every row, so a
+                 duplicated key then fails `validate="one_to_one"` in the join.
+    """
+    if keep is False:
+        return frame
+    duplicated = frame.duplicated(subset=on, keep=keep)
+    if duplicated.any():
+        logger.info(f"Dropping {int(duplicated.sum())} duplicate '{on}' rows (keep={keep!r})")
+        frame = frame[~duplicated]
+    return frame
+
+
+_RIGHT_UNIQUE = {"one_to_one", "1:1", "many_to_one", "m:1"}
+_LEFT_UNIQUE = {"one_to_one", "1:1", "one_to_many", "1:m"}
+
+
+def left_join(left: pd.DataFrame, right: pd.DataFrame, on: str = "full_name",
+              validate: Optional[str] = "one_to_one") -> pd.DataFrame:
+    """
+    Indexed left join where `right` wins on shared columns, keeping `left`'s rows and column order.
+
+    Shared columns take the value from `right` (NaN where the key has no match), matching the
+    row-by-row update the RQ1 notebook did; new columns from `right` are appended. When the
+    right keys are unique the join is a single `reindex` on the key index; otherwise it falls
+    back to `merge` (one left row per matching right row).
+
+    :param validate: "one_to_one", "many_to_one", "one_to_many" (or the "1:1" forms) raise
+                     `pandas.errors.MergeError` when the corresponding side has duplicate keys;
+                     None skips the check.
+    """
+    indexed = right.set_index(on)
+    if validate in _RIGHT_UNIQUE and not indexed.index.is_unique:
+        raise MergeError(f"Merge keys are not unique in right dataset; not a {validate} merge")
+    if validate in _LEFT_UNIQUE and not left[on].is_unique:
+        raise MergeError(f"Merge keys are not unique in left dataset; not a {validate} merge")
+
+    shared = [c for c in indexed.columns if c in left.columns]
+    order = list(left.columns) + [c for c in indexed.columns if c not in left.columns]
+    if not indexed.index.is_unique:
+        return left.drop(columns=shared).merge(right, on=on, how="left", sort=False)[order]
+    looked_up = indexed.reindex(left[on].to_numpy()).set_axis(left.index)
+    return pd.concat([left.drop(columns=shared), looked_up], axis=1)[order]
+
+
+def enrich_usage_with_metadata(
+    df_usage: pd.DataFrame,
+    df_meta: pd.DataFrame,
+    df_readmes: Optional[pd.DataFrame] = None,
+    on: str = "full_name",
+    keep: Union[str, bool] = "first",
+    validate: Optional[str] = "one_to_one"
+) -> pd.DataFrame:
+    """
+    Enriches df_usage with metadata (and optionally README content) matched on `on`.
+
+    Replaces the `iterrows` loop of RQ1.ipynb with vectorized left joins: duplicates in the
+    right-hand frames are resolved by `keep`, and each join is validated so a silent
+    fan-out (one usage row becoming several) raises `pandas.errors.MergeError` instead.
+
+    Parameters:
+    - df_usage (pd.DataFrame): PaC usage data with a 'full_name' column (one row per repository).
+    - df_meta (pd.DataFrame): Repository metadata, must include 'full_name'.
+    - df_readmes (pd.DataFrame): Optional README frame ('full_name', 'readme_content', ...).
+    - on (str): Join key.
+    - keep (str | bool): Duplicate policy for the right-hand frames ("first", "last" or False).
+    - validate (str): pandas merge validation, "one_to_one" by default.
+
+    Returns:
+    - pd.DataFrame: df_usage rows in their original order with metadata/README columns added.
+    """
+    frames: List[pd.DataFrame] = [df_meta] if df_readmes is None else [df_meta, df_readmes]
+    enriched = df_usage
+    for frame in frames:
+        enriched = left_join(enriched, dedupe(frame, on, keep), on, validate)
+    return enriched
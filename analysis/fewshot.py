@@ -0,0 +1,348 @@
+"""
+Local embedding cache and exact top-k index for few-shot example selection (replaces the
+`SemanticSimilarityExampleSelector` + `OpenAIEmbeddings` + Chroma setup of
+llm_as_judge_RQ2-Copy1.ipynb, which re-embedded every training example on every run).
+
+Embeddings are cached in SQLite by (backend, text hash), so only new example texts are ever
+embedded; the index is a normalized NumPy matrix saved next to the example table, and
+selecting examples for a whole test set is one matrix product plus a partial sort.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import requests
+
+from config.constant import LLM_CONFIG
+from util.log import configure_logger
+
+logger = configure_logger('github-data_logger', 'logging_file.log')
+
+# Prompt pieces of the RQ2 few-shot classifier (llm_as_judge_RQ2-Copy1.ipynb).
+RQ2_PREFIX = """You are an expert in software engineering and OSS analysis. Your task is to classify open-source projects into one of the following predefined categories based on their purpose, description, and README content.
+
+The categories are:
+
+DevOps: Projects that leverage infrastructure and operations tools (e.g., Kubernetes, Ansible, Docker) to automate the provisioning, deployment, and governance of software applications.
+
+Toolkit: Standalone libraries, frameworks, APIs, plugins, or modules that offer reusable functionalities or components to simplify software development.
+
+MLOps: These projects combine AI/ML models with DevOps tools and practices to automate the ML lifecycle, including model training, deployment, monitoring, and governance.
+
+Documentation: Projects that primarily serve as documentation, tutorials, workshops, demo or basic projects example, use case project.
+
+AI/Research: Academic or experimental projects involving AI/ML models or techniques.
+
+Application System: These are software projects or programs. They may include web applications or traditional systems without AI/ML components.
+
+Each example below contains the project’s metadata and its correct category label. Learn from these examples to classify the next project.
+"""
+RQ2_SUFFIX = """---
+Project Name: {full_name}
+Topics: {topics}
+Description: {description}
+Readme Snippet: {readme_snippet}
+Label:
+Rationale:"""
+EXAMPLE_TEMPLATE = "{input}\nLabel: {output}"
+EXAMPLE_SEPARATOR = "\n\n"
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def format_example(row) -> Dict[str, str]:
+    """ Same as the notebook's `format_example`: the project block as "input", the label as "output". """
+    return {
+        "input": f"""---
+Project Name: {row['full_name']}
+Topics: {row['topics']}
+Description: {row['description']}
+Readme Snippet: {row['readme_content']}
+""",
+        "output": row['Label'],
+    }
+
+
+class Embedder(ABC):
+    """
+    Embedding backend. `name` identifies the backend and its settings in the cache, `embed`
+    maps texts to raw vectors, and `fit` may return per-dimension weights computed from the
+    example matrix (applied to examples and queries alike before normalisation).
+    """
+    name = "embedder"
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """ Raw vectors for `texts`, one row per text. """
+
+    def fit(self, vectors: np.ndarray) -> Optional[np.ndarray]:
+        return None
+
+
+class HashedTfidfEmbedder(Embedder):
+    """
+    Offline backend: word uni/bigrams hashed (crc32) into `dim` buckets with sublinear term
+    frequency; `fit` supplies smoothed IDF weights from the examples.
+    """
+
+    def __init__(self, dim: int = 4096, ngrams: int = 2):
+        self.dim = dim
+        self.ngrams = ngrams
+        self.name = f"hashed-tfidf-{dim}-{ngrams}"
+
+    def _bucket_counts(self, text: str) -> Counter:
+        words = _TOKEN.findall(text.lower())
+        grams = list(words)
+        for n in range(2, self.ngrams + 1):
+            grams.extend(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+        return Counter(zlib.crc32(g.encode("utf-8")) % self.dim for g in grams)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = self._bucket_counts(text)
+            if counts:
+                buckets = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+                values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+                matrix[row, buckets] = 1.0 + np.log(values)
+        return matrix
+
+    def fit(self, vectors: np.ndarray) -> np.ndarray:
+        df = np.count_nonzero(vectors, axis=0)
+        return (np.log((1 + len(vectors)) / (1 + df)) + 1).astype(np.float32)
+
+
+class OpenAIEmbedder(Embedder):
+    """ Any OpenAI-compatible `/embeddings` endpoint (the notebook used OpenAIEmbeddings). """
+
+    def __init__(self, model: str = LLM_CONFIG['embedding_model'], base_url: str = LLM_CONFIG['base_url'],
+                 api_key: Optional[str] = None, batch_size: int = 256, timeout: float = LLM_CONFIG['timeout']):
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key if api_key is not None else (LLM_CONFIG['api_key'] or os.environ.get("OPENAI_API_KEY", ""))
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.name = f"openai-{model}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = []
+        with requests.Session() as session:
+            for start in range(0, len(texts), self.batch_size):
+                response = session.post(
+                    f"{self.base_url.rstrip('/')}/embeddings",
+                    json={"model": self.model, "input": texts[start:start + self.batch_size]},
+                    headers={"Authorization": f"Bearer {self.api_key}"} if self.api_key else {},
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                data = sorted(response.json()["data"], key=lambda d: d["index"])
+                vectors.extend(d["embedding"] for d in data)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class EmbeddingCache:
+    """ SQLite store of raw embedding vectors keyed by (backend name, text hash). """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (backend TEXT, text_hash TEXT, dim INTEGER, "
+                           "vector BLOB, PRIMARY KEY (backend, text_hash))")
+        self._conn.commit()
+
+    def get_many(self, backend: str, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(hashes), 500):
+                chunk = list(hashes[start:start + 500])
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE backend = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [backend, *chunk]).fetchall()
+                found.update((h, np.frombuffer(blob, dtype=np.float32)) for h, blob in rows)
+        return found
+
+    def put_many(self, backend: str, hashes: Sequence[str], vectors: np.ndarray) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                [(backend, h, len(v), np.asarray(v, dtype=np.float32).tobytes()) for h, v in zip(hashes, vectors)])
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "EmbeddingCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def embed_cached(texts: Sequence[str], embedder: Embedder, cache: Optional[EmbeddingCache]) -> np.ndarray:
+    """ Raw vectors for `texts`, embedding (once per distinct text) only what the cache lacks. """
+    hashes = [text_hash(t) for t in texts]
+    known = cache.get_many(embedder.name, list(dict.fromkeys(hashes))) if cache else {}
+    missing = {h: t for h, t in zip(hashes, texts) if h not in known}
+    if missing:
+        logger.info(f"Embedding {len(missing)} new texts with {embedder.name} ({len(known)} cached)")
+        vectors = embedder.embed(list(missing.values()))
+        known.update(zip(missing.keys(), vectors))
+        if cache:
+            cache.put_many(embedder.name, list(missing.keys()), vectors)
+    return np.vstack([known[h] for h in hashes]) if hashes else np.zeros((0, 0), dtype=np.float32)
+
+
+def _weigh(raw: np.ndarray, weights: Optional[np.ndarray]) -> np.ndarray:
+    """ Apply the backend's per-dimension weights and L2-normalise the rows. """
+    matrix = raw * weights if weights is not None else raw
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+class ExampleIndex:
+    """
+    Exact cosine top-k over few-shot examples ({"input", "output"} dicts, see `format_example`).
+
+        index = ExampleIndex.build(examples, HashedTfidfEmbedder())
+        index.save("./output/fewshot_index")
+        selected = index.select(test_inputs, k=4)   # one list of examples per query
+    """
+
+    def __init__(self, examples: List[Dict], matrix: np.ndarray, weights: Optional[np.ndarray], embedder: Embedder,
+                 key: str = "input", cache_path: Optional[str] = LLM_CONFIG['embedding_cache']):
+        self.examples = examples
+        self.matrix = matrix
+        self.weights = weights
+        self.embedder = embedder
+        self.key = key
+        self.cache_path = cache_path
+
+    def _embed(self, texts: Sequence[str]) -> np.ndarray:
+        cache = EmbeddingCache(self.cache_path) if self.cache_path else None
+        try:
+            return embed_cached(list(texts), self.embedder, cache)
+        finally:
+            if cache:
+                cache.close()
+
+    @classmethod
+    def build(cls, examples: List[Dict], embedder: Optional[Embedder] = None,
+              cache_path: Optional[str] = LLM_CONFIG['embedding_cache'], key: str = "input") -> "ExampleIndex":
+        """ Embed the examples' `key` texts through the cache (None disables it) and index them. """
+        index = cls(examples, np.zeros((0, 0), dtype=np.float32), None, embedder or HashedTfidfEmbedder(), key, cache_path)
+        raw = index._embed([str(e[key]) for e in examples])
+        index.weights = index.embedder.fit(raw)
+        index.matrix = _weigh(raw, index.weights)
+        return index
+
+    def scores(self, queries: Sequence[str]) -> np.ndarray:
+        """ (queries, examples) cosine similarities. """
+        return _weigh(self._embed(queries), self.weights) @ self.matrix.T
+
+    def top_k(self, queries: Sequence[str], k: int = 4) -> np.ndarray:
+        """ (queries, k) example positions, most similar first (ties broken by position). """
+        sims = self.scores(queries)
+        k = min(k, sims.shape[1])
+        if k == 0:
+            return np.zeros((len(queries), 0), dtype=np.int64)
+        candidates = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        picked = np.take_along_axis(sims, candidates, axis=1)
+        order = np.lexsort((candidates, -picked), axis=1)
+        return np.take_along_axis(candidates, order, axis=1)
+
+    def select(self, queries: Sequence[str], k: int = 4) -> List[List[Dict]]:
+        return [[self.examples[i] for i in row] for row in self.top_k(queries, k)]
+
+    def save(self, directory: str) -> str:
+        """ Write `matrix.npy`, `weights.npy`, `examples.json` and `meta.json` (backend, text hashes). """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "matrix.npy"), self.matrix)
+        if self.weights is not None:
+            np.save(os.path.join(directory, "weights.npy"), self.weights)
+        with open(os.path.join(directory, "examples.json"), "w", encoding="utf-8") as f:
+            json.dump(self.examples, f, ensure_ascii=False, default=str)
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"backend": self.embedder.name, "key": self.key,
+                       "text_hashes": [text_hash(str(e[self.key])) for e in self.examples]}, f)
+        return directory
+
+    @classmethod
+    def load(cls, directory: str, embedder: Embedder,
+             cache_path: Optional[str] = LLM_CONFIG['embedding_cache']) -> "ExampleIndex":
+        """ Reopen a saved index; `embedder` must be the backend it was built with (used for queries). """
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["backend"] != embedder.name:
+            raise ValueError(f"Index {directory} was built with {meta['backend']}, not {embedder.name}")
+        with open(os.path.join(directory, "examples.json"), encoding="utf-8") as f:
+            examples = json.load(f)
+        weights = os.path.join(directory, "weights.npy")
+        return cls(examples, np.load(os.path.join(directory, "matrix.npy")),
+                   np.load(weights) if os.path.exists(weights) else None, embedder, meta["key"], cache_path)
+
+
+def render_fewshot_prompt(query: Dict[str, str], examples: List[Dict], prefix: str = RQ2_PREFIX,
+                          suffix: str = RQ2_SUFFIX, example_template: str = EXAMPLE_TEMPLATE) -> str:
+    """ What `FewShotPromptTemplate.format(**query)` produced: prefix, examples and suffix joined by blank lines. """
+    pieces = [prefix] + [example_template.format(**e) for e in examples] + [suffix.format(**query)]
+    return EXAMPLE_SEPARATOR.join(pieces)
+
+
+def fewshot_prompts(index: ExampleIndex, frame: pd.DataFrame, k: int = 4) -> List[str]:
+    """
+    Few-shot prompts for every project row of `frame` (full_name, topics, description,
+    readme_content), with examples selected for all rows in one batched lookup.
+    """
+    frame = frame.fillna("None")
+    queries = [format_example({**row, "Label": ""})["input"] for row in frame.to_dict("records")]
+    selected = index.select(queries, k)
+    return [
+        render_fewshot_prompt({"full_name": row["full_name"], "topics": row["topics"],
+                               "description": row["description"], "readme_snippet": row["readme_content"]}, examples)
+        for row, examples in zip(frame.to_dict("records"), selected)
+    ]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the few-shot example index from agreed RQ2 labels.')
+    parser.add_argument('--data', default='data_analysis/RQ2_Agreement_Dataset.xlsx')
+    parser.add_argument('--output', default='./output/fewshot_index')
+    parser.add_argument('--backend', choices=['tfidf', 'openai'], default='tfidf')
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--k', type=int, default=4)
+    parser.add_argument('--readme-chars', type=int, help='Truncate cleaned READMEs (the notebook kept them whole).')
+    args = parser.parse_args()
+
+    from util.readme_clean import clean_readme
+
+    df = pd.read_excel(args.data) if args.data.endswith(".xlsx") else pd.read_csv(args.data)
+    df["readme_content"] = df["readme_content"].apply(clean_readme, max_chars=args.readme_chars)
+    df = df.fillna("None")
+    agreed = df[df["Label_Patrick"] == df["Label_Leuson"]].rename(columns={"Label_Patrick": "Label"})
+    test = agreed.groupby("Label", group_keys=False).sample(frac=args.test_size, random_state=42)
+    train = agreed.drop(test.index)
+    embedder = HashedTfidfEmbedder() if args.backend == 'tfidf' else OpenAIEmbedder()
+    index = ExampleIndex.build([format_example(r) for r in train.to_dict("records")], embedder)
+    index.save(args.output)
+    prompts = fewshot_prompts(index, test, args.k)
+    print(f"Indexed {len(train)} examples in {args.output}; built {len(prompts)} test prompts "
+          f"(~{math.ceil(sum(map(len, prompts)) / len(prompts))} chars each)")
@@ -0,0 +1,611 @@
+"""
+Concurrent, cached LLM-as-judge runner for the RQ4 policy taxonomy (replaces the sequential
+`analyze_pac_list` loop of llm_as_judge_RQ4-Full.ipynb).
+
+Requests go to any OpenAI-compatible `/chat/completions` endpoint (see LLM_CONFIG); replies are
+cached in SQLite by (template hash, model, temperature, language, code hash) and results are
+appended to Parquet part files as they arrive, so an interrupted run resumes where it stopped.
+Requires pip install pyarrow.
+"""
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from analysis.prompt_packing import count_tokens, pack, split_code
+from analysis.taxonomy_prompt import (BATCH_PROMPT, REPAIR_NOTE, TAXONOMY_FIELDS, TAXONOMY_PROMPT,
+                                      render_batch_prompt, render_policy_block, render_prompt, template_hash)
+from config.constant import LLM_CONFIG, PATH_FILE
+from data_collection.policy_index import load_policy_index
+from parser.llm_json import parse_taxonomy, parse_taxonomy_batch
+from util import metrics
+from util.log import configure_logger
+
+logger = configure_logger('github-data_logger', 'logging_file.log')
+
+# Folder names of `sampled_policies/` (see read_sampled_policies in the notebook).
+PAC_TOOLS = [
+    "Open Policy Agent (OPA)",
+    "HashiCorp Sentinel",
+    "Pulumi",
+    "Cedar Policy Language (CPL)",
+    "Kyverno OSS",
+    "Cloud Custodian",
+    "AWS Config",
+    "OpagateKeeper",
+    "Kubewarden",
+]
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+BACKOFF_BASE = 1.0  # seconds; doubled per attempt, with full jitter
+BACKOFF_CAP = 60.0
+RESULT_COLUMNS = ["key", "id", "tool", "path", "language", "model", "temperature", "cached", "attempts",
+                  "seconds", "error", "raw_content"] + TAXONOMY_FIELDS
+
+
+class LLMError(Exception):
+    """ A failed completion request; `retryable` errors are retried with backoff. """
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None,
+                 retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
+def code_hash(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def cache_key(prompt_hash: str, model: str, temperature: float, code_digest: str, language: str = "") -> str:
+    """
+    Cache key of one judgement. The language is filled into the template before the code,
+    so it is part of the prompt identity alongside the template hash.
+    """
+    raw = "\0".join([prompt_hash, model, repr(float(temperature)), language, code_digest])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class JudgeCache:
+    """
+    SQLite store of raw model replies keyed by `cache_key`; safe to share between threads.
+
+        with JudgeCache("./output/llm_cache.sqlite") as cache:
+            cache.get(key)
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, temperature REAL, template_hash TEXT, code_hash TEXT, "
+            "content TEXT NOT NULL, prompt_tokens INTEGER, completion_tokens INTEGER, created REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, content: str, model: str, temperature: float, prompt_hash: str, code_digest: str,
+            usage: Optional[Dict] = None) -> None:
+        usage = usage or {}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model, temperature, prompt_hash, code_digest, content,
+                 usage.get("prompt_tokens"), usage.get("completion_tokens"), time.time()),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "JudgeCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def chat_completion(session: requests.Session, prompt: str, model: str, temperature: float,
+                    base_url: str, api_key: str, timeout: float) -> Dict:
+    """
+    One chat completion request.
+
+    :return: {"content": reply text, "usage": token usage dict}.
+    :raises LLMError: On transport errors and non-200 replies (`retryable` for 429/5xx/timeouts).
+    """
+    endpoint = "/chat/completions"
+    start = time.perf_counter()
+    try:
+        response = session.post(
+            f"{base_url.rstrip('/')}{endpoint}",
+            json={"model": model, "temperature": temperature, "messages": [{"role": "user", "content": prompt}]},
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else {},
+            timeout=timeout,
+        )
+    except requests.RequestException as e:
+        metrics.incr("llm_requests_total", status="error")
+        raise LLMError(f"{type(e).__name__}: {e}", retryable=True) from e
+    finally:
+        metrics.observe("llm_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+
+    metrics.incr("llm_requests_total", status=response.status_code)
+    if response.status_code != 200:
+        raise LLMError(f"HTTP {response.status_code}: {response.text[:200]}", response.status_code,
+                       _retry_after(response), response.status_code in RETRY_STATUSES)
+    body = response.json()
+    usage = body.get("usage") or {}
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage.get(kind):
+            metrics.incr("llm_tokens_total", usage[kind], kind=kind.split("_")[0])
+    return {"content": body["choices"][0]["message"]["content"] or "", "usage": usage}
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """ Seconds to wait before retry `attempt` (0-based): Retry-After when given, else jittered 2^n. """
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_CAP)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def parse_judgement(content: str) -> Dict:
+    """
+    Taxonomy entry of a single-policy reply (`parser.llm_json.parse_taxonomy`), with an
+    "error" key listing the schema violations when the reply is not usable.
+    """
+    entry, errors = parse_taxonomy(content)
+    return {**entry, "error": "; ".join(errors)} if errors else entry
+
+
+def read_policy_items(base_path: str = "sampled_policies", tools: Iterable[str] = PAC_TOOLS,
+                      index_path: str = PATH_FILE['policy_index']) -> List[Dict]:
+    """
+    Policy files under `base_path/<tool>/` as judge items ({"id", "tool", "path", "code"}),
+    listed from the policy index (refreshed incrementally), in `tools` order and by path.
+    """
+    tools = list(tools)
+    listed = load_policy_index(base_path, index_path, tools=tools)
+    for tool in sorted(set(tools) - set(listed["tool"])):
+        logger.warning(f"Folder '{tool}' not found in '{base_path}'")
+    listed = listed.sort_values("tool", key=lambda column: column.map(tools.index), kind="stable")
+    items = []
+    for row in listed.itertuples(index=False):
+        path = os.path.join(base_path, row.path)
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                code = f.read()
+        except OSError as e:
+            logger.error(f"Error reading {path}: {e}")
+            continue
+        items.append({"id": row.path, "tool": row.tool, "path": path, "code": code})
+    return items
+
+
+class _ProgressWriter:
+    """ Appends result rows to `directory/part-NNNNN.parquet`, one file per flush. """
+
+    def __init__(self, directory: str, flush_every: int):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.flush_every = flush_every
+        self.rows: List[Dict] = []
+        self.part = len(glob.glob(os.path.join(directory, "part-*.parquet")))
+
+    def add(self, row: Dict) -> None:
+        self.rows.append(row)
+        if len(self.rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        frame = pd.DataFrame(self.rows, columns=RESULT_COLUMNS)
+        path = os.path.join(self.directory, f"part-{self.part:05d}.parquet")
+        frame.to_parquet(path + ".tmp", index=False, compression="zstd")
+        os.replace(path + ".tmp", path)
+        self.part += 1
+        self.rows = []
+
+
+def _load_parts(progress_dir: str) -> pd.DataFrame:
+    parts = sorted(glob.glob(os.path.join(progress_dir, "part-*.parquet")))
+    if not parts:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    frame = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+    return frame.drop_duplicates(subset="key", keep="last").reset_index(drop=True)
+
+
+def load_results(progress_dir: str = LLM_CONFIG['progress'], include_failed: bool = False) -> pd.DataFrame:
+    """
+    Results written so far, one row per key (the latest attempt wins). Only valid
+    judgements unless `include_failed`; failures are in `retry_queue`.
+    """
+    frame = _load_parts(progress_dir)
+    return frame if include_failed else frame[frame["error"].isna()].reset_index(drop=True)
+
+
+def retry_queue(progress_dir: str = LLM_CONFIG['progress']) -> pd.DataFrame:
+    """
+    Items whose latest attempt failed (HTTP errors, or replies that stayed invalid after the
+    in-run retries), with the error and raw reply. The next run over the same items judges
+    exactly these again, since only valid results count as done.
+    """
+    frame = _load_parts(progress_dir)
+    return frame[frame["error"].notna()].reset_index(drop=True)
+
+
+def done_keys(progress_dir: str) -> Set[str]:
+    """ Keys with a valid result in `progress_dir`; failed rows are judged again on resume. """
+    return set(load_results(progress_dir)["key"])
+
+
+def _as_text(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _result_row(item: Dict, key: str, language: str, model: str, temperature: float, content: Optional[str],
+                cached: bool, attempts: int, seconds: float, error: Optional[str]) -> Dict:
+    parsed = parse_judgement(content) if content is not None else {}
+    error = error or parsed.get("error")
+    row = {"key": key, "id": item.get("id"), "tool": item.get("tool"), "path": item.get("path"),
+           "language": language, "model": model, "temperature": temperature, "cached": cached,
+           "attempts": attempts, "seconds": round(seconds, 4), "error": error,
+           "raw_content": content}
+    for field in TAXONOMY_FIELDS:
+        row[field] = _as_text(parsed.get(field))
+    return row
+
+
+class _Client:
+    """ Shared session, worker threads and in-flight limit for one judging run. """
+
+    def __init__(self, model: str, temperature: float, concurrency: int, max_retries: int, base_url: str,
+                 api_key: Optional[str], timeout: float):
+        self.model = model
+        self.temperature = temperature
+        self.max_retries = max_retries
+        self.base_url = base_url
+        self.api_key = api_key if api_key is not None else (LLM_CONFIG['api_key'] or os.environ.get("OPENAI_API_KEY", ""))
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=concurrency))
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=concurrency))
+        self.loop = asyncio.get_running_loop()
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="llm-judge")
+
+    async def call(self, fn, *args):
+        """ Run blocking `fn` (HTTP or SQLite) on the worker threads. """
+        return await self.loop.run_in_executor(self.executor, fn, *args)
+
+    async def complete(self, prompt: str, label: str):
+        """
+        Send `prompt`, retrying retryable failures with backoff.
+
+        :return: (reply or None, attempts, last LLMError or None).
+        """
+        error = None
+        for attempt in range(self.max_retries + 1):
+            async with self.semaphore:
+                try:
+                    reply = await self.call(chat_completion, self.session, prompt, self.model, self.temperature,
+                                            self.base_url, self.api_key, self.timeout)
+                except LLMError as e:
+                    error = e
+                else:
+                    return reply, attempt + 1, None
+            if not error.retryable or attempt == self.max_retries:
+                break
+            delay = backoff_delay(attempt, error.retry_after)
+            logger.info(f"Retrying {label} in {delay:.2f}s after {error}")
+            metrics.incr("llm_retries_total", status=error.status or "error")
+            await asyncio.sleep(delay)
+        logger.error(f"Judging {label} failed: {error}")
+        return None, attempt + 1, error
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+
+def _pending_items(items: Iterable[Dict], language: Optional[str], prompt_hash: str, model: str,
+                   temperature: float, progress_dir: str) -> List[tuple]:
+    """ (item, key, language, code digest) for items without a successful result in `progress_dir`. """
+    finished = done_keys(progress_dir)
+    pending = []
+    queued: Set[str] = set()
+    skipped = duplicates = 0
+    for item in items:
+        item_language = item.get("language") or language or item.get("tool") or ""
+        digest = code_hash(item["code"])
+        key = cache_key(prompt_hash, model, temperature, digest, item_language)
+        if key in finished:
+            skipped += 1
+        elif key in queued:
+            duplicates += 1  # identical snippet and language: judged once, one result row
+        else:
+            queued.add(key)
+            pending.append((item, key, item_language, digest))
+    logger.info(f"LLM judge: {len(pending)} items to judge, {skipped} already done in {progress_dir}, "
+                f"{duplicates} duplicate snippets")
+    return pending
+
+
+async def judge_async(
+    items: List[Dict],
+    language: Optional[str] = None,
+    template: str = TAXONOMY_PROMPT,
+    model: str = LLM_CONFIG['model'],
+    temperature: float = LLM_CONFIG['temperature'],
+    concurrency: int = LLM_CONFIG['concurrency'],
+    max_retries: int = LLM_CONFIG['max_retries'],
+    parse_retries: int = LLM_CONFIG['parse_retries'],
+    cache_path: str = LLM_CONFIG['cache'],
+    progress_dir: str = LLM_CONFIG['progress'],
+    base_url: str = LLM_CONFIG['base_url'],
+    api_key: Optional[str] = None,
+    timeout: float = LLM_CONFIG['timeout'],
+    flush_every: int = 25,
+) -> pd.DataFrame:
+    """
+    Judge every item with at most `concurrency` requests in flight (see `run_judge`).
+    """
+    prompt_hash = template_hash(template)
+    pending = _pending_items(items, language, prompt_hash, model, temperature, progress_dir)
+    writer = _ProgressWriter(progress_dir, flush_every)
+    client = _Client(model, temperature, concurrency, max_retries, base_url, api_key, timeout)
+
+    async def judge_one(item: Dict, key: str, item_language: str, digest: str, round_: int = 0,
+                        problems: Optional[List[str]] = None, attempts: int = 0, start: Optional[float] = None):
+        """ Returns (result row, None) or, for an invalid reply that may be retried, (None, retry args). """
+        start = time.perf_counter() if start is None else start
+        if round_ == 0:
+            content = await client.call(cache.get, key)
+            if content is not None:
+                metrics.incr("llm_cache_total", result="hit")
+                return _result_row(item, key, item_language, model, temperature, content, True, 0,
+                                   time.perf_counter() - start, None), None
+            metrics.incr("llm_cache_total", result="miss")
+        prompt = render_prompt(item["code"], item_language, template)
+        if problems:
+            prompt += REPAIR_NOTE.format(problems="; ".join(problems))
+        reply, tries, error = await client.complete(prompt, item.get("id"))
+        attempts += tries
+        if reply is None:
+            return _result_row(item, key, item_language, model, temperature, None, False, attempts,
+                               time.perf_counter() - start, str(error)), None
+        entry, problems = parse_taxonomy(reply["content"])
+        if problems:
+            metrics.incr("llm_invalid_replies_total", round=round_)
+            if round_ < parse_retries:
+                return None, (item, key, item_language, digest, round_ + 1, problems, attempts, start)
+            return _result_row(item, key, item_language, model, temperature, reply["content"], False, attempts,
+                               time.perf_counter() - start, "Invalid reply: " + "; ".join(problems)), None
+        await client.call(cache.put, key, reply["content"], model, temperature, prompt_hash, digest, reply["usage"])
+        return _result_row(item, key, item_language, model, temperature, reply["content"], False, attempts,
+                           time.perf_counter() - start, None), None
+
+    with JudgeCache(cache_path) as cache, metrics.stage_timer("llm_judge"):
+        try:
+            # Invalid replies go back on the queue (as new tasks, with the problems appended to
+            # the prompt) until `parse_retries` is used up; only then is a failure recorded.
+            tasks = {asyncio.ensure_future(judge_one(*args)) for args in pending}
+            while tasks:
+                finished, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    row, retry = task.result()
+                    if retry is not None:
+                        tasks.add(asyncio.ensure_future(judge_one(*retry)))
+                    else:
+                        writer.add(row)
+        finally:
+            writer.flush()
+            client.close()
+    return load_results(progress_dir)
+
+
+def merge_parts(answers: List[Dict]) -> Dict:
+    """
+    One judgement for a policy that was split into parts: the answer of the earliest part
+    whose Taxonomy Category is the most common among the parts.
+    """
+    if len(answers) == 1:
+        return answers[0]
+    categories = Counter(str(a.get("Taxonomy Category")) for a in answers)
+    best = max(categories.values())
+    return next(a for a in answers if categories[str(a.get("Taxonomy Category"))] == best)
+
+
+async def judge_batched_async(
+    items: List[Dict],
+    language: Optional[str] = None,
+    batch_tokens: int = LLM_CONFIG['batch_tokens'],
+    batch_items: int = LLM_CONFIG['batch_items'],
+    max_redispatch: int = 3,
+    template: str = BATCH_PROMPT,
+    model: str = LLM_CONFIG['model'],
+    temperature: float = LLM_CONFIG['temperature'],
+    concurrency: int = LLM_CONFIG['concurrency'],
+    max_retries: int = LLM_CONFIG['max_retries'],
+    cache_path: str = LLM_CONFIG['cache'],
+    progress_dir: str = LLM_CONFIG['progress'],
+    base_url: str = LLM_CONFIG['base_url'],
+    api_key: Optional[str] = None,
+    timeout: float = LLM_CONFIG['timeout'],
+    flush_every: int = 25,
+) -> pd.DataFrame:
+    """
+    Judge items packed several per request (see `run_judge_batched`).
+    """
+    prompt_hash = template_hash(template)
+    pending = _pending_items(items, language, prompt_hash, model, temperature, progress_dir)
+    writer = _ProgressWriter(progress_dir, flush_every)
+    client = _Client(model, temperature, concurrency, max_retries, base_url, api_key, timeout)
+    start = time.perf_counter()
+
+    with JudgeCache(cache_path) as cache, metrics.stage_timer("llm_judge_batched"):
+        try:
+            # Cached items are answered without a request; the rest are split into prompt units.
+            units: Dict[str, List[Dict]] = {}
+            parts: Dict[str, Dict] = {}
+            for item, key, item_language, digest in pending:
+                content = await client.call(cache.get, key)
+                if content is not None:
+                    metrics.incr("llm_cache_total", result="hit")
+                    writer.add(_result_row(item, key, item_language, model, temperature, content, True, 0,
+                                           time.perf_counter() - start, None))
+                    continue
+                metrics.incr("llm_cache_total", result="miss")
+                overhead = count_tokens(render_batch_prompt([render_policy_block(key[:12], "")], item_language,
+                                                            template), model)
+                chunks = split_code(item["code"], max(batch_tokens - overhead, 1), model)
+                parts[key] = {"item": item, "language": item_language, "digest": digest,
+                              "answers": [None] * len(chunks), "attempts": 0}
+                for i, chunk in enumerate(chunks):
+                    uid = key[:12] if len(chunks) == 1 else f"{key[:12]}.{i + 1}"
+                    block = render_policy_block(uid, chunk)
+                    units.setdefault(item_language, []).append(
+                        {"uid": uid, "key": key, "part": i, "block": block, "tokens": count_tokens(block, model)})
+            if len(parts) < len(pending):
+                writer.flush()
+
+            async def finish(key: str, error: Optional[str]) -> None:
+                state = parts.pop(key)
+                content = None
+                if error is None:
+                    content = json.dumps(merge_parts(state["answers"]), ensure_ascii=False)
+                    await client.call(cache.put, key, content, model, temperature, prompt_hash, state["digest"])
+                writer.add(_result_row(state["item"], key, state["language"], model, temperature, content, False,
+                                       state["attempts"], time.perf_counter() - start, error))
+
+            async def dispatch(batch: List[Dict], batch_language: str) -> List[Dict]:
+                """ Send one packed request; returns the units that still need an answer. """
+                prompt = render_batch_prompt([u["block"] for u in batch], batch_language, template)
+                reply, attempts, error = await client.complete(prompt, f"batch of {len(batch)}")
+                for key in {u["key"] for u in batch if u["key"] in parts}:
+                    parts[key]["attempts"] += attempts
+                if reply is None:
+                    for key in {u["key"] for u in batch if u["key"] in parts}:
+                        await finish(key, str(error))
+                    return []
+                answers, problems = parse_taxonomy_batch(reply["content"], [u["uid"] for u in batch])
+                metrics.incr("llm_batch_items_total", len(answers), result="answered")
+                metrics.incr("llm_batch_items_total", len(batch) - len(answers), result="redispatched")
+                for unit in batch:
+                    if unit["uid"] in answers and unit["key"] in parts:
+                        state = parts[unit["key"]]
+                        state["answers"][unit["part"]] = answers[unit["uid"]]
+                        if all(a is not None for a in state["answers"]):
+                            await finish(unit["key"], None)
+                for unit in batch:
+                    if unit["uid"] in problems and unit["key"] in parts:
+                        parts[unit["key"]]["problems"] = problems[unit["uid"]]
+                return [u for u in batch if u["uid"] not in answers]
+
+            limit = batch_items
+            for round_ in range(max_redispatch + 1):
+                jobs = []
+                for batch_language, group in units.items():
+                    overhead = count_tokens(render_batch_prompt([], batch_language, template), model)
+                    for members in pack([u["tokens"] for u in group], batch_tokens - overhead, limit):
+                        jobs.append(dispatch([group[i] for i in members], batch_language))
+                logger.info(f"LLM judge round {round_ + 1}: {sum(map(len, units.values()))} snippets in {len(jobs)} requests")
+                units = {}
+                for future in asyncio.as_completed(jobs):
+                    for unit in await future:
+                        if unit["key"] in parts:
+                            language_ = parts[unit["key"]]["language"]
+                            units.setdefault(language_, []).append(unit)
+                if not units:
+                    break
+                limit = max(1, limit // 2)  # smaller batches for the items the model skipped or garbled
+            for key in [u["key"] for group in units.values() for u in group]:
+                if key in parts:
+                    await finish(key, f"No valid answer after {max_redispatch} re-dispatches: "
+                                      + "; ".join(parts[key].get("problems", [])))
+        finally:
+            writer.flush()
+            client.close()
+    return load_results(progress_dir)
+
+
+def run_judge(items: List[Dict], language: Optional[str] = None, **kwargs) -> pd.DataFrame:
+    """
+    Label policy snippets with the RQ4 taxonomy prompt.
+
+    Parameters:
+    - items (List[Dict]): {"id", "code"} dicts, optionally with "tool", "path" and "language"
+      (e.g. from `read_policy_items`).
+    - language (str): Language filled into the prompt when an item has none
+      (the notebook passed e.g. "rego policy library"); falls back to the item's tool.
+    - kwargs: `judge_async` options (model, temperature, concurrency, max_retries, cache_path,
+      progress_dir, base_url, api_key, timeout, flush_every, parse_retries); defaults from LLM_CONFIG.
+
+    Replies are read with the tolerant extractor of `parser.llm_json` and checked against the
+    taxonomy schema. An invalid reply is queued again with the problems appended to the prompt,
+    up to `parse_retries` times, and is never cached. Items that still fail end up in
+    `retry_queue(progress_dir)` rather than in the results, and the next run retries them.
+
+    Returns:
+    - pd.DataFrame: Every valid result in `progress_dir` (including earlier runs), one row per
+      cache key, with the seven taxonomy fields and the raw reply.
+    """
+    return asyncio.run(judge_async(items, language, **kwargs))
+
+
+def run_judge_batched(items: List[Dict], language: Optional[str] = None, **kwargs) -> pd.DataFrame:
+    """
+    `run_judge` with several policies per request: the taxonomy instructions are sent once
+    and snippets are packed (first-fit decreasing) up to `batch_tokens` prompt tokens and
+    `batch_items` snippets, each under a stable id (a prefix of its cache key).
+
+    Snippets larger than the budget are split at line boundaries and the parts' answers are
+    merged (`merge_parts`). Ids missing or invalid in a reply are re-dispatched in batches of
+    half the size, up to `max_redispatch` times. Results and the cache are per policy, so
+    batched and resumed runs share them regardless of how policies were packed.
+
+    Parameters:
+    - items, language: As for `run_judge`.
+    - kwargs: `judge_batched_async` options (batch_tokens, batch_items, max_redispatch plus the
+      `run_judge` options); defaults from LLM_CONFIG.
+
+    Returns:
+    - pd.DataFrame: As for `run_judge`; `raw_content` holds the policy's JSON answer.
+    """
+    return asyncio.run(judge_batched_async(items, language, **kwargs))
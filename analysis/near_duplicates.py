@@ -0,0 +1,255 @@
+""" Near-duplicate clustering of extracted policy files with MinHash signatures and LSH banding. """
+import argparse
+import csv
+import os
+import re
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config.constant import PATH_FILE
+from data_collection.policy_index import load_policy_index
+from util import metrics
+from util.log import configure_logger
+
+logger = configure_logger('github-data_logger', 'logging_file.log')
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows: pairs above ~0.7 Jaccard become candidates
+SHINGLE_SIZE = 5
+THRESHOLD = 0.8  # minimum estimated Jaccard similarity for two files to join a cluster
+MAX_BUCKET_SIZE = 4096  # guard against degenerate LSH buckets (largest on the corpus: ~300)
+SEED = 1
+
+CLUSTER_FIELDS = ["tool", "path", "cluster_id", "cluster_size", "is_representative", "representative"]
+
+_SHIFT = np.uint64(32)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_TOKEN = re.compile(rb"[A-Za-z0-9_]+|[^\sA-Za-z0-9_]")
+
+
+@lru_cache(maxsize=8)
+def permutations(num_perm: int = NUM_PERM, seed: int = SEED) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Coefficients (a, b) of the multiply-shift hash functions h(x) = ((a*x + b) mod 2^64) >> 32,
+    with odd `a`; uint64 wrap-around does the modulo for free.
+    """
+    rnd = np.random.default_rng(seed)
+    a = rnd.integers(0, 1 << 64, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rnd.integers(0, 1 << 64, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingle_hashes(data: bytes, k: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    32-bit hashes of the distinct k-token shingles of `data`.
+
+    Tokens are identifiers/numbers and single punctuation characters, so whitespace and
+    indentation changes do not affect the result. Token hashes are combined with a
+    polynomial rolling hash in numpy instead of hashing every shingle string.
+    """
+    tokens = _TOKEN.findall(data)
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    token_hashes = np.fromiter(map(zlib.crc32, tokens), dtype=np.uint64, count=len(tokens))
+    if len(tokens) <= k:
+        return np.unique(np.array([zlib.crc32(b" ".join(tokens))], dtype=np.uint64))
+    n = len(tokens) - k + 1
+    combined = np.zeros(n, dtype=np.uint64)
+    for j in range(k):
+        combined = (combined * np.uint64(1000003) + token_hashes[j:j + n]) & _MAX_HASH
+    return np.unique(combined)
+
+
+def minhash(shingles: np.ndarray, a: np.ndarray, b: np.ndarray, block: int = 4096) -> np.ndarray:
+    """ MinHash signature (one uint32 per permutation) of a set of shingle hashes. """
+    signature = np.full(len(a), _MAX_HASH, dtype=np.uint64)
+    for start in range(0, len(shingles), block):
+        x = shingles[start:start + block]
+        hashed = (np.outer(a, x) + b[:, None]) >> _SHIFT
+        np.minimum(signature, hashed.min(axis=1), out=signature)
+    return signature.astype(np.uint32)
+
+
+def _sign_file(args: Tuple[str, int, int, int]) -> Tuple[str, Optional[np.ndarray]]:
+    path, num_perm, seed, k = args
+    a, b = permutations(num_perm, seed)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        logger.warning(f"[Skipping] Could not read {path}: {e}")
+        return path, None
+    return path, minhash(shingle_hashes(data, k), a, b)
+
+
+def iter_policy_files(root: str = "./policies", index_path: str = PATH_FILE['policy_index']) -> Iterable[Tuple[str, str, str]]:
+    """ Yield (tool, path, sha256) for every file under `root/<tool>/`, from the policy index. """
+    for row in load_policy_index(root, index_path).itertuples(index=False):
+        yield row.tool, os.path.join(root, row.path), row.sha256
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def lsh_clusters(signatures: List[np.ndarray], groups: List[str], bands: int = BANDS,
+                 threshold: float = THRESHOLD) -> List[int]:
+    """
+    Cluster signatures with LSH banding and return a root index per signature.
+
+    Each signature is cut into `bands` bands; two signatures sharing a band bucket (within the
+    same group, e.g. the same tool) become a candidate pair and are merged when their estimated
+    Jaccard similarity reaches `threshold`. Every candidate pair not already in one cluster is
+    compared, so the clusters are the connected components of the similar pairs and do not
+    depend on input order. A bucket stops growing at `MAX_BUCKET_SIZE` members; signatures it
+    turns away are logged and counted in `lsh_bucket_overflow`.
+    """
+    if not signatures:
+        return []
+    rows = len(signatures[0]) // bands
+    uf = _UnionFind(len(signatures))
+    buckets: Dict[Tuple[str, int, bytes], List[int]] = defaultdict(list)
+    overflow = 0
+    for i, signature in enumerate(signatures):
+        for band in range(bands):
+            key = (groups[i], band, signature[band * rows:(band + 1) * rows].tobytes())
+            members = buckets[key]
+            for j in members:
+                if uf.find(i) != uf.find(j) and \
+                        np.count_nonzero(signature == signatures[j]) / len(signature) >= threshold:
+                    uf.union(i, j)
+            if len(members) < MAX_BUCKET_SIZE:
+                members.append(i)
+            else:
+                overflow += 1
+    if overflow:
+        metrics.incr("lsh_bucket_overflow", overflow)
+        logger.warning(f"{overflow} signatures not added to LSH buckets already holding "
+                       f"{MAX_BUCKET_SIZE} members; their clusters may be split")
+    return [uf.find(i) for i in range(len(signatures))]
+
+
+def cluster_policies(
+    root: str = "./policies",
+    output_csv: str = "policy_clusters.csv",
+    threshold: float = THRESHOLD,
+    num_perm: int = NUM_PERM,
+    bands: int = BANDS,
+    shingle_size: int = SHINGLE_SIZE,
+    workers: int = 1,
+    seed: int = SEED,
+    index_path: str = PATH_FILE['policy_index']
+) -> str:
+    """
+    Group near-identical policy files (forks and vendored copies) under `root/<tool>/<repo>/`.
+
+    Byte-identical files (same SHA-256 in the policy index) are collapsed first and signed
+    once; the unique contents are MinHash-signed and bucketed with LSH, and only files sharing
+    a bucket are compared. Clusters never span two tools. The representative of a cluster is its most
+    frequently copied content, ties broken by the shortest, then alphabetically first, path.
+
+    :param root: Extracted policy corpus (see `extract_and_save_policy_files`).
+    :param output_csv: CSV with one row per file: tool, path (relative to root), cluster_id,
+                       cluster_size, is_representative, representative.
+    :param threshold: Minimum estimated Jaccard similarity for near-duplicates.
+    :param num_perm: MinHash permutations; must be divisible by `bands`.
+    :param bands: LSH bands (rows per band = num_perm / bands).
+    :param shingle_size: Tokens per shingle.
+    :param workers: Processes used for signing (1 = in-process).
+    :param seed: Seed of the hash permutations.
+    :param index_path: Policy index database, refreshed incrementally before clustering.
+    :return: Path to the written CSV.
+    """
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+
+    with metrics.stage_timer("dedup_scan"):
+        indexed = list(iter_policy_files(root, index_path))
+        files = [(tool, path) for tool, path, _ in indexed]
+        contents = [sha256 for _, _, sha256 in indexed]
+    by_content: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+    for i, ((tool, path), key) in enumerate(zip(files, contents)):
+        by_content[(tool, key or path)].append(i)
+    unique = list(by_content)
+    logger.info(f"{len(files)} policy files, {len(unique)} distinct contents")
+
+    jobs = [(files[by_content[key][0]][1], num_perm, seed, shingle_size) for key in unique]
+    with metrics.stage_timer("minhash"):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                signed = list(pool.map(_sign_file, jobs, chunksize=256))
+        else:
+            signed = [_sign_file(job) for job in jobs]
+
+    # Unreadable files get a placeholder signature in a group of their own, so they stay singletons.
+    placeholder = np.zeros(num_perm, dtype=np.uint32)
+    signatures = [placeholder if signature is None else signature for _, signature in signed]
+    groups = [tool if signature is not None else f"\0{u}" for u, ((tool, _), (_, signature)) in enumerate(zip(unique, signed))]
+    with metrics.stage_timer("lsh"):
+        roots = lsh_clusters(signatures, groups, bands, threshold)
+
+    members: Dict[int, List[int]] = defaultdict(list)
+    for u, key in enumerate(unique):
+        members[roots[u]].extend(by_content[key])
+    copies = {i: len(by_content[key]) for key in unique for i in by_content[key]}
+
+    rows = []
+    ordered = sorted(members.values(), key=lambda idx: min(files[i][1] for i in idx))
+    for cluster_id, idx in enumerate(ordered):
+        rep = min(idx, key=lambda i: (-copies[i], len(files[i][1]), files[i][1]))
+        rep_path = os.path.relpath(files[rep][1], root)
+        for i in sorted(idx, key=lambda i: files[i][1]):
+            rows.append({
+                "tool": files[i][0],
+                "path": os.path.relpath(files[i][1], root),
+                "cluster_id": cluster_id,
+                "cluster_size": len(idx),
+                "is_representative": i == rep,
+                "representative": rep_path,
+            })
+    metrics.set_gauge("policy_clusters", len(ordered))
+
+    with open(output_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CLUSTER_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    logger.info(f"{len(files)} files -> {len(ordered)} clusters, written to {output_csv}")
+    return output_csv
+
+
+def representatives(clusters_csv: str = "policy_clusters.csv") -> List[Dict]:
+    """ Rows of a `cluster_policies` CSV that represent their cluster (one per unique policy). """
+    with open(clusters_csv, newline="", encoding="utf-8") as f:
+        return [row for row in csv.DictReader(f) if row["is_representative"] == "True"]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cluster near-duplicate policy files with MinHash/LSH.')
+    parser.add_argument('--root', default='./policies')
+    parser.add_argument('--output', default='policy_clusters.csv')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--num-perm', type=int, default=NUM_PERM)
+    parser.add_argument('--bands', type=int, default=BANDS)
+    parser.add_argument('--shingle-size', type=int, default=SHINGLE_SIZE)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--index', default=PATH_FILE['policy_index'], help='Policy index database.')
+    args = parser.parse_args()
+    print(cluster_policies(args.root, args.output, args.threshold, args.num_perm, args.bands,
+                           args.shingle_size, args.workers, index_path=args.index))
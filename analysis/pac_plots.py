@@ -0,0 +1,72 @@
+""" Figures for RQ1 drawn from `analysis.pac_stats` tables (requires matplotlib and seaborn). """
+from typing import Optional
+
+import pandas as pd
+
+from analysis.pac_stats import PresenceMatrix, co_usage, file_pareto, repo_pareto
+
+
+def plot_pareto(table: pd.DataFrame, ylabel: str, xlabel: str = "PaC Tools", threshold: float = 80,
+                output_path: Optional[str] = None):
+    """
+    Bar chart of `table["percent"]` with the cumulative line and the threshold cut-off
+    (table from `pac_stats.pareto`, `repo_pareto` or `file_pareto`).
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    positions = range(len(table))
+    bars = ax.bar(positions, table["percent"].to_numpy(), color='gray', edgecolor='black')
+    ax.set_ylabel(ylabel, fontsize=16, labelpad=16)
+    ax.set_xlabel(xlabel, fontsize=16, labelpad=16)
+    ax.set_ylim(0, 100)
+    ax.set_xticks(list(positions))
+    ax.set_xticklabels(table.index, rotation=25, ha="right", fontsize=14)
+    ax.tick_params(axis='y', labelsize=14)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    for bar in bars:
+        height = bar.get_height()
+        ax.annotate(f"{height:.0f}%", xy=(bar.get_x() + bar.get_width() / 2, height),
+                    xytext=(0, 3), textcoords="offset points", ha='center', va='bottom', fontsize=14)
+    ax.plot(list(positions), table["cumulative_percent"].to_numpy(), color='black', marker='o', linewidth=1)
+    ax.axhline(y=threshold, color='teal', linestyle='--')
+    ax.axvline(x=int(table["within_threshold"].sum()), color='teal', linestyle='--')
+    fig.tight_layout()
+    if output_path:
+        fig.savefig(output_path, format='pdf')
+    return fig
+
+
+def plot_repo_pareto(pm: PresenceMatrix, output_path: Optional[str] = "pac_usage_pareto_Repo.pdf"):
+    """ Share of repositories per tool (was `plot_pac_usage_pareto_repos`). """
+    return plot_pareto(repo_pareto(pm), "No. of Repos (%)", output_path=output_path)
+
+
+def plot_file_pareto(pm: PresenceMatrix, output_path: Optional[str] = "pac_usage_pareto.pdf"):
+    """ Share of policy files per tool (was `plot_pac_usage_pareto_single_y`). """
+    return plot_pareto(file_pareto(pm), "No. of Files (%)", "Policy as Code (PaC) Tools", output_path=output_path)
+
+
+def plot_co_usage_heatmap(pm: PresenceMatrix, normalize: str = "row",
+                          output_path: Optional[str] = "heatmap_pac_co-usage.pdf"):
+    """
+    Co-usage heatmap: normalize="row" is the conditional share (was `plot_normalized_co_usage`),
+    "repos" the % of all repositories (was `plot_pac_co_usage_heatmap`).
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    matrix = co_usage(pm, normalize)
+    fig, ax = plt.subplots(figsize=(10, 8))
+    if normalize == "row":
+        sns.heatmap(matrix, annot=True, fmt=".2f", cmap="OrRd", vmin=0, vmax=1, ax=ax)
+    else:
+        sns.heatmap(matrix, annot=True, fmt=".1f", cmap="Blues", cbar_kws={'label': 'Co-usage (%)'}, ax=ax)
+    ax.set_xlabel("PaC Tools", fontsize=16, labelpad=16)
+    ax.set_ylabel("PaC Tools", fontsize=16, labelpad=16)
+    plt.setp(ax.get_xticklabels(), rotation=30, ha='right', fontsize=14)
+    plt.setp(ax.get_yticklabels(), rotation=0, fontsize=14)
+    fig.tight_layout()
+    if output_path:
+        fig.savefig(output_path, format='pdf')
+    return fig
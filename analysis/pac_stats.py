@@ -0,0 +1,206 @@
+""" PaC tool presence, co-usage, tool-count and Pareto statistics over a repo x tool matrix. """
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Presence columns of the merged datasets (see PAC_OUTPUTS) -> readable tool names.
+HAS_COLUMNS = {
+    "has_rego": "Open Policy Agent (OPA)",
+    "has_sentinel": "HashiCorp Sentinel",
+    "has_pulumi": "Pulumi",
+    "has_cedar": "Cedar Policy Language (CPL)",
+    "has_kyverno": "Kyverno OSS",
+    "has_custodian": "Cloud Custodian",
+    "has_awsconfigcloudgaurd": "AWS Config",
+    "has_opagatekeeper": "GateKeeper",
+    "has_Kubewarden": "Kubewarden",
+}
+TOOL_COUNT_LABELS = ["0 tools", "1 tool", "2 tools", "3 tools", ">3 tools"]
+_TRUE_STRINGS = {"true", "1", "yes", "y", "t"}
+
+
+@dataclass
+class PresenceMatrix:
+    """
+    Binary repo x tool matrix built once from a usage or presence table.
+
+    `present` is a (repos, tools) bool array; `counts` keeps the per-repo file counts when the
+    source had them (usage summaries), otherwise it equals `present` as integers.
+    """
+    repos: np.ndarray
+    tools: List[str]
+    present: np.ndarray
+    counts: np.ndarray
+
+    @property
+    def n_repos(self) -> int:
+        return self.present.shape[0]
+
+    def packed(self) -> np.ndarray:
+        """ Tool-major packed bits, shape (tools, ceil(repos / 8)), for compact storage. """
+        return np.packbits(self.present.T, axis=1)
+
+    @classmethod
+    def from_packed(cls, bits: np.ndarray, repos: Sequence[str], tools: List[str]) -> "PresenceMatrix":
+        present = np.unpackbits(bits, axis=1, count=len(repos)).T.astype(bool)
+        return cls(np.asarray(repos), list(tools), present, present.astype(np.int64))
+
+
+def _as_bool(column: pd.Series) -> np.ndarray:
+    if column.dtype == bool:
+        return column.to_numpy()
+    if pd.api.types.is_numeric_dtype(column):
+        return column.fillna(0).to_numpy() > 0
+    return column.astype(str).str.strip().str.lower().isin(_TRUE_STRINGS).to_numpy()
+
+
+def presence_matrix(df: pd.DataFrame, tools: Optional[Iterable[str]] = None, key: str = "full_name",
+                    rename: Optional[Dict[str, str]] = None) -> PresenceMatrix:
+    """
+    Build the presence matrix from a usage summary (file counts per tool column) or a
+    presence table (`has_*` columns with booleans or "True"/"False" strings).
+
+    :param tools: Tool columns; defaults to `has_*` columns known to HAS_COLUMNS when present,
+                  otherwise every column except `key`.
+    :param rename: Column -> display name; defaults to HAS_COLUMNS for `has_*` columns.
+    """
+    if tools is None:
+        tools = [c for c in df.columns if c in HAS_COLUMNS] or [c for c in df.columns if c != key]
+    tools = list(tools)
+    rename = HAS_COLUMNS if rename is None else rename
+    present = np.column_stack([_as_bool(df[c]) for c in tools]) if tools else np.zeros((len(df), 0), bool)
+    numeric = all(pd.api.types.is_numeric_dtype(df[c]) and df[c].dtype != bool for c in tools)
+    counts = df[tools].fillna(0).to_numpy(dtype=np.int64) if numeric else present.astype(np.int64)
+    repos = df[key].to_numpy() if key in df.columns else np.arange(len(df))
+    return PresenceMatrix(repos, [rename.get(c, c) for c in tools], present, counts)
+
+
+def co_usage(pm: PresenceMatrix, normalize: Optional[str] = None) -> pd.DataFrame:
+    """
+    Tool x tool co-usage from one matrix product (diagonal = repos using the tool).
+
+    :param normalize: None for repository counts, "repos" for % of all repositories, or
+                      "row" for the share of each row tool's repositories that also use the
+                      column tool (diagonal 1.0).
+    """
+    m = pm.present.astype(np.float32)
+    counts = np.rint(m.T @ m).astype(np.int64)
+    if normalize is None:
+        values = counts
+    elif normalize == "repos":
+        values = counts / max(pm.n_repos, 1) * 100
+    elif normalize == "row":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = counts / counts.diagonal()[:, None]
+    else:
+        raise ValueError(f"Unknown normalize {normalize!r}; expected None, 'repos' or 'row'")
+    return pd.DataFrame(values, index=pm.tools, columns=pm.tools)
+
+
+def _popcount_rows(bits: np.ndarray) -> np.ndarray:
+    """ Set bits per row of a uint8 array (`np.bitwise_count` on numpy >= 2.0, else unpackbits). """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits).sum(axis=1, dtype=np.int64)
+    return np.unpackbits(bits, axis=1).sum(axis=1, dtype=np.int64)
+
+
+def co_usage_packed(bits: np.ndarray, tools: List[str]) -> pd.DataFrame:
+    """ Co-usage counts straight from `PresenceMatrix.packed()` bits (AND + popcount per pair). """
+    n = len(tools)
+    counts = np.zeros((n, n), dtype=np.int64)
+    for i in range(n):
+        counts[i, i:] = _popcount_rows(bits[i] & bits[i:])
+        counts[i:, i] = counts[i, i:]
+    return pd.DataFrame(counts, index=tools, columns=tools)
+
+
+def tool_count_categories(pm: PresenceMatrix) -> np.ndarray:
+    """ Category index per repo: 0, 1, 2, 3 tools, or 4 for more than three. """
+    return np.minimum(pm.present.sum(axis=1), len(TOOL_COUNT_LABELS) - 1)
+
+
+def tool_count_histogram(pm: PresenceMatrix) -> pd.DataFrame:
+    """ Same table as `count_pac_tool_usage` in RQ1.ipynb: projects per number of tools used. """
+    counts = np.bincount(tool_count_categories(pm), minlength=len(TOOL_COUNT_LABELS))
+    total = counts.sum()
+    return pd.DataFrame({
+        "No. PaC Tools Used": TOOL_COUNT_LABELS,
+        "No. of Projects": counts,
+        "% No. of Projects": (counts / total * 100).round(2) if total else np.zeros(len(counts)),
+    })
+
+
+def pareto(values: pd.Series, total: Optional[float] = None, threshold: float = 80) -> pd.DataFrame:
+    """
+    Pareto table: values sorted descending with percentage of `total` (default: their sum),
+    cumulative percentage and whether each tool lies within the first `threshold` percent.
+    """
+    values = values.sort_values(ascending=False)
+    total = values.sum() if total is None else total
+    percent = values / total * 100 if total else values * 0.0
+    cumulative = percent.cumsum()
+    return pd.DataFrame({
+        "value": values,
+        "percent": percent,
+        "cumulative_percent": cumulative,
+        "within_threshold": cumulative <= threshold,
+    })
+
+
+def repo_pareto(pm: PresenceMatrix, threshold: float = 80) -> pd.DataFrame:
+    """ Pareto of the share of repositories using each tool (the notebook's repo chart). """
+    return pareto(pd.Series(pm.present.sum(axis=0), index=pm.tools), pm.n_repos, threshold)
+
+
+def file_pareto(pm: PresenceMatrix, threshold: float = 80) -> pd.DataFrame:
+    """ Pareto of each tool's share of all policy files (the notebook's file-count chart). """
+    return pareto(pd.Series(pm.counts.sum(axis=0), index=pm.tools), None, threshold)
+
+
+def bootstrap_percent_ci(columns: np.ndarray, n_boot: int = 1000, alpha: float = 0.05,
+                         seed: int = 0, chunk: int = 250) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Percentile bootstrap for "% of repositories with property k" over an (repos, k) 0/1 matrix.
+
+    Each replicate resamples repositories with replacement, expressed as multinomial weights,
+    so a whole chunk of replicates is one (chunk, repos) x (repos, k) product.
+
+    :return: (estimate, lower, upper) arrays of length k, in percent.
+    """
+    x = np.asarray(columns, dtype=np.float64)
+    n = x.shape[0]
+    if n == 0:
+        zeros = np.zeros(x.shape[1])
+        return zeros, zeros, zeros
+    rng = np.random.default_rng(seed)
+    replicates = []
+    for start in range(0, n_boot, chunk):
+        weights = rng.multinomial(n, np.full(n, 1.0 / n), size=min(chunk, n_boot - start))
+        replicates.append(weights @ x / n * 100)
+    replicates = np.vstack(replicates)
+    lower, upper = np.percentile(replicates, [alpha / 2 * 100, (1 - alpha / 2) * 100], axis=0)
+    return x.mean(axis=0) * 100, lower, upper
+
+
+def tool_share_ci(pm: PresenceMatrix, **kwargs) -> pd.DataFrame:
+    """ % of repositories using each tool with bootstrap confidence bounds. """
+    estimate, lower, upper = bootstrap_percent_ci(pm.present, **kwargs)
+    return pd.DataFrame({"percent": estimate, "lower": lower, "upper": upper}, index=pm.tools)
+
+
+def co_usage_ci(pm: PresenceMatrix, **kwargs) -> pd.DataFrame:
+    """ % of repositories using each tool pair (i < j) with bootstrap confidence bounds. """
+    pairs = [(i, j) for i in range(len(pm.tools)) for j in range(i + 1, len(pm.tools))]
+    both = np.column_stack([pm.present[:, i] & pm.present[:, j] for i, j in pairs]) if pairs else np.zeros((pm.n_repos, 0))
+    estimate, lower, upper = bootstrap_percent_ci(both, **kwargs)
+    index = pd.MultiIndex.from_tuples([(pm.tools[i], pm.tools[j]) for i, j in pairs], names=["tool_a", "tool_b"])
+    return pd.DataFrame({"percent": estimate, "lower": lower, "upper": upper}, index=index)
+
+
+def tool_count_ci(pm: PresenceMatrix, **kwargs) -> pd.DataFrame:
+    """ % of repositories per number-of-tools category with bootstrap confidence bounds. """
+    onehot = np.eye(len(TOOL_COUNT_LABELS))[tool_count_categories(pm)]
+    estimate, lower, upper = bootstrap_percent_ci(onehot, **kwargs)
+    return pd.DataFrame({"percent": estimate, "lower": lower, "upper": upper}, index=TOOL_COUNT_LABELS)
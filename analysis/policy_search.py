@@ -0,0 +1,396 @@
+"""
+Trigram full-text search over the extracted policy corpus.
+
+Every distinct file content (by SHA-256 in the policy index) is indexed once: its lowercased
+byte trigrams go into postings lists stored as NumPy arrays in segment directories, which
+queries memory-map. A substring or regex query is turned into the trigrams any match must
+contain, the postings are intersected to find candidate contents, and only those files are
+read and matched.
+
+`update()` indexes only contents that are new since the last run, as one new segment. Deleted
+contents are filtered out at query time, and `compact()` (run automatically once there are
+MAX_SEGMENTS segments) merges the segments and drops them.
+
+    index = SearchIndex()
+    index.update("./policies")
+    for hit in index.search("validationFailureAction", tool="Kyverno OSS"):
+        print(hit.path, hit.line_no, hit.line)
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from config.constant import PATH_FILE
+from data_collection.policy_index import load_policy_index
+from util import metrics
+from util.log import configure_logger
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+logger = configure_logger('github-data_logger', 'logging_file.log')
+
+META_FILE = "meta.json"
+MAX_SEGMENTS = 8
+BINARY_PROBE = 8192  # contents with a NUL byte in their first 8 KiB are not indexed
+
+Query = Union[None, Tuple]  # None = no constraint, ("and"|"or", [Query, ...]) or ("tri", ndarray)
+
+
+@dataclass
+class SearchHit:
+    path: str
+    tool: str
+    repo: str
+    line_no: int
+    line: str
+
+
+def trigrams(data: bytes) -> np.ndarray:
+    """ Sorted unique trigrams of lowercased `data` as uint32 (b0 << 16 | b1 << 8 | b2). """
+    if len(data) < 3:
+        return np.empty(0, dtype=np.uint32)
+    arr = np.frombuffer(data.lower(), dtype=np.uint8).astype(np.uint32)
+    return np.unique((arr[:-2] << 16) | (arr[1:-1] << 8) | arr[2:])
+
+
+def _literal_query(literal: bytes) -> Query:
+    return ("tri", trigrams(literal)) if len(literal) >= 3 else None
+
+
+def _required(parsed) -> Query:
+    """ Trigram query implied by a parsed regex: literal runs, groups, branches and repeats >= 1. """
+    parts: List[Query] = []
+    run = bytearray()
+
+    def flush():
+        if run:
+            parts.append(_literal_query(bytes(run)))
+            run.clear()
+
+    for op, av in parsed:
+        if op is sre_parse.LITERAL and av < 256:
+            run.append(av)
+            continue
+        flush()
+        if op is sre_parse.SUBPATTERN:
+            parts.append(_required(av[-1]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            parts.append(_required(av[2]))
+        elif op is sre_parse.BRANCH:
+            parts.append(("or", [_required(branch) for branch in av[1]]))
+    flush()
+    parts = [part for part in parts if part is not None]
+    return ("and", parts) if parts else None
+
+
+def regex_query(pattern: bytes, flags: int = 0) -> Query:
+    """ Trigram query of a (bytes) regex; None when it has no usable literal. """
+    return _required(sre_parse.parse(pattern, flags))
+
+
+class _Segment:
+    """ Memory-mapped postings of one segment: sorted trigram keys, offsets and content ids. """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.keys = np.load(os.path.join(directory, "trigrams.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(directory, "offsets.npy"), mmap_mode="r")
+        self.postings = np.load(os.path.join(directory, "postings.npy"), mmap_mode="r")
+
+    def lookup(self, trigram: int) -> np.ndarray:
+        i = int(np.searchsorted(self.keys, trigram))
+        if i == len(self.keys) or self.keys[i] != trigram:
+            return np.empty(0, dtype=np.uint32)
+        return np.asarray(self.postings[self.offsets[i]:self.offsets[i + 1]])
+
+
+def _write_segment(directory: str, pairs_tri: np.ndarray, pairs_id: np.ndarray) -> None:
+    """ Write (trigram, content id) pairs as a segment; ids stay ascending within each trigram. """
+    order = np.lexsort((pairs_id, pairs_tri))
+    pairs_tri, pairs_id = pairs_tri[order], pairs_id[order]
+    keys, starts = np.unique(pairs_tri, return_index=True)
+    offsets = np.append(starts, len(pairs_tri)).astype(np.int64)
+    tmp = f"{directory}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "trigrams.npy"), keys.astype(np.uint32))
+    np.save(os.path.join(tmp, "offsets.npy"), offsets)
+    np.save(os.path.join(tmp, "postings.npy"), pairs_id.astype(np.uint32))
+    os.replace(tmp, directory)
+
+
+class SearchIndex:
+    """
+    On-disk trigram index of one corpus root, in `directory`: `meta.json` (root, segments,
+    next content and segment numbers), `contents.parquet` (id, sha256, path of one file with that content, live),
+    `files.parquet` (path, tool, repo, content id) and `seg-NNNNN/` postings.
+    """
+
+    def __init__(self, directory: str = PATH_FILE['search_index']):
+        self.directory = directory
+        self._loaded: Optional[Tuple] = None
+
+    # -- building -----------------------------------------------------------------------
+
+    def _meta(self) -> Dict:
+        path = os.path.join(self.directory, META_FILE)
+        if not os.path.exists(path):
+            return {"root": None, "segments": [], "next_id": 0, "next_segment": 1}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _segment_name(meta: Dict) -> str:
+        name = f"seg-{meta['next_segment']:05d}"
+        meta["next_segment"] += 1
+        return name
+
+    def _save(self, meta: Dict, contents: pd.DataFrame, files: pd.DataFrame) -> None:
+        contents.to_parquet(os.path.join(self.directory, "contents.parquet.tmp"), index=False)
+        files.to_parquet(os.path.join(self.directory, "files.parquet.tmp"), index=False)
+        os.replace(os.path.join(self.directory, "contents.parquet.tmp"), os.path.join(self.directory, "contents.parquet"))
+        os.replace(os.path.join(self.directory, "files.parquet.tmp"), os.path.join(self.directory, "files.parquet"))
+        tmp = os.path.join(self.directory, META_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, os.path.join(self.directory, META_FILE))
+        self._loaded = None
+
+    def update(self, root: str = "./policies", index_path: str = PATH_FILE['policy_index']) -> Dict[str, int]:
+        """
+        Index the contents of `root` that are not indexed yet (listed from the policy index,
+        which is refreshed first) as a new segment, and record the current files.
+
+        :return: Counts of files, live contents, newly indexed contents and skipped binaries.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        meta = self._meta()
+        if meta["root"] not in (None, os.path.abspath(root)):
+            raise ValueError(f"{self.directory} indexes {meta['root']}, not {root}")
+        meta["root"] = os.path.abspath(root)
+        listed = load_policy_index(root, index_path)
+        contents_path = os.path.join(self.directory, "contents.parquet")
+        contents = pd.read_parquet(contents_path) if os.path.exists(contents_path) else \
+            pd.DataFrame({"id": pd.Series(dtype=np.int64), "sha256": pd.Series(dtype=str), "path": pd.Series(dtype=str)})
+        known = dict(zip(contents["sha256"], contents["id"]))
+
+        first = listed.drop_duplicates("sha256")
+        new = first[~first["sha256"].isin(known)]
+        tri_parts, id_parts, added, binary = [], [], [], 0
+        with metrics.stage_timer("search_index_build"):
+            for row in new.itertuples(index=False):
+                try:
+                    with open(os.path.join(root, row.path), "rb") as f:
+                        data = f.read()
+                except OSError as e:
+                    logger.warning(f"[Skipping] Could not index file: {row.path}. Reason: {e}")
+                    continue
+                content_id = meta["next_id"]
+                meta["next_id"] += 1
+                added.append({"id": content_id, "sha256": row.sha256, "path": row.path})
+                if b"\0" in data[:BINARY_PROBE]:
+                    binary += 1
+                    continue
+                grams = trigrams(data)
+                tri_parts.append(grams)
+                id_parts.append(np.full(len(grams), content_id, dtype=np.uint32))
+            if tri_parts:
+                name = self._segment_name(meta)
+                _write_segment(os.path.join(self.directory, name), np.concatenate(tri_parts), np.concatenate(id_parts))
+                meta["segments"].append(name)
+
+        if added:
+            contents = pd.concat([contents[["id", "sha256", "path"]], pd.DataFrame(added)], ignore_index=True)
+        contents["live"] = contents["sha256"].isin(set(listed["sha256"]))
+        ids = dict(zip(contents["sha256"], contents["id"]))
+        files = listed[listed["sha256"].isin(ids)][["path", "tool", "repo", "sha256"]].copy()
+        files["content"] = files.pop("sha256").map(ids).astype(np.int64)
+        self._save(meta, contents, files)
+
+        if len(meta["segments"]) >= MAX_SEGMENTS:
+            self.compact()
+        counts = {"files": len(files), "contents": int(contents["live"].sum()), "indexed": len(added) - binary,
+                  "binary": binary}
+        logger.info(f"Search index {self.directory} for {root}: {counts}")
+        return counts
+
+    def compact(self) -> None:
+        """ Merge all segments into one, dropping contents no longer present in the corpus. """
+        meta = self._meta()
+        contents = pd.read_parquet(os.path.join(self.directory, "contents.parquet"))
+        live = np.zeros(meta["next_id"], dtype=bool)
+        live[contents.loc[contents["live"], "id"].to_numpy()] = True
+        tri_parts, id_parts = [], []
+        for name in meta["segments"]:
+            segment = _Segment(os.path.join(self.directory, name))
+            counts = np.diff(np.asarray(segment.offsets))
+            tri = np.repeat(np.asarray(segment.keys), counts)
+            ids = np.asarray(segment.postings)
+            keep = live[ids]
+            tri_parts.append(tri[keep])
+            id_parts.append(ids[keep])
+        name = self._segment_name(meta)
+        if tri_parts:
+            _write_segment(os.path.join(self.directory, name), np.concatenate(tri_parts), np.concatenate(id_parts))
+        old, meta["segments"] = meta["segments"], [name] if tri_parts else []
+        files = pd.read_parquet(os.path.join(self.directory, "files.parquet"))
+        self._save(meta, contents[contents["live"]].reset_index(drop=True), files)
+        for segment_name in old:
+            shutil.rmtree(os.path.join(self.directory, segment_name), ignore_errors=True)
+        logger.info(f"Search index {self.directory} compacted {len(old)} segments")
+
+    # -- querying -----------------------------------------------------------------------
+
+    def _load(self):
+        if self._loaded is None:
+            meta = self._meta()
+            if meta["root"] is None:
+                raise FileNotFoundError(f"No search index in {self.directory}; run update() first")
+            segments = [_Segment(os.path.join(self.directory, name)) for name in meta["segments"]]
+            files = pd.read_parquet(os.path.join(self.directory, "files.parquet"))
+            self._loaded = (meta, segments, files)
+        return self._loaded
+
+    def _postings(self, segments: List[_Segment], grams: np.ndarray) -> np.ndarray:
+        """ Content ids containing every trigram in `grams`, rarest list first. """
+        result = None
+        lists = []
+        for trigram in grams:
+            found = [segment.lookup(int(trigram)) for segment in segments]
+            ids = np.concatenate(found) if found else np.empty(0, dtype=np.uint32)
+            if len(ids) == 0:
+                return ids
+            lists.append(ids)
+        for ids in sorted(lists, key=len):
+            result = ids if result is None else np.intersect1d(result, ids, assume_unique=True)
+            if len(result) == 0:
+                break
+        return result
+
+    def _evaluate(self, segments: List[_Segment], query: Query) -> Optional[np.ndarray]:
+        """ Candidate content ids of a trigram query; None means every content. """
+        if query is None:
+            return None
+        kind, body = query
+        if kind == "tri":
+            return self._postings(segments, body)
+        results = [self._evaluate(segments, part) for part in body]
+        if kind == "and":
+            constrained = [r for r in results if r is not None]
+            if not constrained:
+                return None
+            result = constrained[0]
+            for r in sorted(constrained[1:], key=len):
+                result = np.intersect1d(result, r, assume_unique=True)
+            return result
+        if any(r is None for r in results):
+            return None
+        return np.unique(np.concatenate(results)) if results else np.empty(0, dtype=np.uint32)
+
+    def search(self, pattern: str, regex: bool = False, ignore_case: bool = False, tool: Optional[str] = None,
+               repo: Optional[str] = None, limit: Optional[int] = 1000) -> List[SearchHit]:
+        """
+        Lines matching a substring (or, with `regex`, a Python regular expression), in path order.
+
+        :param tool: Only files of this PaC tool (exact name, e.g. "Kyverno OSS").
+        :param repo: Only files of this repository folder (e.g. "open-policy-agent__library").
+        :param limit: Stop after this many hits (None = all).
+        """
+        return list(self.iter_search(pattern, regex, ignore_case, tool, repo, limit))
+
+    def iter_search(self, pattern: str, regex: bool = False, ignore_case: bool = False, tool: Optional[str] = None,
+                    repo: Optional[str] = None, limit: Optional[int] = None) -> Iterator[SearchHit]:
+        meta, segments, files = self._load()
+        raw = pattern.encode("utf-8")
+        flags = re.IGNORECASE if ignore_case else 0
+        # A case-insensitive literal is matched lowercased against lowercased bytes: re.IGNORECASE
+        # would lose the fast literal scan. bytes.lower() keeps offsets, so lines are unchanged.
+        fold = ignore_case and not regex
+        if regex:
+            compiled = re.compile(raw, flags | re.MULTILINE)
+        else:
+            compiled = re.compile(re.escape(raw.lower() if fold else raw))
+        with metrics.stage_timer("search_candidates"):
+            candidates = self._evaluate(segments, regex_query(raw, flags) if regex else _literal_query(raw))
+        selected = files
+        if tool is not None:
+            selected = selected[selected["tool"] == tool]
+        if repo is not None:
+            selected = selected[selected["repo"] == repo]
+        if candidates is not None:
+            selected = selected[selected["content"].isin(candidates)]
+        metrics.incr("search_candidate_files", len(selected))
+
+        emitted = 0
+        matches: Dict[int, List[Tuple[int, str]]] = {}
+        for row in selected.sort_values("path").itertuples(index=False):
+            if row.content not in matches:
+                matches[row.content] = self._match(os.path.join(meta["root"], row.path), compiled, fold)
+            for line_no, line in matches[row.content]:
+                yield SearchHit(row.path, row.tool, row.repo, line_no, line)
+                emitted += 1
+                if limit is not None and emitted >= limit:
+                    return
+
+    @staticmethod
+    def _match(path: str, compiled, fold: bool = False) -> List[Tuple[int, str]]:
+        """ (line number, line) of each line of the file with a match of `compiled`. """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return []
+        hits, line_no, position, last_line = [], 1, 0, -1
+        for match in compiled.finditer(data.lower() if fold else data):
+            line_no += data.count(b"\n", position, match.start())
+            position = match.start()
+            if line_no == last_line:
+                continue
+            start = data.rfind(b"\n", 0, match.start()) + 1
+            end = data.find(b"\n", match.start())
+            hits.append((line_no, data[start:end if end >= 0 else len(data)].decode("utf-8", errors="replace").rstrip("\r")))
+            last_line = line_no
+        return hits
+
+
+def search_policies(pattern: str, regex: bool = False, ignore_case: bool = False, tool: Optional[str] = None,
+                    repo: Optional[str] = None, limit: Optional[int] = 1000, root: str = "./policies",
+                    directory: str = PATH_FILE['search_index'], update: bool = True) -> List[SearchHit]:
+    """ Refresh the index of `root` (unless `update` is False) and run one `SearchIndex.search`. """
+    index = SearchIndex(directory)
+    if update or not os.path.exists(os.path.join(directory, META_FILE)):
+        index.update(root)
+    return index.search(pattern, regex, ignore_case, tool, repo, limit)
+
+
+def print_hits(hits: List[SearchHit], max_width: int = 160) -> None:
+    for hit in hits:
+        line = hit.line.strip()
+        print(f"{hit.path}:{hit.line_no}: {line[:max_width]}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Search the extracted policy corpus through a trigram index.')
+    parser.add_argument('pattern')
+    parser.add_argument('--regex', action='store_true', help='Treat the pattern as a regular expression.')
+    parser.add_argument('--ignore-case', action='store_true')
+    parser.add_argument('--tool', help='Only this PaC tool, e.g. "Kyverno OSS".')
+    parser.add_argument('--repo', help='Only this repository folder.')
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--root', default='./policies')
+    parser.add_argument('--index', default=PATH_FILE['search_index'])
+    parser.add_argument('--no-update', action='store_true', help='Query the index as it is.')
+    args = parser.parse_args()
+
+    print_hits(search_policies(args.pattern, args.regex, args.ignore_case, args.tool, args.repo, args.limit,
+                               args.root, args.index, update=not args.no_update))
@@ -0,0 +1,79 @@
+""" Token counting, oversize splitting and bin packing of policy snippets into batched prompts. """
+import math
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence
+
+# Fallback when tiktoken is not installed: policy code averages ~3.5-4 characters per token,
+# so 3 over-counts slightly and keeps packed prompts under the budget.
+CHARS_PER_TOKEN = 3
+
+
+@lru_cache(maxsize=8)
+def _encoder(model: str) -> Optional[Callable[[str], List[int]]]:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+    return encoding.encode_ordinary
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """ Prompt tokens of `text`: exact with tiktoken (pip install tiktoken), else a conservative estimate. """
+    encode = _encoder(model)
+    if encode is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encode(text))
+
+
+def split_code(code: str, max_tokens: int, model: str = "gpt-4o-mini") -> List[str]:
+    """
+    Split `code` into consecutive parts of at most `max_tokens` tokens, cutting at line
+    boundaries (a single longer line is cut by characters). Short code is returned whole.
+    """
+    if count_tokens(code, model) <= max_tokens:
+        return [code]
+    parts: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for line in code.splitlines(keepends=True):
+        tokens = count_tokens(line, model)
+        if tokens > max_tokens:
+            step = max(1, max_tokens * CHARS_PER_TOKEN)
+            pieces = [line[i:i + step] for i in range(0, len(line), step)]
+        else:
+            pieces = [line]
+        for piece in pieces:
+            tokens = count_tokens(piece, model) if len(pieces) > 1 else tokens
+            if current and current_tokens + tokens > max_tokens:
+                parts.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def pack(sizes: Sequence[int], budget: int, max_items: int) -> List[List[int]]:
+    """
+    First-fit-decreasing packing of item token `sizes` into bins of at most `budget` tokens
+    and `max_items` items. Returns bins as lists of item indices (in input order within a
+    bin); an item larger than `budget` gets a bin of its own.
+    """
+    bins: List[List[int]] = []
+    free: List[int] = []
+    for index in sorted(range(len(sizes)), key=lambda i: (-sizes[i], i)):
+        size = sizes[index]
+        for b, room in enumerate(free):
+            if size <= room and len(bins[b]) < max_items:
+                bins[b].append(index)
+                free[b] -= size
+                break
+        else:
+            bins.append([index])
+            free.append(budget - size)
+    return [sorted(b) for b in bins]
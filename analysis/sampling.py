@@ -0,0 +1,253 @@
+"""
+Stratified sampling of the policy corpus (replaces `stratified_sample_and_copy` of
+Sample Selection RQ4.ipynb).
+
+The sampler works on a file table (one row per policy file: tool, repo, path, size, lines, ...)
+queried from the policy index instead of walking `policies/`. Quotas are allocated across
+tool x repo strata, proportionally or with Neyman allocation, by a divisor method whose quotas
+never shrink as the sample grows. Each file gets a seeded hash key, and a stratum's sample is
+the files with its smallest keys. A draw is therefore reproducible across machines, and with
+the same seed and settings a larger sample contains the smaller one. The result is a manifest
+CSV; `materialize` links it into the notebook's `sampled_policies/<tool>/<tool>_<i><ext>` layout
+when a folder is needed.
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import os
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from config.constant import PATH_FILE
+from data_collection.policy_index import load_policy_index
+from data_collection.policy_store import link_or_copy
+from util.log import configure_logger
+
+logger = configure_logger('github-data_logger', 'logging_file.log')
+
+STRATA = ("tool", "repo")
+METHODS = ("proportional", "neyman")
+# Per-tool sample sizes of the RQ4 taxonomy sample (Sample Selection RQ4.ipynb).
+RQ4_TARGETS = {
+    "HashiCorp Sentinel": 15,
+    "Open Policy Agent (OPA)": 234,
+    "Pulumi": 17,
+    "Cedar Policy Language (CPL)": 2,
+    "Kyverno OSS": 62,
+    "Cloud Custodian": 11,
+    "AWS Config": 11,
+    "OpagateKeeper": 26,
+    "Kubewarden": 1,
+}
+
+
+def file_table(root: str = "./policies", index_path: str = PATH_FILE['policy_index']) -> pd.DataFrame:
+    """
+    One row per policy file under `root/<tool>/<repo>/` (tool, repo, path relative to `root`,
+    size, lines, sha256, language), from the policy index after an incremental refresh.
+    """
+    return load_policy_index(root, index_path)
+
+
+def sample_key(path: str, seed: int) -> float:
+    """ Seeded pseudo-random key in [0, 1) of a file path (the same on every machine and run). """
+    digest = hashlib.blake2b(f"{seed}\0{path}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2.0 ** 64
+
+
+def allocate(sizes: pd.Series, n: int, method: str = "proportional", spread: Optional[pd.Series] = None,
+             minimum: int = 0) -> pd.Series:
+    """
+    Integer sample sizes per stratum that sum to `n` (or to the population when it is smaller).
+
+    :param sizes: Stratum population sizes N_h, indexed by stratum.
+    :param method: "proportional" (n_h ~ N_h) or "neyman" (n_h ~ N_h S_h).
+    :param spread: Standard deviation S_h of the study variable per stratum, for "neyman";
+                   strata with no spread still get their `minimum`.
+    :param minimum: Files every stratum gets first (capped at its size), e.g. 1 so that every
+                    repo is represented.
+    :return: n_h per stratum, never above N_h. Units are assigned one at a time (Webster divisor
+             method, ties by stratum order), so n_h never decreases as `n` grows.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown allocation method {method!r}; expected one of {METHODS}")
+    sizes = sizes.astype(np.int64)
+    capacity = sizes.to_numpy()
+    n = min(int(n), int(capacity.sum()))
+    base = np.minimum(capacity, minimum)
+    if base.sum() > n:
+        raise ValueError(f"minimum={minimum} over {len(sizes)} strata needs {int(base.sum())} files, more than n={n}")
+    weights = capacity.astype(np.float64)
+    if method == "neyman":
+        if spread is None:
+            raise ValueError("Neyman allocation needs the per-stratum spread")
+        weights = weights * spread.reindex(sizes.index).fillna(0).to_numpy(dtype=np.float64)
+        if weights.sum() == 0:
+            weights = capacity.astype(np.float64)
+
+    # Sequential divisor (Webster) method: the remaining files are handed out one at a time to
+    # the open stratum with the largest w_h / (n_h + 1/2), ties by stratum order. The order of
+    # hand-outs does not depend on n, so raising n never lowers a quota. Strata without weight
+    # (no Neyman spread) are filled by size once the weighted ones are full.
+    counts = base.copy()
+    remaining = n - int(base.sum())
+    for phase_weights in (weights, capacity.astype(np.float64)):
+        heap = [(-phase_weights[h] / (counts[h] + 0.5), h) for h in range(len(sizes))
+                if counts[h] < capacity[h] and phase_weights[h] > 0]
+        heapq.heapify(heap)
+        while remaining > 0 and heap:
+            _, h = heapq.heappop(heap)
+            counts[h] += 1
+            remaining -= 1
+            if counts[h] < capacity[h]:
+                heapq.heappush(heap, (-phase_weights[h] / (counts[h] + 0.5), h))
+    return pd.Series(counts, index=sizes.index, name="n_h")
+
+
+def stratified_sample(index: pd.DataFrame, n: Optional[int] = None, targets: Optional[Dict[str, int]] = None,
+                      strata: Sequence[str] = STRATA, method: str = "proportional", spread: str = "size",
+                      minimum: int = 0, seed: int = 0) -> pd.DataFrame:
+    """
+    Draw a stratified sample from a file table (`file_table` or any frame with the `strata`
+    columns and a unique `path`).
+
+    :param n: Total sample size, allocated across all strata; or
+    :param targets: Sample size per tool (e.g. RQ4_TARGETS), each allocated across that tool's strata.
+    :param method: "proportional" or "neyman" (see `allocate`).
+    :param spread: Column whose per-stratum standard deviation drives Neyman allocation.
+    :param minimum: Files every stratum gets first (see `allocate`).
+    :param seed: Key seed; the same table, sizes and seed always give the same sample.
+    :return: The sampled rows, with the stratum size `N_h`, sample size `n_h`, design weight
+             `weight` (N_h / n_h), `key` and a `sample_id` numbering files per tool as the
+             notebook's copies did (`<tool>_<i><ext>`).
+    """
+    if (n is None) == (targets is None):
+        raise ValueError("Pass exactly one of n or targets")
+    strata = list(strata)
+    frame = index.copy()
+    grouped = frame.groupby(strata, sort=True)
+    sizes = grouped.size()
+    variability = grouped[spread].std(ddof=1).fillna(0) if method == "neyman" else None
+
+    if targets is None:
+        quotas = allocate(sizes, n, method, variability, minimum)
+    else:
+        if strata[0] != "tool":
+            raise ValueError("targets are per tool, so the first stratum column must be 'tool'")
+        unknown = set(targets) - set(sizes.index.get_level_values(0))
+        for tool in sorted(unknown):
+            logger.warning(f"No files for tool '{tool}'")
+        parts = []
+        for tool, tool_sizes in sizes.groupby(level=0, sort=True):
+            if tool in targets:
+                tool_spread = variability.loc[tool_sizes.index] if variability is not None else None
+                parts.append(allocate(tool_sizes, targets[tool], method, tool_spread, minimum))
+        quotas = pd.concat(parts) if parts else pd.Series(dtype=np.int64, name="n_h")
+
+    frame["key"] = [sample_key(path, seed) for path in frame["path"]]
+    frame = frame.join(sizes.rename("N_h"), on=strata).join(quotas.rename("n_h"), on=strata)
+    frame["n_h"] = frame["n_h"].fillna(0).astype(np.int64)
+    frame = frame.sort_values(strata + ["key"], kind="stable")
+    picked = frame[frame.groupby(strata, sort=False).cumcount() < frame["n_h"]].copy()
+    picked["weight"] = picked["N_h"] / picked["n_h"]
+
+    picked = picked.sort_values(["tool", "key"], kind="stable")
+    number = picked.groupby("tool", sort=False).cumcount() + 1
+    picked["sample_id"] = [f"{tool}_{i}{os.path.splitext(path)[1]}"
+                           for tool, i, path in zip(picked["tool"], number, picked["path"])]
+    logger.info(f"Sampled {len(picked)} of {len(frame)} files from {int((quotas > 0).sum())} strata ({method}, seed {seed})")
+    return picked.reset_index(drop=True)
+
+
+def reservoir_sample(records: Iterable, quotas: Union[int, Dict[Hashable, int]], path: Callable = lambda r: r,
+                     stratum: Callable = lambda r: None, seed: int = 0) -> Dict[Hashable, List]:
+    """
+    Stratified sample of a stream that is too large to list, in one pass and O(sum of quotas)
+    memory: each stratum keeps the records with the smallest `sample_key`s in a bounded heap.
+    With the same quotas and seed this selects the same files as `stratified_sample`.
+
+    :param records: Any iterable (e.g. `os.scandir` results or index rows).
+    :param quotas: Sample size per stratum, or one size for every stratum.
+    :param path: Record -> path string that is hashed into the key.
+    :param stratum: Record -> stratum label (default: one stratum, None).
+    :return: Sampled records per stratum, ordered by key.
+    """
+    heaps: Dict[Hashable, List[Tuple[float, int, object]]] = {}
+    for i, record in enumerate(records):
+        label = stratum(record)
+        k = quotas if isinstance(quotas, int) else quotas.get(label, 0)
+        if k <= 0:
+            continue
+        heap = heaps.setdefault(label, [])
+        entry = (-sample_key(path(record), seed), i, record)  # max-heap on key via negation
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+    return {label: [record for _, _, record in sorted(heap, key=lambda e: (-e[0], e[1]))]
+            for label, heap in heaps.items()}
+
+
+MANIFEST_COLUMNS = ["sample_id", "tool", "repo", "path", "size", "N_h", "n_h", "weight", "key"]
+
+
+def write_sample_manifest(sample: pd.DataFrame, output: str, **parameters) -> str:
+    """
+    Save a sample as a manifest CSV (MANIFEST_COLUMNS plus any extra columns) and the draw's
+    `parameters` (seed, method, n or targets, root) next to it as `<output>.json`.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    columns = [c for c in MANIFEST_COLUMNS if c in sample.columns]
+    columns += [c for c in sample.columns if c not in columns]
+    sample[columns].to_csv(output, index=False)
+    with open(f"{output}.json", "w", encoding="utf-8") as f:
+        json.dump({"files": len(sample), **parameters}, f, indent=2, default=str)
+    return output
+
+
+def read_sample_manifest(path: str) -> pd.DataFrame:
+    return pd.read_csv(path, dtype={"repo": str, "path": str, "sample_id": str}, keep_default_na=False)
+
+
+def materialize(sample: pd.DataFrame, root: str = "./policies", output_root: str = "sampled_policies",
+                link: str = "hardlink") -> int:
+    """
+    Create the notebook layout `output_root/<tool>/<sample_id>` for a sample, linking the files
+    from `root` (see `link_or_copy`). Returns the number of files placed.
+    """
+    for row in sample.itertuples(index=False):
+        dest = os.path.join(output_root, row.tool, row.sample_id)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if os.path.lexists(dest):
+            os.remove(dest)
+        link_or_copy(os.path.join(root, row.path), dest, link)
+    logger.info(f"Placed {len(sample)} sampled files under {output_root} ({link})")
+    return len(sample)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Draw a reproducible stratified sample of policy files.')
+    parser.add_argument('--root', default='./policies')
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--n', type=int, help='Total sample size across all strata.')
+    size.add_argument('--targets', help='JSON object of per-tool sample sizes (default: the RQ4 targets).')
+    parser.add_argument('--method', default='proportional', choices=METHODS)
+    parser.add_argument('--spread', default='size', choices=['size', 'lines'],
+                        help='Column whose spread drives Neyman allocation.')
+    parser.add_argument('--minimum', type=int, default=0, help='Files every stratum gets first.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='./output/sample_manifest.csv')
+    parser.add_argument('--materialize', metavar='DIR', help='Also link the sample into DIR/<tool>/.')
+    args = parser.parse_args()
+
+    targets = None if args.n is not None else (json.loads(args.targets) if args.targets else RQ4_TARGETS)
+    sample = stratified_sample(file_table(args.root), n=args.n, targets=targets, method=args.method,
+                               spread=args.spread, minimum=args.minimum, seed=args.seed)
+    write_sample_manifest(sample, args.output, root=args.root, n=args.n, targets=targets, method=args.method,
+                          spread=args.spread, minimum=args.minimum, seed=args.seed)
+    if args.materialize:
+        materialize(sample, args.root, args.materialize)
+    print(sample.groupby("tool").size().to_string())
@@ -0,0 +1,156 @@
+""" RQ4 taxonomy prompt of `analyze_pac_list` (llm_as_judge_RQ4-Full.ipynb), kept verbatim, and its batched variant. """
+import hashlib
+from typing import List
+
+# Placeholders: {language} (e.g. "rego policy library") and {policy_code}.
+TAXONOMY_PROMPT = """
+
+
+You are an expert in policy analysis, software governance, cloud-native security, and regulatory compliance.
+
+Given the following policy code snippet written in a Policies-as-Code (PaC) language (e.g., {language}), analyze it and provide a structured taxonomy entry by addressing seven governance-oriented dimensions: start by identifying the main purpose of the script, then from the main purpose identify sub-purposes from that category and sub-category for the taxonomy. Your task is to assign the policy to one of the predefined taxonomy categories and sub-categories listed below. If no suitable category or sub-category applies, suggest a new, concise one that best captures the intent and logic of the policy.
+
+Use the detailed taxonomy definitions provided to guide your decision-making. The output must be returned in strict JSON format for automated processing.
+
+🧠 Seven Analytical Dimensions:
+
+1. Primary Purpose  
+   What is the high-level governance or security domain this policy addresses? Express it in simple, unambiguous sentence.
+
+2. Sub-purpose  
+   What are the specific goals or aspects of governance that the policy addresses within the broader purpose? Express it in a simple, unambiguous sentence.
+
+3. Taxonomy Category  
+   Choose one from the predefined categories:  
+   "Security Governance", "Compliance Governance", "Cost Optimization", "Workflow Automation", "Deployment Governance"  
+   → Maximum 4 words.
+
+4. Taxonomy Sub-category  
+   Choose the most relevant sub-category from the predefined list which correspond to the taxonomy category.  
+   → Maximum 4 words.
+
+5. Policy Implemented  
+   Describe the specific rule enforced. Express it in simple, unambiguous, actionable language.
+
+6. Target Resource  
+   What is the specific resource or artifact the policy is applied to?
+   E.g., "Kubernetes Pod", "Terraform", "Dockerfile", "CI/CD Pipeline Script", "Network", "Clouds environment", "Tokens", "VMs Instances", "YAML", "Kubernetes DaemonSet", "Docker Containers", "API"
+
+7. Rationale  
+   Justify your categorization and interpretation of the policy by explaining how the code enforces the rule.
+
+🧾 Taxonomy Reference:
+Refer to the following taxonomy to guide your categorization. If the policy does not fit, suggest a new category or sub-category in a short, meaningful phrase.
+
+🛡️ Security Governance
+Policies that enforce access restrictions, secure configurations, and threat prevention.
+Sub-categories:
+
+Access Control: Who can access what under which roles/contexts.
+
+Configuration Validation: Enforce structural and operational correctness (e.g., valid volume types).
+
+Secrets Management: Secure use and access of tokens, credentials, etc.
+
+Network Management: Traffic rules, firewalls, ingress/egress.
+
+Resource Management: Quotas, usage enforcement, secure provisioning of CPU/memory/etc.
+
+Security Review Compliance: Ensures auditing or security checks before deployment.
+
+Vulnerability Management: Prevent use of outdated/unsafe software versions.
+
+Actions Restrictions: Deny execution of harmful commands.
+
+Workloads Management: Runtime constraints (e.g., deny service token mounting in Pods).
+
+📋 Compliance Governance
+Policies that enforce conformance with standards, formats, or legal/commercial obligations.
+Sub-categories:
+
+Resource Compliance: Labels, field structure, formatting requirements. 
+
+Service Compliance: services meet specific operational, security, or performance requirement.
+
+Third-party License Compliance: Licensing checks.
+
+Standards Enforcement: enforces adherence of a particular technology to its best practice implementations.
+
+💸 Cost Optimization
+Policies that reduce waste or unused resources in cloud environments.
+(No sub-categories)
+
+🔁 Workflow Automation
+Policies that trigger automatic remediation, auditing, or infrastructure provisioning.
+(No sub-categories)
+
+🚀 Deployment Governance
+Policies governing how and when deployments occur.
+Sub-categories:
+
+Access Control: Who can perform deployment actions.
+
+Key Management: Monitor, rotate, or alert on key usage.
+
+🔍 Task Execution:
+
+Here is the policy code snippet:
+
+{policy_code}
+
+Please return only a valid JSON dictionary with the seven fields above populated appropriately.
+
+If the policy logic doesn't fit any of the categories, suggest a new taxonomy category and taxonomy sub-category.
+
+"""
+
+# The seven fields the model is asked to return.
+TAXONOMY_FIELDS = [
+    "Primary Purpose",
+    "Sub-purpose",
+    "Taxonomy Category",
+    "Taxonomy Sub-category",
+    "Policy Implemented",
+    "Target Resource",
+    "Rationale",
+]
+
+# Batched variant: the same instructions once, then several snippets each introduced by a
+# "### POLICY <id>" line; the model answers with one JSON object per id.
+POLICY_HEADER = "### POLICY {id}"
+BATCH_PROMPT = TAXONOMY_PROMPT[:TAXONOMY_PROMPT.index("🔍 Task Execution:")] + """🔍 Task Execution:
+
+Here are {count} policy code snippets. Each one starts with a line "### POLICY <id>" and runs until the next such line. Analyze every snippet on its own.
+
+{policies}
+
+Please return only a valid JSON array with one dictionary per policy, in the same order, each with an "id" field holding the policy's <id> exactly as given and the seven fields above populated appropriately.
+
+If the policy logic doesn't fit any of the categories, suggest a new taxonomy category and taxonomy sub-category.
+
+"""
+
+# Appended to the prompt when a reply has to be asked for again (see parser.llm_json).
+REPAIR_NOTE = """
+Your previous answer to this request could not be used: {problems}. Return only one valid JSON dictionary with all seven fields.
+"""
+
+
+def render_prompt(policy_code: str, language: str, template: str = TAXONOMY_PROMPT) -> str:
+    """ Fill `template` exactly as `PromptTemplate.format(policy_code=...)` did in the notebook. """
+    return template.format(language=language, policy_code=policy_code)
+
+
+def template_hash(template: str = TAXONOMY_PROMPT) -> str:
+    """ sha256 of the template text; part of every judge cache key. """
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()
+
+
+def render_policy_block(item_id: str, code: str) -> str:
+    """ One snippet of a batched prompt. """
+    return POLICY_HEADER.format(id=item_id) + "\n" + code.rstrip("\n") + "\n"
+
+
+def render_batch_prompt(blocks: List[str], language: str, template: str = BATCH_PROMPT) -> str:
+    """ Fill the batched template with snippets from `render_policy_block`. """
+    return template.format(language=language, count=len(blocks), policies="\n".join(blocks))
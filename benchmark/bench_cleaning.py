@@ -0,0 +1,121 @@
+""" Throughput and agreement of util.readme_clean against the notebook's sequential clean_readme. """
+import argparse
+import json
+import re
+import time
+from typing import Dict, List
+
+from util.readme_clean import clean_readme, clean_readmes
+
+
+def reference_clean_readme(readme: str) -> str:
+    """ `clean_readme` as written in llm_as_judge_RQ2-Copy1.ipynb (one re.sub per rule). """
+    if not isinstance(readme, str):
+        return ""
+    readme = re.sub(r'\bCLUSTER_DOMAIN\b', '', readme, flags=re.IGNORECASE)
+    readme = re.sub(r'https?://\S+|www\.\S+', '', readme)
+    readme = re.sub(r'\b[\w\.-]+@[\w\.-]+\.\w+\b', '', readme)
+    readme = re.sub(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', '', readme)
+    readme = re.sub(r'!\[.*?\]\(.*?\)', '', readme)
+    readme = re.sub(r'\[.*?\]\(.*?\)', '', readme)
+    readme = re.sub(r'<[^>]+>', '', readme)
+    readme = re.sub(r'```json.*?```', '', readme, flags=re.DOTALL | re.IGNORECASE)
+    readme = re.sub(r'\[\s*\{.*?\}\s*\]', '', readme, flags=re.DOTALL)
+    readme = re.sub(r'\{\s*".*?".*?\}', '', readme, flags=re.DOTALL)
+    readme = re.sub(r'\bcritical\b[.,;:!?"]*', '', readme, flags=re.IGNORECASE)
+    readme = re.sub(r'"critical"\s*:\s*\{.*?\}(,)?', '', readme, flags=re.IGNORECASE | re.DOTALL)
+    readme = re.sub(r'[\"\'*#`~=|\\/\[\]\{\}\(\)\d]', '', readme)
+    readme = re.sub(r'--+', ' ', readme)
+    readme = re.sub(r'\s+', ' ', readme).strip()
+    readme = re.sub(r'\s+', ' ', readme).strip()
+    return readme
+
+
+# READMEs where Unicode matters: non-ASCII digits (which `\d` removes) and letters that
+# IGNORECASE folds onto ASCII ("İ" matches i, "ſ" matches s).
+NON_ASCII_SAMPLES = [
+    "version ١٢٣ ok",
+    "Ｖｅｒｓｉｏｎ ＡＢ１２ release",
+    "Persian ۱۲۳۴ and Devanagari १२३ and Thai ๑๒๓ digits",
+    "CRİTİCAL: fix the token leak",
+    "Set CLUſTER_DOMAIN before deploying",
+    "Contact: josé.garcía@ejemplo.es or visit www.例え.jp/ドキュメント",
+    "Server at ١٩٢.١٦٨.١.١ — see «docs» (v２.０) for details",
+    "# Título\n\n*Política* de acceso — `deny` 10 reglas\u00a0y\u2003espacios",
+    "Emoji 🚀 release 2024 — « critical » fixes",
+]
+
+
+def _best(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(csv_path: str = "RQ2_Final_label.csv", column: str = "readme_content", copies: int = 1,
+                  max_chars: int = 1500, workers: int = 4, repeat: int = 3) -> List[Dict]:
+    """
+    Clean the README column of `csv_path` (repeated `copies` times) with the reference
+    implementation and with util.readme_clean (serial, truncated, and in a process pool), and
+    check agreement on NON_ASCII_SAMPLES.
+
+    :return: one row per variant with best wall time, READMEs/sec and the share of outputs that
+             match the reference exactly (untruncated variants) or its first `max_chars` characters.
+    """
+    import pandas as pd
+
+    readmes = pd.concat([pd.read_csv(csv_path)[column]] * copies, ignore_index=True)
+    expected = [reference_clean_readme(r) for r in readmes]
+    truncated = [e[:max_chars] + "..." if len(e) > max_chars else e for e in expected]
+
+    variants = {
+        "reference": (lambda: [reference_clean_readme(r) for r in readmes], expected),
+        "clean_readme": (lambda: [clean_readme(r) for r in readmes], expected),
+        "clean_readme(max_chars)": (lambda: [clean_readme(r, max_chars) for r in readmes], truncated),
+        "pandas.apply(reference)": (lambda: readmes.apply(reference_clean_readme).tolist(), expected),
+        f"clean_readmes(workers={workers})": (lambda: list(clean_readmes(readmes, workers=workers)), expected),
+    }
+    results = []
+    for name, (fn, target) in variants.items():
+        seconds = _best(fn, repeat)
+        output = fn()
+        results.append({
+            "variant": name,
+            "readmes": len(readmes),
+            "best_seconds": round(seconds, 4),
+            "readmes_per_second": round(len(readmes) / seconds, 1),
+            "agreement": round(sum(a == b for a, b in zip(output, target)) / len(target), 4),
+        })
+
+    output = [clean_readme(r) for r in NON_ASCII_SAMPLES]
+    target = [reference_clean_readme(r) for r in NON_ASCII_SAMPLES]
+    results.append({"variant": "clean_readme(non-ASCII)", "readmes": len(target), "best_seconds": None,
+                    "readmes_per_second": None,
+                    "agreement": round(sum(a == b for a, b in zip(output, target)) / len(target), 4)})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark README cleaning on a CSV column.')
+    parser.add_argument('--csv', default='RQ2_Final_label.csv')
+    parser.add_argument('--column', default='readme_content')
+    parser.add_argument('--copies', type=int, default=1, help='Repeat the column to enlarge the workload.')
+    parser.add_argument('--max-chars', type=int, default=1500)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Write results as JSON to this file.')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.csv, args.column, args.copies, args.max_chars, args.workers, args.repeat)
+    for row in results:
+        if row['best_seconds'] is None:
+            print(f"{row['variant']:>26}  {row['readmes']} samples  agreement={row['agreement']}")
+            continue
+        print(f"{row['variant']:>26}  {row['best_seconds']:>8.3f}s  {row['readmes_per_second']:>9.1f} READMEs/s  "
+              f"agreement={row['agreement']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
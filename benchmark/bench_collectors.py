@@ -0,0 +1,145 @@
+""" End-to-end collector benchmark against the offline GitHub stand-in. """
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmark.fake_github import FakeGitHub
+from config.constant import GitHub_CONFIG, REPO_CONFIG
+from util import metrics
+
+PAC_QUERIES = ["rego", "sentinel", "ClusterPolicy in:file extension:yaml"]
+
+
+def _sample_names(fake: FakeGitHub, n: int) -> List[str]:
+    return [repo["full_name"] for repo in fake.repos[:n]]
+
+
+def _stage_collect(fake: FakeGitHub, n: int) -> Callable[[], None]:
+    from data_collection.get_repos import collect_repo
+    return collect_repo
+
+
+def _stage_metrics(fake: FakeGitHub, n: int) -> Callable[[], None]:
+    import pandas as pd
+    from data_collection.get_repo_metrics import get_commit_dates_from_csv
+
+    pd.DataFrame({"full_name": _sample_names(fake, n)}).to_excel("input.xlsx", index=False)
+    return lambda: get_commit_dates_from_csv("input.xlsx", "commit_dates.csv")
+
+
+def _stage_cloud(fake: FakeGitHub, n: int) -> Callable[[], None]:
+    import pandas as pd
+    from data_collection.get_repos_cloud import process_repositories
+
+    pd.DataFrame({"project_name": _sample_names(fake, n)}).to_csv("input.csv", index=False)
+    return lambda: process_repositories("input.csv", REPO_CONFIG['synonyms'], "filtered_cloud_repos.csv")
+
+
+def _stage_pac(fake: FakeGitHub, n: int) -> Callable[[], None]:
+    from data_collection.get_pac_repo import search_pac_repos_by_extension
+
+    def run():
+        for query in PAC_QUERIES:
+            search_pac_repos_by_extension(query)
+    return run
+
+
+def _stage_iac(fake: FakeGitHub, n: int) -> Callable[[], None]:
+    import pandas as pd
+    from data_collection.get_iac_repos import enrich_csv_with_iac_tools_code_search
+
+    pd.DataFrame({"full_name": _sample_names(fake, n)}).to_csv("input.csv", index=False)
+    return lambda: enrich_csv_with_iac_tools_code_search("input.csv", "output_iac.csv")
+
+
+# main.py long flag (-c, -m, -cd, -p, -i) -> stage factory;
+# each factory prepares inputs in the cwd and returns the workload.
+STAGES: Dict[str, Callable[[FakeGitHub, int], Callable[[], None]]] = {
+    "collect": _stage_collect,
+    "metric": _stage_metrics,
+    "cloud": _stage_cloud,
+    "pac": _stage_pac,
+    "iac": _stage_iac,
+}
+
+
+def _latency_summary() -> Dict[str, float]:
+    summary = {}
+    for hist in metrics.report()["histograms"]:
+        if hist["name"] == "http_request_seconds" and hist["count"]:
+            summary[hist["labels"]["endpoint"]] = round(hist["sum"] / hist["count"] * 1000, 3)
+    return summary
+
+
+def run_stage(stage: str, fake: FakeGitHub, n_inputs: int, workdir: str) -> Dict:
+    """
+    Run one collector stage against `fake` inside `workdir` and measure it.
+
+    :return: wall time, requests/sec, quota used per resource and mean latency (ms) per endpoint.
+    """
+    stage_dir = os.path.join(workdir, stage)
+    os.makedirs(stage_dir, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(stage_dir)
+    try:
+        workload = STAGES[stage](fake, n_inputs)
+        metrics.reset()
+        fake.reset_quota()
+        start = time.perf_counter()
+        workload()
+        wall = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+    return {
+        "stage": stage,
+        "wall_seconds": round(wall, 4),
+        "requests": fake.requests,
+        "requests_per_second": round(fake.requests / wall, 1) if wall else None,
+        "quota_used": dict(fake.quota_used),
+        "mean_latency_ms": _latency_summary(),
+    }
+
+
+def run_benchmarks(stages: List[str], n_repos: int = 2000, n_inputs: int = 200, seed: int = 0,
+                   error_rate: float = 0.0, latency: float = 0.0) -> List[Dict]:
+    """
+    Start a FakeGitHub, point GitHub_CONFIG at it with no inter-request delay and run each stage.
+    Quotas are set high enough that rate limiting never cuts a run short; `quota_used`
+    reports what the same run would cost against real GitHub.
+    """
+    saved = dict(GitHub_CONFIG)
+    fake = FakeGitHub(n_repos=n_repos, seed=seed, error_rate=error_rate, latency=latency,
+                      rate_limits={"core": 10 ** 9, "search": 10 ** 9, "graphql": 10 ** 9})
+    results = []
+    with fake, tempfile.TemporaryDirectory() as workdir:
+        GitHub_CONFIG.update(api_url=fake.url, request_delay=(0, 0), token=["benchmark-token"])
+        try:
+            for stage in stages:
+                results.append(run_stage(stage, fake, n_inputs, workdir))
+        finally:
+            GitHub_CONFIG.clear()
+            GitHub_CONFIG.update(saved)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark main.py collector stages against a local fake GitHub.')
+    parser.add_argument('--stages', nargs='+', default=list(STAGES), choices=list(STAGES))
+    parser.add_argument('--repos', type=int, default=2000, help='Size of the fake repository population.')
+    parser.add_argument('--inputs', type=int, default=200, help='Input rows for -m, -cd and -i.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 502.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Added server latency per request (seconds).')
+    parser.add_argument('--output', help='Write results as JSON to this file.')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.stages, args.repos, args.inputs, args.seed, args.error_rate, args.latency)
+    for row in results:
+        print(f"{row['stage']:>8}  {row['wall_seconds']:>9.3f}s  {row['requests']:>6} req  "
+              f"{row['requests_per_second'] or 0:>8.1f} req/s  quota={row['quota_used']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,90 @@
+""" Notebook serial `pd.read_excel` vs parallel, cached workbook combining of taxonomy results. """
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+from analysis.combine_results import RESULTS_PATTERN, combine_pac_excels, pac_name, workbook_paths
+
+
+def reference_combine(input_dir: str, pattern: str = RESULTS_PATTERN) -> pd.DataFrame:
+    """ The RQ4.ipynb loop: one openpyxl-backed `pd.read_excel` per workbook, in order. """
+    frames = []
+    for path in workbook_paths(input_dir, pattern):
+        frame = pd.read_excel(path, sheet_name=0, engine="openpyxl")
+        frame.insert(0, "pac", pac_name(path))
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_mixed_workbook(path: Path) -> None:
+    """ A small results workbook whose columns mix numbers and text, which Arrow cannot type as-is. """
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in (["id", "score", "category"], [1, 5, "Security"], [2, "7.5 (revised)", None], [3, 7.5, 4],
+                [4, "N/A", "Compliance"]):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def run_benchmark(input_dir: str = "data_analysis/sampled_policies/Taxonomy_foalem", copies: int = 4,
+                  workers: int = 4) -> List[Dict]:
+    """
+    Combine `copies` renamed copies of every workbook in `input_dir`: the notebook loop, the
+    combiner without cache, with a cold and a warm Parquet cache, and after touching one file.
+    A mixed-type workbook is added so the cache's fallback for untyped columns is exercised;
+    the cached variants must equal the cold parse exactly.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp, "workbooks")
+        source.mkdir()
+        for path in workbook_paths(input_dir):
+            for i in range(copies):
+                shutil.copy2(path, source / path.name.replace("_results_full", f"{i}_results_full"))
+        write_mixed_workbook(source / "mixed_results_full.xlsx")
+        cache = os.path.join(tmp, "cache")
+        variants = [
+            ("notebook", lambda: reference_combine(str(source))),
+            ("combiner", lambda: combine_pac_excels(source, None, workers=workers, cache_dir=None)),
+            ("cold cache", lambda: combine_pac_excels(source, None, workers=workers, cache_dir=cache)),
+            ("warm cache", lambda: combine_pac_excels(source, None, workers=workers, cache_dir=cache)),
+            ("one edited", lambda: (os.utime(next(source.iterdir())),
+                                    combine_pac_excels(source, None, workers=workers, cache_dir=cache))[1]),
+        ]
+        expected = cold = None
+        for name, fn in variants:
+            start = time.perf_counter()
+            frame = fn()
+            seconds = time.perf_counter() - start
+            expected = frame if expected is None else expected
+            cold = frame if name == "cold cache" else cold
+            results.append({"variant": name, "workbooks": len(list(source.iterdir())), "rows": len(frame),
+                            "seconds": round(seconds, 3), "matches_notebook": bool(frame.equals(expected)),
+                            "matches_cold": None if cold is None else bool(frame.equals(cold))})
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark combining taxonomy result workbooks.')
+    parser.add_argument('--input-dir', default='data_analysis/sampled_policies/Taxonomy_foalem')
+    parser.add_argument('--copies', type=int, default=4, help='Renamed copies of each workbook.')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--output', help='Write results as JSON to this file.')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.input_dir, args.copies, args.workers)
+    for row in results:
+        print(f"{row['variant']:>10}  {row['seconds']:>7.3f} s  {row['workbooks']} workbooks  {row['rows']} rows  "
+              f"matches notebook: {row['matches_notebook']}  matches cold cache: {row['matches_cold']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,117 @@
+""" Speed and precision/recall of keyword vs header detection for Kubernetes-style policies. """
+import argparse
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmark.corpus import generate_clone_tree
+from util import file_search
+
+# Tool -> kinds checked by the clone scanners (same lists as get_pac_usage / get_pac_policy).
+KIND_TOOLS = {
+    "Kyverno OSS": ["ClusterPolicy"],
+    "OpagateKeeper": ["ConstraintTemplate"],
+    "Kubewarden": ["PolicyServer", "ClusterAdmissionPolicy"],
+}
+MODES = {
+    "keyword": file_search.contains_keywords,
+    "header": file_search.contains_kinds,
+}
+
+
+def _load_manifest(manifest_path: str) -> Dict[str, str]:
+    """ Relative path -> tool ('' for decoys) from a corpus manifest. """
+    with open(manifest_path, newline="", encoding="utf-8") as f:
+        return {os.path.normpath(row["path"]): row["tool"] for row in csv.DictReader(f)}
+
+
+def _yaml_files(base_path: str) -> List[str]:
+    paths = []
+    for root, _, files in os.walk(base_path):
+        paths.extend(os.path.join(root, f) for f in files if f.lower().endswith((".yaml", ".yml")))
+    paths.sort()
+    return paths
+
+
+def bench_mode(mode: str, base_path: str, truth: Dict[str, str], repeat: int = 3) -> List[Dict]:
+    """
+    Classify every YAML file under `base_path` with one detection mode, once per tool, and score it.
+
+    A file counts as a true positive for a tool when the manifest seeded it as that tool's policy;
+    everything else the matcher accepts (decoys, other tools' files, noise) is a false positive.
+
+    :return: one row per tool with best wall time, files/sec, precision and recall.
+    """
+    match = MODES[mode]
+    paths = _yaml_files(base_path)
+    rows = []
+    for tool, kinds in KIND_TOOLS.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            hits = [path for path in paths if match(path, kinds)]
+            timings.append(time.perf_counter() - start)
+        found = {os.path.relpath(path, base_path) for path in hits}
+        expected = {path for path, owner in truth.items() if owner == tool and path.lower().endswith((".yaml", ".yml"))}
+        true_positives = len(found & expected)
+        best = min(timings)
+        rows.append({
+            "mode": mode,
+            "tool": tool,
+            "files": len(paths),
+            "best_seconds": round(best, 4),
+            "files_per_second": round(len(paths) / best, 1) if best else None,
+            "matched": len(found),
+            "expected": len(expected),
+            "false_positives": len(found - expected),
+            "decoys_matched": sum(1 for path in found if truth.get(path) == ""),
+            "precision": round(true_positives / len(found), 4) if found else None,
+            "recall": round(true_positives / len(expected), 4) if expected else None,
+        })
+    return rows
+
+
+def run_benchmarks(modes: List[str], n_repos: int = 50, seed: int = 0, policies_root: str = "./policies",
+                   corpus_dir: str = None, repeat: int = 3) -> List[Dict]:
+    """
+    Generate (or reuse) a seeded clone tree and score each detection mode against its manifest.
+
+    :param corpus_dir: Existing directory to reuse; its `<corpus_dir>_manifest.csv` must exist.
+    """
+    workdir = None
+    if corpus_dir is None or not os.path.isdir(corpus_dir):
+        if corpus_dir is None:
+            workdir = tempfile.mkdtemp(prefix="bench_corpus_")
+            corpus_dir = os.path.join(workdir, "clone")
+        generate_clone_tree(corpus_dir, n_repos=n_repos, seed=seed, policies_root=policies_root)
+    try:
+        truth = _load_manifest(f"{os.path.normpath(corpus_dir)}_manifest.csv")
+        return [row for mode in modes for row in bench_mode(mode, corpus_dir, truth, repeat)]
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare keyword and header detection of Kubernetes-style policies.')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--repos', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policies', default='./policies', help='Policy corpus to seed PaC files from.')
+    parser.add_argument('--corpus', help='Reuse (or create once) this corpus directory.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Write results as JSON to this file.')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.modes, args.repos, args.seed, args.policies, args.corpus, args.repeat)
+    for row in results:
+        print(f"{row['mode']:>8} {row['tool']:>14}  {row['best_seconds']:>7.3f}s  {row['files_per_second'] or 0:>9.1f} files/s  "
+              f"P={row['precision']}  R={row['recall']}  matched={row['matched']}/{row['expected']}  "
+              f"decoys={row['decoys_matched']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
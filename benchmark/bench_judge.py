@@ -0,0 +1,84 @@
+""" Sequential, concurrent, batched and cached LLM judging against the offline FakeLLM endpoint. """
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+from analysis.llm_judge import read_policy_items, retry_queue, run_judge, run_judge_batched
+from benchmark.fake_llm import FakeLLM
+
+# gpt-4o-mini list prices (USD per million tokens) and tier-1 rate limits, for the cost and
+# rate-limited throughput columns.
+PRICE_PER_MTOK = {"prompt": 0.15, "completion": 0.60}
+RATE_LIMITS = {"rpm": 500, "tpm": 200_000}
+VARIANTS = ["sequential", "concurrent", "batched", "cached"]
+
+
+def run_benchmark(policies: str = "policies", limit: int = 379, latency: float = 0.2, token_latency: float = 0.002,
+                  error_rate: float = 0.05, drop_rate: float = 0.02, malformed_rate: float = 0.03, concurrency: int = 16,
+                  variants: List[str] = VARIANTS, seed: int = 0) -> List[Dict]:
+    """
+    Judge a seeded sample of `limit` policy files (379 = the RQ4 sample size) one request at
+    a time (the notebook loop), `concurrency` requests in flight, packed several per request,
+    and again from the cache. Requests take `latency` plus `token_latency` per completion token.
+
+    Besides wall time, each row has the tokens and list-price cost the run would bill and the
+    policies per minute it could sustain under RATE_LIMITS (whichever of RPM and TPM binds first).
+    """
+    items = sorted(read_policy_items(policies), key=lambda item: item["id"])
+    random.Random(seed).shuffle(items)
+    items = items[:limit]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, FakeLLM(latency=latency, token_latency=token_latency,
+                                                       error_rate=error_rate, drop_rate=drop_rate,
+                                                       malformed_rate=malformed_rate,
+                                                       retry_after=0.05) as fake:
+        for variant in variants:
+            before = (fake.completions, fake.prompt_tokens, fake.completion_tokens)
+            options = {"base_url": fake.url, "concurrency": 1 if variant == "sequential" else concurrency,
+                       "cache_path": os.path.join(tmp, "shared.sqlite" if variant in ("concurrent", "cached") else f"{variant}.sqlite"),
+                       "progress_dir": os.path.join(tmp, variant), "flush_every": 50}
+            start = time.perf_counter()
+            frame = run_judge_batched(items, **options) if variant == "batched" else run_judge(items, **options)
+            seconds = time.perf_counter() - start
+            calls, prompt, completion = (now - was for now, was in zip(
+                (fake.completions, fake.prompt_tokens, fake.completion_tokens), before))
+            judged = max(len(frame), 1)
+            rate = min(RATE_LIMITS["rpm"] * judged / calls, RATE_LIMITS["tpm"] * judged / (prompt + completion)) if calls else None
+            results.append({
+                "variant": variant,
+                "items": len(frame),
+                "failed": len(retry_queue(options["progress_dir"])),
+                "requests": calls,
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "cost_usd": round((prompt * PRICE_PER_MTOK["prompt"] + completion * PRICE_PER_MTOK["completion"]) / 1e6, 4),
+                "seconds": round(seconds, 3),
+                "items_per_min_at_limits": round(rate, 1) if rate else None,
+            })
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the LLM judge runner offline.')
+    parser.add_argument('--policies', default='policies')
+    parser.add_argument('--limit', type=int, default=379)
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds per fake completion.')
+    parser.add_argument('--token-latency', type=float, default=0.002, help='Extra seconds per completion token.')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--variants', nargs='+', default=VARIANTS, choices=VARIANTS)
+    parser.add_argument('--output', help='Write results as JSON to this file.')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.policies, args.limit, args.latency, args.token_latency,
+                            concurrency=args.concurrency, variants=args.variants)
+    for row in results:
+        print(f"{row['variant']:>10}  {row['seconds']:>8.2f} s  {row['requests']:>5} requests  "
+              f"{row['prompt_tokens'] + row['completion_tokens']:>9} tokens  ${row['cost_usd']:<8}  "
+              f"{row['items_per_min_at_limits']} items/min at limits  ({row['items']} items, {row['failed']} failed)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
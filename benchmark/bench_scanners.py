@@ -0,0 +1,117 @@
+""" Throughput benchmark for the clone-tree scanners on a synthetic corpus. """
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+from benchmark.corpus import generate_clone_tree
+from util import metrics
+
+
+def _scan_usage(base_path: str, out_dir: str) -> None:
+    from data_collection.get_pac_usage import scan_repositories_updated
+    scan_repositories_updated(base_path, os.path.join(out_dir, "pac_usage.csv"))
+
+
+def _extract_policies(base_path: str, out_dir: str) -> None:
+    from data_collection.get_pac_policy import extract_and_save_policy_files
+    extract_and_save_policy_files(base_path, os.path.join(out_dir, "policies"))
+
+
+def _save_readmes(base_path: str, out_dir: str) -> None:
+    from data_collection.get_pac_readme import save_readmes_as_raw_files
+    save_readmes_as_raw_files(base_path, os.path.join(out_dir, "readmes_raw"))
+
+
+SCANNERS: Dict[str, Callable[[str, str], None]] = {
+    "usage": _scan_usage,
+    "policy": _extract_policies,
+    "readme": _save_readmes,
+}
+
+
+def corpus_size(base_path: str) -> Tuple[int, int]:
+    """ Number of files and total bytes under `base_path`. """
+    files = size = 0
+    for root, _, names in os.walk(base_path):
+        for name in names:
+            files += 1
+            size += os.path.getsize(os.path.join(root, name))
+    return files, size
+
+
+def bench_scanner(name: str, base_path: str, repeat: int = 3) -> Dict:
+    """
+    Run one scanner `repeat` times on `base_path` (fresh output dir each time) and keep the best run.
+
+    :return: best wall time, files/sec and MB/sec over the whole corpus, plus the number of file
+             reads of the last run (`file_read` stage calls; a YAML file checked against several
+             tools is read once per check, so this can exceed the number of files).
+    """
+    files, size = corpus_size(base_path)
+    timings = []
+    for _ in range(repeat):
+        out_dir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+        try:
+            metrics.reset()
+            start = time.perf_counter()
+            SCANNERS[name](base_path, out_dir)
+            timings.append(time.perf_counter() - start)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+    reads = sum(c["value"] for c in metrics.report()["counters"]
+                if c["name"] == "stage_calls_total" and c["labels"].get("stage") == "file_read")
+    best = min(timings)
+    return {
+        "scanner": name,
+        "files": files,
+        "megabytes": round(size / 1e6, 2),
+        "best_seconds": round(best, 4),
+        "mean_seconds": round(sum(timings) / len(timings), 4),
+        "files_per_second": round(files / best, 1),
+        "mb_per_second": round(size / 1e6 / best, 2),
+        "file_reads": int(reads),
+    }
+
+
+def run_benchmarks(scanners: List[str], n_repos: int = 50, seed: int = 0, policies_root: str = "./policies",
+                   corpus_dir: str = None, repeat: int = 3) -> List[Dict]:
+    """
+    Generate (or reuse) a seeded clone tree and benchmark each scanner on it.
+
+    :param corpus_dir: Existing directory to reuse; a temporary corpus is generated when omitted.
+    """
+    workdir = None
+    if corpus_dir is None or not os.path.isdir(corpus_dir):
+        if corpus_dir is None:
+            workdir = tempfile.mkdtemp(prefix="bench_corpus_")
+            corpus_dir = os.path.join(workdir, "clone")
+        generate_clone_tree(corpus_dir, n_repos=n_repos, seed=seed, policies_root=policies_root)
+    try:
+        return [bench_scanner(name, corpus_dir, repeat) for name in scanners]
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the PaC scanners on a synthetic clone tree.')
+    parser.add_argument('--scanners', nargs='+', default=list(SCANNERS), choices=list(SCANNERS))
+    parser.add_argument('--repos', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policies', default='./policies', help='Policy corpus to seed PaC files from.')
+    parser.add_argument('--corpus', help='Reuse (or create once) this corpus directory.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Write results as JSON to this file.')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scanners, args.repos, args.seed, args.policies, args.corpus, args.repeat)
+    for row in results:
+        print(f"{row['scanner']:>8}  {row['best_seconds']:>8.3f}s  {row['files_per_second']:>10.1f} files/s  "
+              f"{row['mb_per_second']:>8.2f} MB/s  ({row['files']} files, {row['megabytes']} MB, {row['file_reads']} file reads)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
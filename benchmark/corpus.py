@@ -0,0 +1,155 @@
+""" Seeded synthetic clone tree generator for the scanning stages. """
+import argparse
+import csv
+import os
+import random
+from typing import Dict, List, Optional
+
+PAC_TOOLS = [
+    "HashiCorp Sentinel", "Open Policy Agent (OPA)", "Pulumi",
+    "Cedar Policy Language (CPL)", "Kyverno OSS", "Cloud Custodian",
+    "AWS Config", "OpagateKeeper", "Kubewarden"
+]
+
+# Used when `policies_root` has no files for a tool (e.g. a fresh checkout without policies/).
+FALLBACK_POLICIES: Dict[str, List[tuple]] = {
+    "HashiCorp Sentinel": [("restrict-ami.sentinel", 'import "tfplan/v2" as tfplan\nmain = rule { true }\n')],
+    "Open Policy Agent (OPA)": [("deny.rego", 'package main\n\ndeny[msg] {\n  input.kind == "Pod"\n  msg := "no"\n}\n')],
+    "Pulumi": [("policy.py", "from pulumi_policy import PolicyPack, ResourceValidationPolicy\n"),
+               ("index.ts", 'import * as policy from "@pulumi/policy";\n')],
+    "Cedar Policy Language (CPL)": [("policy.cedar", "permit(principal, action, resource);\n")],
+    "Kyverno OSS": [("require-labels.yaml", "apiVersion: kyverno.io/v1\nkind: ClusterPolicy\nmetadata:\n  name: require-labels\n")],
+    "Cloud Custodian": [("s3.yml", "# cloud custodian policies\npolicies:\n  - name: s3-encrypt\n    resource: aws.s3\n")],
+    "AWS Config": [("s3.guard", "AWS::S3::Bucket {\n  Properties.BucketEncryption exists\n}\n")],
+    "OpagateKeeper": [("template.yaml", "apiVersion: templates.gatekeeper.sh/v1\nkind: ConstraintTemplate\nmetadata:\n  name: k8srequiredlabels\n")],
+    "Kubewarden": [("policy-server.yaml", "apiVersion: policies.kubewarden.io/v1\nkind: PolicyServer\nmetadata:\n  name: default\n")],
+}
+
+# Files that mention a PaC keyword without being a policy; scanners should not count them.
+DECOYS = [
+    ("README.md", "This chart can install a Kyverno ClusterPolicy and a Gatekeeper ConstraintTemplate.\n"),
+    ("values.yaml", "# enable to render the ClusterPolicy and PolicyServer objects\nenabled: false\nkind: ConfigMap\n"),
+    ("notes.json", '{"comment": "see PolicyText in the AWS Config docs"}\n'),
+]
+
+NOISE_EXTENSIONS = [".py", ".go", ".js", ".ts", ".java", ".yaml", ".yml", ".json", ".md", ".txt", ".png"]
+WORDS = ("import def func return value config service deploy cluster resource policy model train "
+         "data input output module package const let var class test build").split()
+
+
+def _load_templates(policies_root: Optional[str], per_tool: int, rnd: random.Random) -> Dict[str, List[tuple]]:
+    """ Sample up to `per_tool` real policy files per tool from `policies_root/<tool>/<repo>/`. """
+    templates = {}
+    for tool in PAC_TOOLS:
+        paths = []
+        tool_dir = os.path.join(policies_root, tool) if policies_root else None
+        if tool_dir and os.path.isdir(tool_dir):
+            for root, _, files in os.walk(tool_dir):
+                paths.extend(os.path.join(root, f) for f in files)
+        paths.sort()
+        chosen = []
+        for path in rnd.sample(paths, min(per_tool, len(paths))):
+            with open(path, "rb") as f:
+                chosen.append((os.path.basename(path), f.read()))
+        templates[tool] = chosen or [(name, body.encode("utf-8")) for name, body in FALLBACK_POLICIES[tool]]
+    return templates
+
+
+def _noise(rnd: random.Random, size: int) -> bytes:
+    words = rnd.choices(WORDS, k=max(1, size // 6))
+    lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+    return ("\n".join(lines) + "\n").encode("utf-8")[:max(size, 1)]
+
+
+def _write(path: str, content: bytes) -> int:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    return len(content)
+
+
+def generate_clone_tree(
+    output_dir: str,
+    n_repos: int = 50,
+    seed: int = 0,
+    policies_root: Optional[str] = "./policies",
+    median_files: int = 150,
+    pac_probability: float = 0.6,
+    node_modules_probability: float = 0.3,
+    bundle_mb: float = 2.0
+) -> str:
+    """
+    Build a reproducible clone directory shaped like `clone_repos_from_csv` output:
+    `output_dir/<owner>__<repo>/...` with a README, nested source files, a `.git` directory,
+    optional `node_modules` noise (including large vendored JS bundles), seeded PaC files for
+    all nine tools copied from `policies_root`, and decoy files that only mention PaC keywords.
+
+    A ground-truth manifest `<output_dir>_manifest.csv` (path, tool, kind) is written next to the tree.
+
+    :param output_dir: Directory to create the repositories in.
+    :param n_repos: Number of repositories.
+    :param seed: Seed for every random choice; same seed -> byte-identical tree.
+    :param policies_root: Extracted policy corpus to seed PaC files from (falls back to snippets).
+    :param median_files: Median number of ordinary files per repo (log-normal distribution).
+    :param pac_probability: Probability that a repository contains any PaC files.
+    :param node_modules_probability: Probability that a repository has a `node_modules` tree.
+    :param bundle_mb: Size of the largest vendored JS bundle in MB.
+    :return: Path to the manifest CSV.
+    """
+    rnd = random.Random(seed)
+    templates = _load_templates(policies_root, per_tool=50, rnd=rnd)
+    manifest = []
+    os.makedirs(output_dir, exist_ok=True)
+
+    for i in range(n_repos):
+        repo_dir = os.path.join(output_dir, f"org{i // 4}__repo-{i}")
+        _write(os.path.join(repo_dir, "README.md"), _noise(rnd, rnd.randint(200, 20000)))
+
+        n_files = max(1, int(rnd.lognormvariate(0, 1) * median_files))
+        for j in range(n_files):
+            depth = rnd.randint(0, 4)
+            subdir = os.path.join(*[f"d{rnd.randint(0, 5)}" for _ in range(depth)]) if depth else ""
+            ext = rnd.choice(NOISE_EXTENSIONS)
+            size = int(rnd.lognormvariate(8, 1.2))  # median ~3 KB, long tail
+            _write(os.path.join(repo_dir, subdir, f"file{j}{ext}"), _noise(rnd, size))
+
+        for j in range(rnd.randint(5, 40)):
+            _write(os.path.join(repo_dir, ".git", "objects", f"{j % 256:02x}", f"obj{j}"), _noise(rnd, 512))
+
+        if rnd.random() < node_modules_probability:
+            for j in range(rnd.randint(20, 200)):
+                _write(os.path.join(repo_dir, "node_modules", f"pkg{j % 30}", f"index{j}.js"), _noise(rnd, rnd.randint(100, 8000)))
+            bundle = _noise(rnd, int(bundle_mb * 1024 * 1024 * rnd.random()))
+            _write(os.path.join(repo_dir, "node_modules", "vendor", "bundle.min.js"), bundle)
+
+        if rnd.random() < pac_probability:
+            for tool in rnd.sample(PAC_TOOLS, rnd.randint(1, 3)):
+                for k in range(rnd.randint(1, 8)):
+                    name, content = rnd.choice(templates[tool])
+                    rel = os.path.join("policies", tool.split()[0].lower(), f"p{k}", name)
+                    _write(os.path.join(repo_dir, rel), content)
+                    manifest.append({"path": os.path.join(os.path.basename(repo_dir), rel), "tool": tool, "kind": "policy"})
+
+        if rnd.random() < 0.3:
+            name, body = rnd.choice(DECOYS)
+            rel = os.path.join("docs", name)
+            _write(os.path.join(repo_dir, rel), body.encode("utf-8"))
+            manifest.append({"path": os.path.join(os.path.basename(repo_dir), rel), "tool": "", "kind": "decoy"})
+
+    manifest_path = f"{os.path.normpath(output_dir)}_manifest.csv"
+    with open(manifest_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["path", "tool", "kind"])
+        writer.writeheader()
+        writer.writerows(manifest)
+    return manifest_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic clone tree for scan benchmarks.')
+    parser.add_argument('output_dir')
+    parser.add_argument('--repos', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policies', default='./policies', help='Policy corpus to seed PaC files from.')
+    parser.add_argument('--median-files', type=int, default=150)
+    args = parser.parse_args()
+    print(generate_clone_tree(args.output_dir, args.repos, args.seed, args.policies, args.median_files))
@@ -0,0 +1,325 @@
+""" Offline stand-in for the GitHub REST search/repos/contributors/commits endpoints and GraphQL. """
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+TOPICS = [
+    'machine-learning', 'deep-learning', 'chatbot', 'computer-vision', 'tensorflow',
+    'kubernetes', 'terraform', 'policy-as-code', 'opa', 'security'
+]
+LANGUAGES = ['Python', 'Go', 'TypeScript', 'JavaScript', 'Java', 'HCL', 'Open Policy Agent', None]
+SEARCH_RESULT_CAP = 1000  # GitHub never returns more than the first 1000 search results
+RATE_LIMITS = {'core': 5000, 'search': 30, 'graphql': 5000}
+
+
+def _stable_hash(*parts: str) -> int:
+    return int.from_bytes(hashlib.md5("\0".join(parts).encode("utf-8")).digest()[:8], "big")
+
+
+class FakeGitHub:
+    """
+    Seeded in-memory GitHub: a fixed population of repositories plus deterministic answers
+    to code searches, so two runs with the same seed see exactly the same API.
+
+    Error injection: `inject_error(r"/search/code", 502, times=3)` makes the next three
+    matching requests fail; `error_rate` fails a seeded fraction of all requests with 5xx.
+
+        with FakeGitHub(n_repos=500).serve() as fake:
+            GitHub_CONFIG['api_url'] = fake.url
+    """
+
+    def __init__(self, n_repos: int = 2000, seed: int = 0, error_rate: float = 0.0,
+                 rate_limits: Optional[Dict[str, int]] = None, latency: float = 0.0):
+        self.seed = seed
+        self.error_rate = error_rate
+        self.latency = latency
+        self.rate_limits = dict(RATE_LIMITS, **(rate_limits or {}))
+        self.random = random.Random(seed)
+        self.repos = [self._make_repo(i) for i in range(n_repos)]
+        self.by_name = {repo["full_name"]: repo for repo in self.repos}
+        self.injected: List[Dict] = []
+        self.requests = 0
+        self.quota_used = {resource: 0 for resource in self.rate_limits}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # -- dataset -----------------------------------------------------------------------------
+
+    def _make_repo(self, i: int) -> Dict:
+        rnd = self.random
+        owner = f"org{i // 5}"
+        name = f"repo-{i}"
+        topics = rnd.sample(TOPICS, rnd.randint(0, 4))
+        stars = int(rnd.paretovariate(1.2)) - 1
+        return {
+            "id": i + 1,
+            "name": name,
+            "full_name": f"{owner}/{name}",
+            "owner": {"login": owner},
+            "description": f"Synthetic {' '.join(topics) or 'project'} repository #{i}",
+            "topics": topics,
+            "created_at": f"20{15 + i % 10}-0{1 + i % 9}-1{i % 10}T00:00:00Z",
+            "updated_at": "2025-05-01T00:00:00Z",
+            "size": rnd.randint(1, 500000),
+            "stargazers_count": stars,
+            "language": rnd.choice(LANGUAGES),
+            "has_issues": rnd.random() > 0.1,
+            "forks_count": int(stars * rnd.random()),
+            "archived": rnd.random() < 0.05,
+            "open_issues_count": rnd.randint(0, 50),
+            "open_issues": 0,
+            "fork": False,
+            "contributors": max(1, int(rnd.paretovariate(1.5))),
+            "commits": rnd.randint(1, 60),
+        }
+
+    def _search_repositories(self, query: str) -> List[Dict]:
+        topic = re.search(r"topic:(\S+)", query)
+        stars = re.search(r"stars:(>?)(\d+)(?:\.\.(\d+))?", query)
+        results = []
+        for repo in self.repos:
+            if topic and topic.group(1) not in repo["topics"]:
+                continue
+            if stars:
+                count = repo["stargazers_count"]
+                if stars.group(1) and not count > int(stars.group(2)):
+                    continue
+                if stars.group(3) and not int(stars.group(2)) <= count <= int(stars.group(3)):
+                    continue
+                if not stars.group(1) and not stars.group(3) and count != int(stars.group(2)):
+                    continue
+            results.append(repo)
+        return sorted(results, key=lambda r: -r["stargazers_count"])
+
+    def _search_code(self, query: str) -> List[Dict]:
+        scoped = re.search(r"repo:(\S+)", query)
+        if scoped:
+            repo = self.by_name.get(scoped.group(1))
+            hit = repo is not None and _stable_hash(str(self.seed), query) % 2 == 0
+            return [self._code_item(repo, query)] if hit else []
+        # Each distinct query matches a stable ~10% of the population.
+        return [self._code_item(repo, query) for repo in self.repos
+                if _stable_hash(str(self.seed), query, repo["full_name"]) % 10 == 0]
+
+    @staticmethod
+    def _code_item(repo: Dict, query: str) -> Dict:
+        return {
+            "name": "policy.rego",
+            "path": f"policies/{_stable_hash(query) % 97}/policy.rego",
+            "repository": {key: repo[key] for key in ("id", "name", "full_name", "owner")},
+        }
+
+    # -- error injection / accounting --------------------------------------------------------
+
+    def inject_error(self, path_pattern: str, status: int, times: int = 1, message: str = "Injected error") -> None:
+        """ Fail the next `times` requests whose path matches `path_pattern` with `status`. """
+        with self._lock:
+            self.injected.append({"pattern": re.compile(path_pattern), "status": status,
+                                  "times": times, "message": message})
+
+    def _take_injected(self, path: str) -> Optional[Dict]:
+        with self._lock:
+            for rule in self.injected:
+                if rule["times"] > 0 and rule["pattern"].search(path):
+                    rule["times"] -= 1
+                    return rule
+        return None
+
+    def _consume(self, resource: str) -> Dict[str, str]:
+        with self._lock:
+            self.requests += 1
+            self.quota_used[resource] += 1
+            used = self.quota_used[resource]
+        limit = self.rate_limits[resource]
+        return {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(max(0, limit - used)),
+            "X-RateLimit-Used": str(used),
+            "X-RateLimit-Reset": str(int(time.time()) + 60),
+            "X-RateLimit-Resource": resource,
+        }
+
+    def reset_quota(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.quota_used = {resource: 0 for resource in self.rate_limits}
+
+    # -- HTTP --------------------------------------------------------------------------------
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> "FakeGitHub":
+        fake = self
+
+        class Handler(_Handler):
+            github = fake
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeGitHub":
+        return self if self._server else self.serve()
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    github: FakeGitHub
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:  # silence per-request stderr lines
+        pass
+
+    def _send(self, status: int, body, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _guard(self, path: str, resource: str) -> Optional[Dict[str, str]]:
+        """ Apply latency, quota and error injection. Returns rate-limit headers, or None if handled. """
+        fake = self.github
+        if fake.latency:
+            time.sleep(fake.latency)
+        headers = fake._consume(resource)
+        if int(headers["X-RateLimit-Used"]) > fake.rate_limits[resource]:
+            self._send(403, {"message": "API rate limit exceeded"}, headers)
+            return None
+        rule = fake._take_injected(path)
+        if rule:
+            self._send(rule["status"], {"message": rule["message"]}, headers)
+            return None
+        if fake.error_rate and _stable_hash(str(fake.seed), path, str(fake.requests)) % 1000 < fake.error_rate * 1000:
+            self._send(502, {"message": "Server Error"}, headers)
+            return None
+        return headers
+
+    def _paginate(self, parsed, items: List, headers: Dict[str, str], wrap_total: bool) -> None:
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        per_page = min(100, int(params.get("per_page", 30)))
+        page = max(1, int(params.get("page", 1)))
+        total = len(items)
+        reachable = min(total, SEARCH_RESULT_CAP) if wrap_total else total
+        if wrap_total and (page - 1) * per_page >= SEARCH_RESULT_CAP:
+            self._send(422, {"message": "Only the first 1000 search results are available"}, headers)
+            return
+        chunk = items[(page - 1) * per_page: page * per_page]
+        last = max(1, -(-reachable // per_page))
+        links = []
+        base = f"{self.github.url}{parsed.path}"
+        for rel, target in (("next", page + 1), ("last", last)) if page < last else ():
+            links.append(f'<{base}?{urlencode(dict(params, page=target))}>; rel="{rel}"')
+        if page > 1:
+            links.append(f'<{base}?{urlencode(dict(params, page=page - 1))}>; rel="prev"')
+        if links:
+            headers["Link"] = ", ".join(links)
+        body = {"total_count": total, "incomplete_results": False, "items": chunk} if wrap_total else chunk
+        self._send(200, body, headers)
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        path = parsed.path
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        fake = self.github
+
+        if path.startswith("/search/"):
+            headers = self._guard(path, "search")
+            if headers is None:
+                return
+            if path == "/search/repositories":
+                items = [_public(repo) for repo in fake._search_repositories(params.get("q", ""))]
+            elif path == "/search/code":
+                items = fake._search_code(params.get("q", ""))
+            else:
+                self._send(404, {"message": "Not Found"}, headers)
+                return
+            self._paginate(parsed, items, headers, wrap_total=True)
+            return
+
+        match = re.fullmatch(r"/repos/([^/]+/[^/]+)(/contributors|/commits)?", path)
+        if not match:
+            headers = self._guard(path, "core")
+            if headers is not None:
+                self._send(404, {"message": "Not Found"}, headers)
+            return
+
+        repo = fake.by_name.get(match.group(1))
+        # Conditional requests answered with 304 do not count against the quota.
+        if repo is not None and match.group(2) is None:
+            body = _public(repo)
+            etag = '"' + hashlib.md5(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, None, {"ETag": etag})
+                return
+        headers = self._guard(path, "core")
+        if headers is None:
+            return
+        if repo is None:
+            self._send(404, {"message": "Not Found"}, headers)
+        elif match.group(2) is None:
+            headers["ETag"] = etag
+            self._send(200, body, headers)
+        elif match.group(2) == "/contributors":
+            people = [{"login": f"user{i}", "contributions": repo["contributors"] - i}
+                      for i in range(repo["contributors"])]
+            self._paginate(parsed, people, headers, wrap_total=False)
+        else:
+            commits = [{"sha": hashlib.sha1(f"{repo['full_name']}{i}".encode()).hexdigest(),
+                        "commit": {"author": {"date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T00:00:00Z"}}}
+                       for i in range(repo["commits"])]
+            self._paginate(parsed, commits, headers, wrap_total=False)
+
+    def do_POST(self) -> None:
+        if urlparse(self.path).path != "/graphql":
+            self._send(404, {"message": "Not Found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        query = json.loads(self.rfile.read(length) or b"{}").get("query", "")
+        headers = self._guard("/graphql", "graphql")
+        if headers is None:
+            return
+        data: Dict = {"rateLimit": {"limit": int(headers["X-RateLimit-Limit"]),
+                                    "remaining": int(headers["X-RateLimit-Remaining"]), "cost": 1}}
+        for alias, owner, name in re.findall(r'(\w+)\s*:\s*repository\(\s*owner:\s*"([^"]+)"\s*,\s*name:\s*"([^"]+)"', query) \
+                or [("repository", *m) for m in re.findall(r'repository\(\s*owner:\s*"([^"]+)"\s*,\s*name:\s*"([^"]+)"', query)]:
+            repo = self.github.by_name.get(f"{owner}/{name}")
+            data[alias] = None if repo is None else {
+                "nameWithOwner": repo["full_name"],
+                "stargazerCount": repo["stargazers_count"],
+                "forkCount": repo["forks_count"],
+                "isArchived": repo["archived"],
+                "createdAt": repo["created_at"],
+                "primaryLanguage": {"name": repo["language"]} if repo["language"] else None,
+                "mentionableUsers": {"totalCount": repo["contributors"]},
+                "defaultBranchRef": {"target": {"history": {"totalCount": repo["commits"]}}},
+            }
+        self._send(200, {"data": data}, headers)
+
+
+def _public(repo: Dict) -> Dict:
+    """ Drop the fields used only to synthesise sub-resources. """
+    return {k: v for k, v in repo.items() if k not in ("contributors", "commits")}
@@ -0,0 +1,197 @@
+""" Offline stand-in for an OpenAI-compatible chat completions endpoint. """
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+CATEGORIES = {
+    "Security Governance": ["Access Control", "Configuration Validation", "Secrets Management",
+                            "Network Management", "Resource Management", "Vulnerability Management"],
+    "Compliance Governance": ["Resource Compliance", "Service Compliance", "Standards Enforcement"],
+    "Cost Optimization": [""],
+    "Workflow Automation": [""],
+    "Deployment Governance": ["Access Control", "Key Management"],
+}
+# "### POLICY <id>" blocks of a batched prompt, each running until the next block or the closing instructions.
+_POLICY_BLOCK = re.compile(r"^### POLICY (\S+)[^\n]*\n(.*?)(?=^### POLICY |\n\nPlease return only)", re.M | re.S)
+TARGETS = ["Kubernetes Pod", "Terraform", "Dockerfile", "Network", "Clouds environment", "YAML", "API"]
+
+
+def _stable_hash(*parts: str) -> int:
+    return int.from_bytes(hashlib.md5("\0".join(parts).encode("utf-8")).digest()[:8], "big")
+
+
+class FakeLLM:
+    """
+    Deterministic chat model: the answer to a prompt depends only on the prompt, the model
+    name and `seed`, so cached and live runs can be compared exactly.
+
+    The reply is the seven-field taxonomy JSON the RQ4 prompt asks for, or for a batched
+    prompt ("### POLICY <id>" blocks) a JSON array with one such object per id, where
+    `drop_rate` leaves out a seeded fraction of ids. `fence_rate` wraps a seeded fraction of
+    replies in ```json fences and `malformed_rate` truncates a fraction mid-object, like real
+    model output. `error_rate` answers a fraction of requests with 429 (with Retry-After) and
+    `inject_error(status, times)` fails the next requests. Each request takes `latency` plus
+    `token_latency` per completion token (generation time).
+
+        with FakeLLM(latency=0.05) as fake:
+            LLM_CONFIG['base_url'] = fake.url
+    """
+
+    def __init__(self, seed: int = 0, latency: float = 0.0, error_rate: float = 0.0,
+                 fence_rate: float = 0.3, malformed_rate: float = 0.0, retry_after: float = 0.05,
+                 drop_rate: float = 0.0, token_latency: float = 0.0):
+        self.seed = seed
+        self.latency = latency
+        self.error_rate = error_rate
+        self.fence_rate = fence_rate
+        self.malformed_rate = malformed_rate
+        self.retry_after = retry_after
+        self.drop_rate = drop_rate
+        self.token_latency = token_latency
+        self.injected: List[Dict] = []
+        self.requests = 0
+        self.completions = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def judgement(self, model: str, code: str) -> Dict:
+        """ The taxonomy entry for one snippet. """
+        h = _stable_hash(str(self.seed), model, code)
+        category = sorted(CATEGORIES)[h % len(CATEGORIES)]
+        subs = CATEGORIES[category]
+        body = {
+            "Primary Purpose": f"Govern {category.split()[0].lower()} concerns of the resource.",
+            "Sub-purpose": f"Check rule #{h % 97} of the policy set.",
+            "Taxonomy Category": category,
+            "Taxonomy Sub-category": subs[(h >> 8) % len(subs)],
+            "Policy Implemented": f"Deny configurations violating rule #{h % 97}.",
+            "Target Resource": TARGETS[(h >> 16) % len(TARGETS)],
+            "Rationale": "The policy evaluates the input and rejects non-compliant objects.",
+        }
+        return body
+
+    def answer(self, model: str, prompt: str, request: str = "") -> str:
+        """ The reply text for `prompt` (what the endpoint returns on success); drops vary per `request`. """
+        h = _stable_hash(str(self.seed), model, prompt)
+        blocks = _POLICY_BLOCK.findall(prompt)
+        if blocks:
+            entries = []
+            for item_id, code in blocks:
+                if _stable_hash(str(self.seed), "drop", item_id, request) % 1000 < self.drop_rate * 1000:
+                    continue
+                entries.append({"id": item_id, **self.judgement(model, code.strip())})
+            text = json.dumps(entries, indent=2)
+        else:
+            text = json.dumps(self.judgement(model, prompt), indent=2)
+        if (h >> 24) % 1000 < self.malformed_rate * 1000:
+            text = text[: len(text) // 2]
+        if (h >> 34) % 1000 < self.fence_rate * 1000:
+            text = f"```json\n{text}\n```"
+        return text
+
+    def inject_error(self, status: int, times: int = 1, message: str = "Injected error") -> None:
+        """ Fail the next `times` completion requests with `status`. """
+        with self._lock:
+            self.injected.append({"status": status, "times": times, "message": message})
+
+    def _take_injected(self) -> Optional[Dict]:
+        with self._lock:
+            for rule in self.injected:
+                if rule["times"] > 0:
+                    rule["times"] -= 1
+                    return rule
+        return None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> "FakeLLM":
+        fake = self
+
+        class Handler(_Handler):
+            llm = fake
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeLLM":
+        return self if self._server else self.serve()
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    llm: FakeLLM
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:  # silence per-request stderr lines
+        pass
+
+    def _send(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self) -> None:
+        fake = self.llm
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not re.fullmatch(r"/v1/chat/completions/?", self.path):
+            self._send(404, {"error": {"message": "Not Found"}})
+            return
+        with fake._lock:
+            fake.requests += 1
+            n = fake.requests
+        rule = fake._take_injected()
+        if rule:
+            time.sleep(fake.latency)
+            self._send(rule["status"], {"error": {"message": rule["message"]}})
+            return
+        if fake.error_rate and _stable_hash(str(fake.seed), str(n)) % 1000 < fake.error_rate * 1000:
+            time.sleep(fake.latency)
+            self._send(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                       {"Retry-After": str(fake.retry_after)})
+            return
+
+        model = request.get("model", "")
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        text = fake.answer(model, prompt, str(n))
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(text) // 4
+        time.sleep(fake.latency + fake.token_latency * completion_tokens)
+        with fake._lock:
+            fake.completions += 1
+            fake.prompt_tokens += prompt_tokens
+            fake.completion_tokens += completion_tokens
+        self._send(200, {
+            "id": f"chatcmpl-{_stable_hash(prompt, str(n)):x}",
+            "object": "chat.completion",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
@@ -2,9 +2,16 @@ GitHub_CONFIG = {
     'token': [""],
     'per_page': 100,
     'max_retries': 5,
+    'api_url': 'https://api.github.com',
+    'request_delay': (60, 65),  # seconds between requests, drawn from range(low, high)
 
 }
 
+LOG_CONFIG = {
+    'structured': False,  # JSON lines instead of plain text
+    'debug_per_second': 200,  # rate limit for per-file DEBUG records, 0 = unlimited
+}
+
 REPO_CONFIG = {
     'synonyms': [
         'machine-learning',
@@ -35,7 +42,66 @@ PATH_FILE = {
     'cloud': 'filtered_cloud_repos.csv',
     'aws': 'aws-analysis.csv',
     'azure': 'azure-analysis.csv',
-    'gcp': 'google-analysis.csv'
+    'gcp': 'google-analysis.csv',
+    'clone': 'C:/Users/fpatr/OneDrive/Documents/Adoption of policies as code in ML based application/clone',
+    'pac_merged': './output/pac_merged.csv',  # rebuilt by -mg; Full_Merged_Dataset.csv is the hand-built original
+    # Repository fields and contributor counts joined by `-mg`; each entry lists the parts of one table.
+    'pac_metadata': ['PaC_Repos_final_Dataset.csv', 'pac_repos_Kubewarden_enriched.csv'],
+    'pac_contributors': ['merged_pac_repos_enriched_11.csv', 'merged_pac_repos_enriched_22.csv',
+                         'merged_pac_repos_enriched_33.csv', 'merged_pac_repos_enriched_44.csv',
+                         'PaC_Repos_final_Dataset.csv', 'pac_repos_Kubewarden_enriched_contributor.csv'],
+    'readmes_raw': './output/readmes_raw',
+    'readmes_parquet': './output/readmes.parquet',
+    'readmes_excel': './repo_readmes_cleaned.xlsx',
+    'workbook_cache': './output/workbook_cache',  # parsed results workbooks (analysis.combine_results)
+    'policy_index': './output/policy_index.sqlite',  # file index of policies/ (data_collection.policy_index)
+    'search_index': './output/search_index'  # trigram postings of policies/ (analysis.policy_search)
 }
 
 
+
+# Code search outputs (see `search_pac_repos_by_extension`) and the presence flag each one sets.
+PAC_OUTPUTS = {
+    './data/pac_repos_rego.csv': 'has_rego',
+    './data/pac_repos_sentinel.csv': 'has_sentinel',
+    './data/pac_repos__pulumi_in_file_language_JavaScript.csv': 'has_pulumi',
+    './data/pac_repos_pulumi_policy_in_file_extension_go.csv': 'has_pulumi',
+    './data/pac_repos_pulumi_policy_in_file_extension_py.csv': 'has_pulumi',
+    './data/pac_repos_cedar.csv': 'has_cedar',
+    './data/pac_repos_cedarJson.csv': 'has_cedar',
+    './data/pac_repos_cedarschemaJson.csv': 'has_cedar',
+    './data/pac_repos_ClusterPolicy_in_file_extension_yaml.csv': 'has_kyverno',
+    './data/pac_repos_custodian_in_file_extension_yaml.csv': 'has_custodian',
+    './data/pac_repos_custodian_in_file_extension_yml.csv': 'has_custodian',
+    './data/pac_repos_guard.csv': 'has_awsconfigcloudgaurd',
+    './data/pac_repos_PolicyText_in___file_extension_json.csv': 'has_awsconfigcloudgaurd',
+    './data/pac_repos_PolicyRuntime_in___file_extension_json.csv': 'has_awsconfigcloudgaurd',
+    './data/pac_repos_ConstraintTemplate_in_file_extension_yaml.csv': 'has_opagatekeeper',
+}
+
+# Matching rule for Kyverno, Gatekeeper and Kubewarden YAML in the clone scanners (-u, -o):
+# 'keyword' = kind name anywhere in the file, 'header' = declared in a YAML document's apiVersion/kind header.
+SCAN_CONFIG = {
+    'detection': 'keyword',
+    # README extraction (-r): reader threads, and whether to also stream PATH_FILE['readmes_excel']
+    'readme_workers': 8,
+    'readme_excel': False
+}
+
+# LLM-as-judge runner (analysis.llm_judge): any OpenAI-compatible chat completions endpoint.
+LLM_CONFIG = {
+    'base_url': 'https://api.openai.com/v1',
+    'api_key': '',  # empty = read OPENAI_API_KEY from the environment
+    'model': 'gpt-4o-mini',
+    'temperature': 0.2,
+    'concurrency': 8,  # requests in flight
+    'max_retries': 5,
+    'parse_retries': 2,  # re-asks for replies that fail the taxonomy schema (parser.llm_json)
+    'timeout': 120,  # seconds per request
+    'batch_tokens': 12000,  # prompt tokens per packed request (run_judge_batched)
+    'batch_items': 12,  # policies per packed request, bounds the reply length
+    'cache': './output/llm_cache.sqlite',
+    'embedding_model': 'text-embedding-3-small',  # analysis.fewshot OpenAIEmbedder
+    'embedding_cache': './output/embedding_cache.sqlite',
+    'progress': './output/llm_judge'
+}
@@ -5,7 +5,7 @@ import pandas as pd
 
 from config.constant import GitHub_CONFIG
 from util.log import configure_logger
-from util.requests_timer import delay_next_request
+from util.requests_timer import delay_next_request, github_get
 from util.util import *
 
 logger = configure_logger('github-data_logger', 'logging_file.log')
@@ -20,7 +20,7 @@ def search_code_in_repo(owner: str, repo: str, query: str) -> bool:
     :param repo: The repository name, e.g. 'terraform'
     :param query: The code search query, e.g. 'filename:Dockerfile'
     """
-    url = "https://api.github.com/search/code"
+    url = f"{GitHub_CONFIG['api_url']}/search/code"
     # We combine the user-supplied query with 'repo:owner/repo'
     # so GitHub looks specifically in that repo.
     # Example final query: "filename:Dockerfile repo:hashicorp/terraform"
@@ -36,7 +36,7 @@ def search_code_in_repo(owner: str, repo: str, query: str) -> bool:
     }
 
     try:
-        resp = requests.get(url, headers=headers, params=params)
+        resp = github_get(url, headers=headers, params=params)
         if resp.status_code == 200:
             data = resp.json()
             count = data.get('total_count', 0)
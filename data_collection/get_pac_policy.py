@@ -1,82 +1,90 @@
 import os
-import shutil
 
+from config.constant import PATH_FILE
+from data_collection.get_pac_usage import contains_keywords, kind_matcher
+from data_collection.policy_store import PolicyStore
+from util import metrics
 from util.log import configure_logger
 
 logger = configure_logger('github-data_logger', 'logging_file.log')
 
 def extract_and_save_policy_files(
-    base_path: str = "C:/Users/fpatr/OneDrive/Documents/Adoption of policies as code in ML based application/clone",
-    output_root: str = "./policies"
-) -> None:
+    base_path: str = PATH_FILE['clone'],
+    output_root: str = "./policies",
+    detection: str = "keyword",
+    link: str = "hardlink"
+) -> str:
     """
     Recursively scan cloned repositories in `base_path`, detect policy files associated
-    with known Policy-as-Code (PaC) tools, and copy them into a structured folder
-    hierarchy: ./policies/{tool_name}/{repo_name}/
+    with known Policy-as-Code (PaC) tools, and expose them in a structured folder
+    hierarchy: ./policies/{tool_name}/{repo_name}/{path inside the repo}
 
-    Each policy file is saved in its original form for future inspection or analysis.
+    Each policy file is stored once by content hash (see `PolicyStore`) and linked into that
+    hierarchy in its original form, so identical vendored files are written a single time and
+    same-named files from different subdirectories no longer overwrite each other.
 
     Parameters:
         base_path (str): Root folder where all repositories are cloned.
         output_root (str): Base folder to store extracted policy files by tool.
-    """
+        detection (str): "keyword" or "header" matching for Kyverno, Gatekeeper and Kubewarden.
+        link (str): "hardlink", "reflink" or "copy" for the per-tool/per-repo view.
 
-    def contains_keywords(file_path, keywords):
-        """Check if a file contains any of the specified keywords."""
-        try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-                return any(keyword in content for keyword in keywords)
-        except Exception:
-            return False
+    Returns:
+        str: Path to the manifest CSV recording the source path of every extracted file.
+    """
+    match_kind = kind_matcher(detection)
+    with PolicyStore(output_root, link=link) as store:
+        for repo_name in os.listdir(base_path):
+            repo_path = os.path.join(base_path, repo_name)
+            if not os.path.isdir(repo_path):
+                continue
 
-    for repo_name in os.listdir(base_path):
-        repo_path = os.path.join(base_path, repo_name)
-        if not os.path.isdir(repo_path):
-            continue
+            for root, _, files in os.walk(repo_path):
+                metrics.incr("files_visited_total", len(files), scanner="policy")
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    fname = file.lower()
+                    file_path = os.path.normpath(file_path)
 
-        for root, _, files in os.walk(repo_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                fname = file.lower()
-                file_path = os.path.normpath(file_path)
+                    # Match for each known PaC tool and store accordingly
+                    def save(tool_name):
+                        metrics.incr("pac_files_matched_total", scanner="policy", tool=tool_name)
+                        try:
+                            with metrics.stage_timer("file_copy"):
+                                dest_file_path = store.add(file_path, tool_name, repo_name,
+                                                           os.path.relpath(file_path, repo_path))
+                            logger.debug("[%s] %s -> %s", tool_name, file_path, dest_file_path,
+                                         extra={"tool": tool_name, "file": file_path})
+                        except (FileNotFoundError, OSError) as e:
+                            logger.warning(f"[Skipping] Could not store file: {file_path}. Reason: {e}")
 
-                # Match for each known PaC tool and copy accordingly
-                def save(tool_name):
-                    dest_dir = os.path.join(output_root, tool_name, repo_name)
-                    os.makedirs(dest_dir, exist_ok=True)
-                    dest_file_path = os.path.join(dest_dir, file)
-                    dest_file_path = os.path.normpath(dest_file_path)
-                    try:
-                        shutil.copy2(file_path, dest_file_path)
-                    except (FileNotFoundError, OSError) as e:
-                        logger.warning(f"[Skipping] Could not copy file: {file_path} -> {dest_file_path}. Reason: {e}")
+                    if fname.endswith(".sentinel"):
+                        save("HashiCorp Sentinel")
+                    elif fname.endswith(".rego"):
+                        save("Open Policy Agent (OPA)")
+                    elif fname.endswith(".go") and contains_keywords(file_path, ["pulumi-policy"]):
+                        save("Pulumi")
+                    elif fname.endswith(".py") and contains_keywords(file_path, ["pulumi_policy"]):
+                        save("Pulumi")
+                    elif fname.endswith(".java") and contains_keywords(file_path, ["com.pulumi"]):
+                        save("Pulumi")
+                    elif fname.endswith((".js", ".ts")) and contains_keywords(file_path, ["@pulumi"]):
+                        save("Pulumi")
+                    elif fname.endswith((".cedar", ".cedar.json", ".cedarschema.json")):
+                        save("Cedar Policy Language (CPL)")
+                    elif fname.endswith((".yaml", ".yml")) and match_kind(file_path, ["ClusterPolicy"]):
+                        save("Kyverno OSS")
+                    elif fname.endswith((".yaml", ".yml")) and contains_keywords(file_path, ["custodian"]):
+                        save("Cloud Custodian")
+                    elif fname.endswith(".guard"):
+                        save("AWS Config")
+                    elif fname.endswith(".json") and contains_keywords(file_path, ["PolicyText", "PolicyRuntime"]):
+                        save("AWS Config")
+                    elif fname.endswith((".yaml", ".yml")) and match_kind(file_path, ["ConstraintTemplate"]):
+                        save("OpagateKeeper")
+                    elif fname.endswith((".yaml", ".yml")) and match_kind(file_path, ["PolicyServer"]):
+                        save("Kubewarden")
+                    elif fname.endswith((".yaml", ".yml")) and match_kind(file_path, ["ClusterAdmissionPolicy"]):
+                        save("Kubewarden")
 
-                if fname.endswith(".sentinel"):
-                    save("HashiCorp Sentinel")
-                elif fname.endswith(".rego"):
-                    save("Open Policy Agent (OPA)")
-                elif fname.endswith(".go") and contains_keywords(file_path, ["pulumi-policy"]):
-                    save("Pulumi")
-                elif fname.endswith(".py") and contains_keywords(file_path, ["pulumi_policy"]):
-                    save("Pulumi")
-                elif fname.endswith(".java") and contains_keywords(file_path, ["com.pulumi"]):
-                    save("Pulumi")
-                elif fname.endswith((".js", ".ts")) and contains_keywords(file_path, ["@pulumi"]):
-                    save("Pulumi")
-                elif fname.endswith(".cedar") or fname.endswith(".cedar.json") or fname.endswith(".cedarschema.json"):
-                    save("Cedar Policy Language (CPL)")
-                elif fname.endswith((".yaml", ".yml")) and contains_keywords(file_path, ["ClusterPolicy"]):
-                    save("Kyverno OSS")
-                elif fname.endswith((".yaml", ".yml")) and contains_keywords(file_path, ["custodian"]):
-                    save("Cloud Custodian")
-                elif fname.endswith(".guard"):
-                    save("AWS Config")
-                elif fname.endswith(".json") and contains_keywords(file_path, ["PolicyText", "PolicyRuntime"]):
-                    save("AWS Config")
-                elif fname.endswith((".yaml", ".yml")) and contains_keywords(file_path, ["ConstraintTemplate"]):
-                    save("OpagateKeeper")
-                elif fname.endswith((".yaml", ".yml")) and contains_keywords(file_path, ["PolicyServer"]):
-                    save("Kubewarden")
-                elif fname.endswith((".yaml", ".yml")) and contains_keywords(file_path, ["ClusterAdmissionPolicy"]):
-                    save("Kubewarden")
+    return store.manifest_path
@@ -1,67 +1,225 @@
+import csv
 import os
-import pandas as pd
-import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
 
-import os
+from config.constant import PATH_FILE
+from util import metrics
+from util.readme_clean import clean_excel_string
+from util.log import configure_logger
 
-def save_readmes_as_raw_files(
-    base_path: str = "C:/Users/fpatr/OneDrive/Documents/Adoption of policies as code in ML based application/clone",
-    output_dir: str = "./output/readmes_raw"
-) -> None:
+logger = configure_logger('github-data_logger', 'logging_file.log')
+
+README_FIELDS = ["full_name", "readme_file", "size", "readme_content"]
+
+def find_readme(repo_path: str) -> Optional[str]:
+    """ Return the first top-level file of `repo_path` whose name starts with "readme", if any. """
+    for file in os.listdir(repo_path):
+        if file.lower().startswith("readme"):
+            return file
+    return None
+
+
+def read_readme(repo_name: str, repo_path: str, raw_dir: Optional[str] = None) -> Dict:
     """
-    Walks through each cloned repository in `base_path`,
-    extracts the README file content (if found),
-    and saves it as a raw .txt file in `output_dir` using the repo name.
+    Read one repository's README and, when `raw_dir` is given, save it as `<raw_dir>/<repo_name>.txt`.
 
-    Parameters:
-        base_path (str): Path where repositories are cloned.
-        output_dir (str): Directory to save README files as text.
+    Returns a record with the file name, its size on disk in bytes and the stripped content with
+    Excel-invalid control characters removed ("" when there is no README,
+    "[Error reading file]" when it cannot be read).
+    """
+    record = {"full_name": repo_name, "readme_file": "", "size": 0, "readme_content": ""}
+    file = find_readme(repo_path)
+    if file is None:
+        logger.info(f"[No README found for]: {repo_name}")
+        return record
+
+    record["readme_file"] = file
+    try:
+        with metrics.stage_timer("file_read"), open(os.path.join(repo_path, file), "r", encoding="utf-8", errors="ignore") as f:
+            content = f.read()
+            size = os.fstat(f.fileno()).st_size
+        if raw_dir:
+            with open(os.path.join(raw_dir, f"{repo_name}.txt"), "w", encoding="utf-8") as out_f:
+                out_f.write(content)
+    except Exception as e:
+        logger.error(f"[Error reading README in {repo_name}]: {e}")
+        record["readme_content"] = "[Error reading file]"
+        return record
+
+    record["size"] = size
+    record["readme_content"] = clean_excel_string(content.strip())
+    return record
+
+
+def iter_readmes(base_path: str = PATH_FILE['clone'], raw_dir: Optional[str] = None,
+                 workers: int = 8) -> Iterator[Dict]:
+    """
+    Yield one README record per repository folder in `base_path` (directory order), reading in a
+    thread pool. At most `workers * 4` READMEs are in flight, so memory does not grow with the
+    number of repositories.
     """
-    os.makedirs(output_dir, exist_ok=True)
+    if raw_dir:
+        os.makedirs(raw_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for repo_name in os.listdir(base_path):
+            repo_path = os.path.join(base_path, repo_name)
+            if not os.path.isdir(repo_path):
+                continue
+            pending.append(pool.submit(read_readme, repo_name, repo_path, raw_dir))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class _ParquetSink:
+    """ Appends record batches as Parquet row groups (requires `pip install pyarrow`). """
+
+    def __init__(self, path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([("full_name", pa.string()), ("readme_file", pa.string()),
+                                 ("size", pa.int64()), ("readme_content", pa.large_string())])
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, batch: List[Dict]) -> None:
+        self.writer.write_table(self.pa.Table.from_pylist(batch, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _CsvSink:
+    """ Appends record batches to a CSV file; the stand-in for `_ParquetSink` without pyarrow. """
+
+    def __init__(self, path: str):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=README_FIELDS)
+        self.writer.writeheader()
 
-    for repo_name in os.listdir(base_path):
-        repo_path = os.path.join(base_path, repo_name)
-        if not os.path.isdir(repo_path):
-            continue
+    def write(self, batch: List[Dict]) -> None:
+        self.writer.writerows(batch)
 
-        readme_found = False
-        for file in os.listdir(repo_path):
-            if file.lower().startswith("readme"):
-                file_path = os.path.join(repo_path, file)
-                try:
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
+    def close(self) -> None:
+        self.file.close()
 
-                    output_file = os.path.join(output_dir, f"{repo_name}.txt")
-                    with open(output_file, "w", encoding="utf-8") as out_f:
-                        out_f.write(content)
-                    readme_found = True
-                    break
-                except Exception as e:
-                    print(f"[Error reading README in {repo_name}]: {e}")
-                    break
 
-        if not readme_found:
-            print(f"[No README found for]: {repo_name}")
+class _ExcelSink:
+    """ Streams rows into a write-only openpyxl workbook (rows are flushed, not kept as cells). """
 
-    print(f"✅ README extraction complete. Files saved in: {output_dir}")
+    def __init__(self, path: str):
+        from openpyxl import Workbook
 
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Sheet1")
+        self.sheet.append(["full_name", "readme_content"])
 
-def clean_excel_string(s: str) -> str:
+    def write(self, batch: List[Dict]) -> None:
+        for record in batch:
+            self.sheet.append([record["full_name"], record["readme_content"]])
+
+    def close(self) -> None:
+        self.workbook.save(self.path)
+
+
+def extract_readmes(
+    base_path: str = PATH_FILE['clone'],
+    raw_dir: Optional[str] = PATH_FILE['readmes_raw'],
+    parquet_path: Optional[str] = PATH_FILE['readmes_parquet'],
+    excel_path: Optional[str] = None,
+    workers: int = 8,
+    batch_size: int = 256,
+    batch_bytes: int = 32 * 1024 * 1024
+) -> int:
+    """
+    Single-pass README extraction: one directory walk, a thread pool for the reads, and
+    streaming sinks. Each README is saved as a raw text file and appended to a Parquet table
+    (and optionally an XLSX sheet) in batches of `batch_size` records or `batch_bytes` characters,
+    whichever comes first, so peak memory is bounded by the batch rather than the corpus.
+    Without pyarrow the table is written as CSV next to `parquet_path` (same name, `.csv`).
+
+    Parameters:
+        base_path (str): Path where repositories are cloned.
+        raw_dir (str): Directory for `<repo>.txt` raw copies (None to skip).
+        parquet_path (str): Parquet output with full_name, readme_file, size (bytes), readme_content
+                            (None to skip).
+        excel_path (str): XLSX output with full_name, readme_content (None to skip).
+        workers (int): Reader threads.
+        batch_size (int): Records buffered before each sink write.
+        batch_bytes (int): Content size buffered before each sink write.
+
+    Returns:
+        int: Number of repositories processed.
+    """
+    sinks = []
+    if parquet_path:
+        os.makedirs(os.path.dirname(parquet_path) or ".", exist_ok=True)
+        try:
+            sinks.append(_ParquetSink(parquet_path))
+        except ImportError:
+            parquet_path = os.path.splitext(parquet_path)[0] + ".csv"
+            logger.warning(f"pyarrow is not installed; writing the README table as CSV to {parquet_path}")
+            sinks.append(_CsvSink(parquet_path))
+    if excel_path:
+        sinks.append(_ExcelSink(excel_path))
+
+    count = 0
+    batch = []
+    buffered = 0
+    try:
+        for record in iter_readmes(base_path, raw_dir, workers):
+            batch.append(record)
+            count += 1
+            buffered += len(record["readme_content"])
+            if len(batch) >= batch_size or buffered >= batch_bytes:
+                for sink in sinks:
+                    sink.write(batch)
+                batch = []
+                buffered = 0
+        if batch:
+            for sink in sinks:
+                sink.write(batch)
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    metrics.incr("readmes_extracted_total", count)
+    logger.info(f"README extraction complete: {count} repositories (raw: {raw_dir}, parquet: {parquet_path}, excel: {excel_path})")
+    return count
+
+
+def save_readmes_as_raw_files(
+    base_path: str = PATH_FILE['clone'],
+    output_dir: str = PATH_FILE['readmes_raw']
+) -> None:
     """
-    Remove characters not allowed in Excel XML (invalid control chars).
+    Walks through each cloned repository in `base_path`,
+    extracts the README file content (if found),
+    and saves it as a raw .txt file in `output_dir` using the repo name.
+
+    Parameters:
+        base_path (str): Path where repositories are cloned.
+        output_dir (str): Directory to save README files as text.
     """
-    # Remove control characters except \n, \r, \t
-    return re.sub(r"[\x00-\x08\x0B-\x0C\x0E-\x1F]", "", s)
+    extract_readmes(base_path, raw_dir=output_dir, parquet_path=None)
+
 
 def extract_readmes_to_excel(
-    base_path: str = "C:/Users/fpatr/OneDrive/Documents/Adoption of policies as code in ML based application/clone",
-    output_excel: str = "./repo_readmes_cleaned.xlsx"
+    base_path: str = PATH_FILE['clone'],
+    output_excel: str = PATH_FILE['readmes_excel']
 ):
     """
     Walks through each cloned repository in the base_path directory,
     extracts README file content (if found), cleans it, and saves to Excel.
 
+    Rows are streamed into a write-only workbook instead of building a DataFrame first.
+
     Parameters:
         base_path (str): Path where repositories are cloned.
         output_excel (str): Output Excel file path to save the extracted content.
@@ -69,32 +227,5 @@ def extract_readmes_to_excel(
     Returns:
         str: Path to the saved Excel file.
     """
-    results = []
-
-    for repo_name in os.listdir(base_path):
-        repo_path = os.path.join(base_path, repo_name)
-        if not os.path.isdir(repo_path):
-            continue
-
-        readme_content = ""
-        for file in os.listdir(repo_path):
-            if file.lower().startswith("readme"):
-                file_path = os.path.join(repo_path, file)
-                try:
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        raw_content = f.read().strip()
-                        readme_content = clean_excel_string(raw_content)
-                    break
-                except Exception:
-                    readme_content = "[Error reading file]"
-                    break
-
-        results.append({
-            "full_name": repo_name,
-            "readme_content": readme_content
-        })
-
-    df = pd.DataFrame(results)
-    df.to_excel(output_excel, index=False, engine="openpyxl")
-
+    extract_readmes(base_path, raw_dir=None, parquet_path=None, excel_path=output_excel)
     return output_excel
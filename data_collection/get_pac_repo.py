@@ -1,19 +1,21 @@
 import csv
+import heapq
+import os
+from itertools import repeat
 import random
-import time
-from typing import List, Set
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
 
+import numpy as np
 import pandas as pd
 import requests
 
 from config.constant import *
-from util.requests_timer import delay_next_request
+from util.requests_timer import delay_next_request, github_get, wait
 from util.util import *
 
 logger = configure_logger('github-data_logger', 'logging_file.log')
 
 PROGRESS_DIR = "./progress"
-os.makedirs(PROGRESS_DIR, exist_ok=True)
 STAR_SPLITS = [0, 10, 30, 50, 60, 80, 100, 500, 1000, 5000, 10000]
 GITHUB_HEADERS = lambda: {
     "Authorization": f"Bearer {random.choice(GitHub_CONFIG['token'])}",
@@ -26,14 +28,14 @@ def build_star_queries() -> List[str]:
     return ranges
 
 def get_total_count_for_code_query(query: str) -> int:
-    url = "https://api.github.com/search/code"
+    url = f"{GitHub_CONFIG['api_url']}/search/code"
     params = {
         "q": query,
         "per_page": 1,
         "page": 1
     }
     try:
-        response = requests.get(url, headers=GITHUB_HEADERS(), params=params)
+        response = github_get(url, headers=GITHUB_HEADERS(), params=params)
         delay_next_request()
         if response.status_code == 200:
             return response.json().get("total_count", 0)
@@ -74,8 +76,8 @@ def fetch_and_store(query: str, output_file: str, seen: Set[str], progress_file:
         attempts = 0
         while attempts < GitHub_CONFIG["max_retries"]:
             try:
-                response = requests.get(
-                    "https://api.github.com/search/code",
+                response = github_get(
+                    f"{GitHub_CONFIG['api_url']}/search/code",
                     headers=GITHUB_HEADERS(),
                     params=params
                 )
@@ -86,12 +88,12 @@ def fetch_and_store(query: str, output_file: str, seen: Set[str], progress_file:
                 else:
                     logger.warning(f"[Page {page}] Status {response.status_code}: {response.text}")
                     attempts += 1
-                    time.sleep(3 * attempts)
+                    wait(3 * attempts, "retry")
                     break
             except requests.RequestException as e:
                 attempts += 1
                 logger.warning(f"[Page {page}] Request error (attempt {attempts}): {e}")
-                time.sleep(3 * attempts)
+                wait(3 * attempts, "retry")
                 break
 
         if attempts == GitHub_CONFIG["max_retries"] or not response:
@@ -205,6 +207,7 @@ def search_pac_repos_by_extension(query_or_extension: str):
         label = query_or_extension.replace(".", "")
 
     output_file = f"pac_repos_{label}.csv"
+    os.makedirs(PROGRESS_DIR, exist_ok=True)
     progress_file_base = os.path.join(PROGRESS_DIR, f"{label}_progress.json")
     seen = set()
 
@@ -228,9 +231,116 @@ def search_pac_repos_by_extension(query_or_extension: str):
             fetch_and_store(sub_query, output_file, seen, sub_progress_file)
 
 
+def read_full_names(csv_file: str) -> List[str]:
+    """
+    Read the `full_name` column of a code search output as a sorted, de-duplicated list.
+
+    :param csv_file: Path to a CSV written by `search_pac_repos_by_extension`.
+    :return: Sorted unique repository full names.
+    """
+    with open(csv_file, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return sorted({row["full_name"] for row in reader if row.get("full_name")})
+
+
+def build_pac_presence_bitsets(outputs: Dict[str, str]) -> Tuple[List[str], Dict[str, bytearray]]:
+    """
+    Sort-merge any number of code search outputs into one ordered list of repositories.
+
+    Presence is stored as one bitset per flag (little-endian bit order), where bit `i`
+    is set when repository `i` appears in at least one output mapped to that flag.
+    Several outputs may share a flag (e.g. `.cedar`, `.cedar.json` -> `has_cedar`).
+
+    :param outputs: Mapping of output CSV path -> `has_<tool>` flag.
+    :return: (sorted full names, {flag: bitset}) with every bitset padded to the same length.
+    """
+    flags = list(dict.fromkeys(outputs.values()))
+    bitsets = {flag: bytearray() for flag in flags}
+    streams = [
+        zip(read_full_names(csv_file), repeat(flag))
+        for csv_file, flag in outputs.items()
+    ]
+
+    full_names: List[str] = []
+    for full_name, flag in heapq.merge(*streams):
+        if not full_names or full_names[-1] != full_name:
+            full_names.append(full_name)
+        position = len(full_names) - 1
+        bits = bitsets[flag]
+        byte_index = position >> 3
+        if byte_index >= len(bits):
+            bits.extend(bytes(byte_index + 1 - len(bits)))
+        bits[byte_index] |= 1 << (position & 7)
+
+    n_bytes = (len(full_names) + 7) >> 3
+    for bits in bitsets.values():
+        bits.extend(bytes(n_bytes - len(bits)))
+
+    return full_names, bitsets
+
+
+def read_csv_parts(csv_files: Union[str, Sequence[str]], **kwargs) -> pd.DataFrame:
+    """
+    Read one CSV, or concatenate several parts of the same table (e.g. the
+    `merged_pac_repos_enriched_<n>.csv` batches), keeping the first row of each `full_name`.
+    """
+    paths = [csv_files] if isinstance(csv_files, str) else list(csv_files)
+    df = pd.concat([pd.read_csv(path, **kwargs) for path in paths], ignore_index=True)
+    return df.drop_duplicates(subset=["full_name"])
+
+
+def merge_pac_outputs(
+    outputs: Dict[str, str],
+    output_file: str,
+    metadata_csv: Optional[Union[str, Sequence[str]]] = None,
+    contributors_csv: Optional[Union[str, Sequence[str]]] = None
+) -> pd.DataFrame:
+    """
+    Merge N code search outputs into one boolean presence matrix (one `has_<tool>` column per flag)
+    and optionally attach repository metadata and contributor counts in the same step.
+
+    :param outputs: Mapping of output CSV path -> `has_<tool>` flag (see `PAC_OUTPUTS`).
+    :param output_file: Path to save the merged CSV file.
+    :param metadata_csv: Optional CSV (or list of CSV parts) from `enrich_repos_incrementally`
+                         (full_name + repo fields).
+    :param contributors_csv: Optional CSV (or list of CSV parts) with `full_name` and
+                             `contributors_count` columns.
+    :return: The merged DataFrame.
+    """
+    full_names, bitsets = build_pac_presence_bitsets(outputs)
+    df_merged = pd.DataFrame({"full_name": full_names})
+    for flag, bits in bitsets.items():
+        df_merged[flag] = np.unpackbits(
+            np.frombuffer(bytes(bits), dtype=np.uint8), count=len(full_names), bitorder="little"
+        ).astype(bool)
+    logger.info(f"Merged {len(outputs)} outputs into {len(df_merged)} repositories x {len(bitsets)} flags")
+
+    flags = list(bitsets)
+    if metadata_csv:
+        df_metadata = read_csv_parts(metadata_csv)
+        df_metadata = df_metadata.drop(columns=[c for c in flags + ["contributors_count"] if c in df_metadata.columns])
+        df_merged = df_merged.merge(df_metadata, on="full_name", how="left")
+        df_merged = df_merged[["full_name"] + [c for c in df_metadata.columns if c != "full_name"] + flags]
+        logger.info(f"Metadata found for {df_merged['full_name'].isin(df_metadata['full_name']).sum()} repositories")
+    if contributors_csv:
+        df_contributors = read_csv_parts(contributors_csv, usecols=["full_name", "contributors_count"])
+        df_merged = df_merged.merge(df_contributors, on="full_name", how="left")
+        logger.info(f"Contributor counts found for {df_merged['contributors_count'].notna().sum()} repositories")
+
+    # Repositories without metadata turn integer columns into floats; keep them integers in the CSV.
+    for column in df_merged.select_dtypes("float").columns:
+        if (df_merged[column].dropna() % 1 == 0).all():
+            df_merged[column] = df_merged[column].astype("Int64")
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    df_merged.to_csv(output_file, index=False)
+    logger.info(f"Merged CSV written to {output_file}")
+    return df_merged
+
+
 def merge_pac_repo_outputs(rego_file: str, sentinel_file: str, output_file: str) -> None:
     """
     Merge two CSV files (rego and sentinel results) into one file with flags for each extension.
+    Unlike `merge_pac_outputs`, every column of both inputs is kept.
 
     :param rego_file: Path to the CSV containing repos with `.rego` files.
     :param sentinel_file: Path to the CSV containing repos with `.sentinel` files.
@@ -280,7 +390,7 @@ def merge_pac_repo_outputs(rego_file: str, sentinel_file: str, output_file: str)
 #     Search GitHub for repositories containing .rego or .sentinel files.
 #     Returns a list of unique repository full names (owner/repo).
 #     """
-#     url = "https://api.github.com/search/code"
+#     url = f"{GitHub_CONFIG['api_url']}/search/code"
 #     query = "extension:rego OR extension:sentinel"
 #
 #     headers = {
@@ -2,10 +2,19 @@ import os
 import csv
 from collections import defaultdict
 
+from config.constant import PATH_FILE
+from util import file_search, metrics
+from util.log import configure_logger
+
+logger = configure_logger('github-data_logger', 'logging_file.log')
+
 def contains_keywords(file_path, keywords):
     """
     Check if the file at file_path contains any of the specified keywords.
 
+    The file is searched as raw bytes (see `util.file_search`): large files are memory-mapped,
+    small ones are read into a reused buffer, and the search stops at the first match.
+
     Parameters:
     - file_path (str): Path to the file to inspect.
     - keywords (list): List of keywords to search for in the file content.
@@ -13,14 +22,41 @@ def contains_keywords(file_path, keywords):
     Returns:
     - bool: True if any keyword is found, False otherwise or if the file cannot be read.
     """
-    try:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            content = f.read()
-            return any(keyword in content for keyword in keywords)
-    except Exception:
-        return False
-
-def scan_repositories_updated(base_path="C:/Users/fpatr/OneDrive/Documents/Adoption of policies as code in ML based application/clone", output_csv="./pac_usage_summary_updated_with_Kubewarden.csv"):
+    with metrics.stage_timer("file_read"):
+        return file_search.contains_keywords(file_path, keywords)
+
+def contains_kinds(file_path, kinds):
+    """
+    Check if any YAML document in the file declares one of the given Kubernetes kinds.
+
+    Only the apiVersion/kind header window of each document is inspected (see
+    `util.file_search.contains_kinds`), so files that merely mention the kind do not match.
+
+    Parameters:
+    - file_path (str): Path to the YAML file.
+    - kinds (list): Kinds to look for, e.g. ["ClusterPolicy"].
+
+    Returns:
+    - bool: True if a document header declares one of the kinds, False otherwise.
+    """
+    with metrics.stage_timer("file_read"):
+        return file_search.contains_kinds(file_path, kinds)
+
+DETECTION_MODES = {"keyword": contains_keywords, "header": contains_kinds}
+
+def kind_matcher(detection="keyword"):
+    """
+    Return the matcher used for the Kyverno, Gatekeeper and Kubewarden YAML checks.
+
+    - "keyword": the file contains the kind name anywhere (original rule, highest recall).
+    - "header": a YAML document header declares the kind with the tool's apiVersion group.
+    """
+    if detection not in DETECTION_MODES:
+        raise ValueError(f"Unknown detection mode {detection!r}; expected one of {sorted(DETECTION_MODES)}")
+    return DETECTION_MODES[detection]
+
+def scan_repositories_updated(base_path=PATH_FILE['clone'], output_csv="./pac_usage_summary_updated_with_Kubewarden.csv",
+                              detection="keyword"):
     """
        Recursively scans repositories in the given base directory for Policy-as-Code (PaC) usage.
 
@@ -31,6 +67,7 @@ def scan_repositories_updated(base_path="C:/Users/fpatr/OneDrive/Documents/Adopt
        Parameters:
        - base_path (str): Path to the directory containing cloned repositories.
        - output_csv (str): Path to the CSV file to save summary results.
+       - detection (str): "keyword" or "header" matching for Kyverno, Gatekeeper and Kubewarden (see kind_matcher).
 
        Returns:
        - str: Path to the CSV file containing the summary of detected PaC tools.
@@ -40,6 +77,7 @@ def scan_repositories_updated(base_path="C:/Users/fpatr/OneDrive/Documents/Adopt
          into the result dictionary, merging those key-value pairs into the main row for CSV output.
        """
     results = []
+    match_kind = kind_matcher(detection)
 
     for repo_name in os.listdir(base_path):
         repo_path = os.path.join(base_path, repo_name)
@@ -47,8 +85,10 @@ def scan_repositories_updated(base_path="C:/Users/fpatr/OneDrive/Documents/Adopt
             continue
         # A dictionary to count occurrences of files matching PaC patterns for each tool
         tool_file_counts = defaultdict(int)
+        files_visited = 0
         # Walk through all files in the repository
         for root, _, files in os.walk(repo_path):
+            files_visited += len(files)
             for file in files:
                 file_path = os.path.join(root, file)
                 fname = file.lower()
@@ -78,7 +118,7 @@ def scan_repositories_updated(base_path="C:/Users/fpatr/OneDrive/Documents/Adopt
                     tool_file_counts["Cedar Policy Language (CPL)"] += 1
 
                 # Kyverno OSS
-                elif fname.endswith((".yaml", ".yml")) and contains_keywords(file_path, ["ClusterPolicy"]):
+                elif fname.endswith((".yaml", ".yml")) and match_kind(file_path, ["ClusterPolicy"]):
                     tool_file_counts["Kyverno OSS"] += 1
 
                 # Cloud Custodian
@@ -92,12 +132,16 @@ def scan_repositories_updated(base_path="C:/Users/fpatr/OneDrive/Documents/Adopt
                     tool_file_counts["AWS Config"] += 1
 
                 # OpagateKeeper
-                elif fname.endswith((".yaml", ".yml")) and contains_keywords(file_path, ["ConstraintTemplate"]):
+                elif fname.endswith((".yaml", ".yml")) and match_kind(file_path, ["ConstraintTemplate"]):
                     tool_file_counts["OpagateKeeper"] += 1
 
                 # Kubewarden
-                elif fname.endswith(".yaml") and contains_keywords(file_path, ["PolicyServer", "ClusterAdmissionPolicy"]):
+                elif fname.endswith(".yaml") and match_kind(file_path, ["PolicyServer", "ClusterAdmissionPolicy"]):
                     tool_file_counts["Kubewarden"] += 1
+        metrics.incr("files_visited_total", files_visited, scanner="usage")
+        for tool, count in tool_file_counts.items():
+            metrics.incr("pac_files_matched_total", count, scanner="usage", tool=tool)
+        logger.debug("[%s] PaC files: %s", repo_name, dict(tool_file_counts), extra={"repo": repo_name})
         # Store results for the current repository
         results.append({
             "full_name": repo_name,
@@ -112,7 +156,7 @@ def scan_repositories_updated(base_path="C:/Users/fpatr/OneDrive/Documents/Adopt
         "AWS Config", "OpagateKeeper", "Kubewarden"
     ]
     # Write the results to a CSV file
-    with open(output_csv, "w", newline="", encoding="utf-8") as f:
+    with metrics.stage_timer("csv_write"), open(output_csv, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=["full_name"] + all_tools)
         writer.writeheader()
         for row in results:
@@ -3,15 +3,13 @@ import csv
 import pandas as pd
 import requests
 
-from util.requests_timer import delay_next_request
+from util.requests_timer import delay_next_request, github_get
 from util.util import *
 from config.constant import GitHub_CONFIG
 import random
 
 logger = configure_logger('github-data_logger', 'logging_file.log')
 
-GITHUB_API_URL = "https://api.github.com"
-
 FIELDS_TO_COLLECT = [
     "created_at",
     "updated_at",
@@ -35,9 +33,9 @@ def GITHUB_HEADERS():
     }
 
 def fetch_repo_metadata(full_name: str) -> dict:
-    url = f"{GITHUB_API_URL}/repos/{full_name}"
+    url = f"{GitHub_CONFIG['api_url']}/repos/{full_name}"
     try:
-        resp = requests.get(url, headers=GITHUB_HEADERS(), timeout=30)
+        resp = github_get(url, headers=GITHUB_HEADERS(), timeout=30)
         if resp.status_code == 200:
             return resp.json()
         else:
@@ -95,7 +93,7 @@ def get_contributor_count(full_name: str) -> int:
     :return: Total number of contributors (including anonymous if available)
     """
     owner, repo = full_name.split("/")
-    url = f"https://api.github.com/repos/{owner}/{repo}/contributors"
+    url = f"{GitHub_CONFIG['api_url']}/repos/{owner}/{repo}/contributors"
     per_page = 100
     page = 1
     total_contributors = 0
@@ -108,7 +106,7 @@ def get_contributor_count(full_name: str) -> int:
         }
 
         try:
-            response = requests.get(url, headers=GITHUB_HEADERS(), params=params)
+            response = github_get(url, headers=GITHUB_HEADERS(), params=params)
             delay_next_request()
 
             if response.status_code == 200:
@@ -250,8 +248,8 @@ def get_commit_dates_from_csv(input_csv: str, output_csv: str) -> None:
     commit_data = []
 
     for repo in df_input['full_name']:
-        url = f"https://api.github.com/repos/{repo}/commits"
-        response = requests.get(url, headers=GITHUB_HEADERS())
+        url = f"{GitHub_CONFIG['api_url']}/repos/{repo}/commits"
+        response = github_get(url, headers=GITHUB_HEADERS())
         delay_next_request()
 
         if response.status_code == 200:
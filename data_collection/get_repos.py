@@ -16,7 +16,7 @@ def search_repositories_custom(query_string: str, start_page: int = 1) -> List[D
 
     Returns all results (up to GitHub's 1,000 max) and writes partial data to file.
     """
-    url = 'https://api.github.com/search/repositories'
+    url = f"{GitHub_CONFIG['api_url']}/search/repositories"
 
     page = start_page
     results: List[Dict] = []
@@ -44,20 +44,20 @@ def search_repositories_custom(query_string: str, start_page: int = 1) -> List[D
         # Retry loop
         while attempts < max_tries:
             try:
-                response = requests.get(url, headers=headers, params=params, timeout=30)
+                response = github_get(url, headers=headers, params=params, timeout=30)
                 break
             except requests.exceptions.ConnectionError as ce:
                 attempts += 1
                 logger.error(f"Connection error (page {page}, attempt {attempts}/{max_tries}): {ce}")
                 if attempts < max_tries:
                     logger.info("Retrying in 10 seconds...")
-                    time.sleep(10)
+                    wait(10, "retry")
             except requests.exceptions.Timeout as te:
                 attempts += 1
                 logger.error(f"Timeout error (page {page}, attempt {attempts}/{max_tries}): {te}")
                 if attempts < max_tries:
                     logger.info("Retrying in 10 seconds...")
-                    time.sleep(10)
+                    wait(10, "retry")
 
         if not response:
             logger.warning(f"Skipping page {page} due to repeated connection issues.")
@@ -132,7 +132,7 @@ def get_total_count_for_query(query: str) -> int:
     """
     Make a single request with per_page=1 just to retrieve 'total_count'.
     """
-    url = 'https://api.github.com/search/repositories'
+    url = f"{GitHub_CONFIG['api_url']}/search/repositories"
     headers = {
         "Authorization": f"Bearer {random.choice(GitHub_CONFIG['token'])}",
         "Accept": "application/vnd.github+json"
@@ -142,7 +142,7 @@ def get_total_count_for_query(query: str) -> int:
         "per_page": 1,
         "page": 1
     }
-    response = requests.get(url, headers=headers, params=params, timeout=30)
+    response = github_get(url, headers=headers, params=params, timeout=30)
     if response.status_code == 200:
         data = response.json()
         return data.get('total_count', 0)
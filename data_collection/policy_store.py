@@ -0,0 +1,163 @@
+""" Content-addressed store for extracted policy files, with per-tool/per-repo link views. """
+import csv
+import hashlib
+import os
+import shutil
+from typing import Dict, List
+
+from util import metrics
+from util.log import configure_logger
+
+logger = configure_logger('github-data_logger', 'logging_file.log')
+
+OBJECTS_DIR = ".objects"
+MANIFEST_FILE = "manifest.csv"
+MANIFEST_FIELDS = ["tool", "repo", "source_path", "view_path", "sha256", "size", "link"]
+LINK_MODES = ("hardlink", "reflink", "copy")
+
+_CHUNK = 1 << 20
+_FICLONE = 0x40049409  # Linux ioctl: share extents with another file (btrfs, xfs, ...)
+
+
+def file_digest(path: str) -> str:
+    """ SHA-256 hex digest of the file at `path`, read in 1 MiB chunks. """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(src: str, dest: str) -> None:
+    import fcntl  # POSIX only; ImportError is handled by the caller like any other failure
+
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+
+
+def link_or_copy(blob: str, dest: str, mode: str = "hardlink") -> str:
+    """
+    Materialise `blob` at `dest`, falling back from the requested mode to a plain copy.
+
+    :param blob: Path of the stored object.
+    :param dest: Path of the view file to create (must not exist).
+    :param mode: "hardlink", "reflink" or "copy".
+    :return: The mode actually used.
+    """
+    if mode == "hardlink":
+        try:
+            os.link(blob, dest)
+            return "hardlink"
+        except OSError:
+            pass
+    elif mode == "reflink":
+        try:
+            _reflink(blob, dest)
+            return "reflink"
+        except (OSError, ImportError):
+            if os.path.exists(dest):
+                os.remove(dest)
+    shutil.copy2(blob, dest)
+    return "copy"
+
+
+class PolicyStore:
+    """
+    Store every extracted file once under `<root>/.objects/<aa>/<sha256>` and expose it at
+    `<root>/<tool>/<repo>/<path inside the repo>` as a hardlink, reflink or copy.
+
+    Keeping the path inside the repo means same-named files from different subdirectories
+    no longer overwrite each other, and vendored copies of one library are written once.
+    Hardlinked views share the stored bytes, so treat them as read-only.
+    `close()` (or leaving the `with` block) merges the files added in this run into
+    `<root>/manifest.csv`, one row per view file and its source path.
+    """
+
+    def __init__(self, root: str = "./policies", link: str = "hardlink"):
+        if link not in LINK_MODES:
+            raise ValueError(f"Unknown link mode {link!r}; expected one of {LINK_MODES}")
+        self.root = root
+        self.link = link
+        self.objects = os.path.join(root, OBJECTS_DIR)
+        self.manifest_path = os.path.join(root, MANIFEST_FILE)
+        self.rows: Dict[str, Dict] = {}
+
+    def __enter__(self) -> "PolicyStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.objects, sha256[:2], sha256)
+
+    def _store_blob(self, source_path: str, sha256: str) -> str:
+        blob = self.blob_path(sha256)
+        if os.path.exists(blob):
+            metrics.incr("policy_store_blobs_total", result="dedup")
+            metrics.incr("policy_store_bytes_saved_total", os.path.getsize(blob))
+            return blob
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        tmp = f"{blob}.{os.getpid()}.tmp"
+        shutil.copy2(source_path, tmp)
+        os.replace(tmp, blob)
+        metrics.incr("policy_store_blobs_total", result="new")
+        return blob
+
+    def add(self, source_path: str, tool: str, repo: str, relative_path: str) -> str:
+        """
+        Add one matched file to the store and link it into the tool/repo view.
+
+        :param source_path: File inside the cloned repository.
+        :param tool: PaC tool name (first level of the view).
+        :param repo: Repository folder name (second level of the view).
+        :param relative_path: Path of the file inside the repository.
+        :return: Path of the view file.
+        """
+        sha256 = file_digest(source_path)
+        blob = self._store_blob(source_path, sha256)
+
+        view_path = os.path.normpath(os.path.join(self.root, tool, repo, relative_path))
+        os.makedirs(os.path.dirname(view_path), exist_ok=True)
+        if os.path.lexists(view_path):
+            os.remove(view_path)
+        used = link_or_copy(blob, view_path, self.link)
+
+        self.rows[view_path] = {
+            "tool": tool,
+            "repo": repo,
+            "source_path": os.path.normpath(source_path),
+            "view_path": os.path.relpath(view_path, self.root),
+            "sha256": sha256,
+            "size": os.path.getsize(blob),
+            "link": used,
+        }
+        return view_path
+
+    def close(self) -> str:
+        """
+        Merge this run's rows into the manifest by view path (new rows replace earlier ones),
+        drop rows whose view file no longer exists, and return the manifest path.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        rows = {}
+        if os.path.exists(self.manifest_path):
+            rows = {row["view_path"]: row for row in read_manifest(self.root)
+                    if os.path.lexists(os.path.join(self.root, row["view_path"]))}
+        rows.update((row["view_path"], row) for row in self.rows.values())
+        tmp = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows[key] for key in sorted(rows))
+        os.replace(tmp, self.manifest_path)
+        blobs = len({row["sha256"] for row in rows.values()})
+        logger.info(f"Policy store: {len(self.rows)} files added, {len(rows)} in manifest, {blobs} unique blobs, "
+                    f"manifest {self.manifest_path}")
+        return self.manifest_path
+
+
+def read_manifest(root: str = "./policies") -> List[Dict]:
+    """ Rows of `<root>/manifest.csv` as dicts (size converted to int). """
+    with open(os.path.join(root, MANIFEST_FILE), newline="", encoding="utf-8") as f:
+        return [{**row, "size": int(row["size"])} for row in csv.DictReader(f)]
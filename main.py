@@ -1,21 +1,110 @@
 import argparse
 import os
 
-from data_collection.clone_repo import clone_repos_from_csv
-from data_collection.get_iac_repos import *
-from data_collection.get_pac_repo import *
-from data_collection.get_repo_metrics import *
-from data_collection.get_repos import *
-from data_collection.get_repos_cloud import process_repositories
-from data_collection.get_repos_cloud import *
-from data_collection.get_pac_usage import *
-from data_collection.get_pac_readme import *
-from data_collection.get_pac_policy import *
+from config.constant import PATH_FILE, REPO_CONFIG, SCAN_CONFIG
+from util.log import configure_logger
 
 logger = configure_logger('github-data_logger', 'logging_file.log')
 
 progress_file = "progress/enrich_repos_4.json"
 
+# Each stage imports its data_collection module on demand, so a subcommand only pays
+# for (and only triggers the module-level setup of) the modules it actually uses.
+
+
+def run_collect() -> None:
+    from data_collection.get_repos import collect_repo
+    collect_repo()
+
+
+def run_metrics() -> None:
+    from data_collection.get_repo_metrics import get_commit_dates_from_csv
+    # compile_repo_data_to_csv(PATH_FILE['data'], PATH_FILE['output'])
+    # enrich_repos_incrementally("pac_repos_Kubewarden.csv", "pac_repos_Kubewarden_enriched.csv", progress_file)
+    # enrich_with_contributor_count("pac_repos_Kubewarden.csv", "pac_repos_Kubewarden_enriched_contributor.csv", progress_file)
+    get_commit_dates_from_csv("./data_analysis/Dataset_PaC_Used.xlsx", "commit_dates.csv")
+
+
+def run_iac() -> None:
+    from data_collection.get_iac_repos import enrich_csv_with_iac_tools_code_search
+    enrich_csv_with_iac_tools_code_search(PATH_FILE['output'], PATH_FILE['output_iac'])
+
+
+def run_cloud() -> None:
+    from data_collection.get_repos_cloud import process_repositories
+    process_repositories(PATH_FILE['gcp'], REPO_CONFIG['synonyms'], PATH_FILE['cloud'])
+
+
+def run_pac() -> None:
+    from data_collection.get_pac_repo import search_pac_repos_by_extension
+    # enrich_csv_with_pac(PATH_FILE['output_iac'], PATH_FILE['output_iac'])
+    search_pac_repos_by_extension("PolicyServer in:file extension:yaml")
+    search_pac_repos_by_extension("ClusterAdmissionPolicy in:file extension:yaml")
+    # search_pac_repos_by_extension('"com.pulumi" in:file+extension:java"')
+    # search_pac_repos_by_extension("ClusterPolicy in:file extension:yaml")
+    # merge_pac_repo_outputs(
+    #     rego_file="pac_repos_PolicyText_AWS_Config.csv",
+    #     sentinel_file="pac_repos_PolicyRuntime_AWS_Config.csv",
+    #     output_file="merged_pac_repos_AWS_Config.csv"
+    # )
+
+
+def run_merge() -> None:
+    from config.constant import PAC_OUTPUTS
+    from data_collection.get_pac_repo import merge_pac_outputs
+    merge_pac_outputs(PAC_OUTPUTS, PATH_FILE['pac_merged'], PATH_FILE['pac_metadata'], PATH_FILE['pac_contributors'])
+
+
+def run_clone_all() -> None:
+    from data_collection.clone_repo import clone_repos_from_csv
+    # clone_repos_from_csv("PaC_Repos_final_Dataset.csv")
+    clone_repos_from_csv("RQ2_Final_label.csv")
+
+
+def run_usage() -> None:
+    from data_collection.get_pac_usage import scan_repositories_updated
+    scan_repositories_updated(detection=SCAN_CONFIG['detection'])
+
+
+def run_readme() -> None:
+    from data_collection.get_pac_readme import extract_readmes
+    extract_readmes(excel_path=PATH_FILE['readmes_excel'] if SCAN_CONFIG['readme_excel'] else None,
+                    workers=SCAN_CONFIG['readme_workers'])
+
+
+def run_output() -> None:
+    from data_collection.get_pac_policy import extract_and_save_policy_files
+    from data_collection.policy_index import PolicyIndex
+    extract_and_save_policy_files(detection=SCAN_CONFIG['detection'])
+    with PolicyIndex(PATH_FILE['policy_index']) as index:
+        index.update("./policies")
+    if os.path.exists(os.path.join(PATH_FILE['search_index'], "meta.json")):
+        from analysis.policy_search import SearchIndex
+        SearchIndex(PATH_FILE['search_index']).update("./policies")
+
+
+def run_search(args: argparse.Namespace) -> None:
+    # -o keeps the index current; it is only built here when it does not exist yet.
+    from analysis.policy_search import print_hits, search_policies
+    print_hits(search_policies(args.SEARCH, regex=args.REGEX, ignore_case=args.IGNORE_CASE, tool=args.SEARCH_TOOL,
+                               repo=args.SEARCH_REPO, limit=args.SEARCH_LIMIT, update=False))
+
+
+# (flag dest, stage) in execution order
+STAGES = [
+    ('DATA', run_collect),
+    ('METRICS', run_metrics),
+    ('IAC', run_iac),
+    ('CLOUD', run_cloud),
+    ('PAC', run_pac),
+    ('MERGE', run_merge),
+    ('ALL', run_clone_all),
+    ('USAGE', run_usage),
+    ('README', run_readme),
+    ('OUTPUT', run_output),
+]
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description='Fetch GitHub repositories for a given topic.')
     parser.add_argument('-c', '--collect', help='Collect repositories for a given topic.', dest='DATA', action='store_true')
@@ -23,43 +112,44 @@ def main() -> None:
     parser.add_argument('-i', '--iac', help='Output CSV file for collected repositories with IaC information.', dest='IAC', action='store_true')
     parser.add_argument('-cd', '--cloud', help='Output CSV file for collected repositories with cloud information.', dest='CLOUD', action='store_true')
     parser.add_argument('-p', '--pac', help='Output CSV file for collected repositories with PaC information.', dest='PAC', action='store_true')
+    parser.add_argument('-mg', '--merge', help='Merge PaC code search outputs into one presence matrix.', dest='MERGE', action='store_true')
     parser.add_argument('-a', '--all', help='Clone all repos.', dest='ALL', action='store_true')
     parser.add_argument('-u', '--usage', help='Collecting PaC usage.', dest='USAGE', action='store_true')
     parser.add_argument('-r', '--readme', help='Collecting README files.', dest='README', action='store_true')
     parser.add_argument('-o', '--output', help='Collecting polycies from repositories.', dest='OUTPUT', action='store_true')
+    parser.add_argument('--report', help='Write a run report (.json, otherwise Prometheus text).', dest='REPORT')
+    parser.add_argument('--profile', help='Profile each selected stage.', dest='PROFILE', choices=['cprofile', 'pyinstrument'])
+    parser.add_argument('--detection', help='Kyverno/Gatekeeper/Kubewarden matching rule for -u and -o.', dest='DETECTION',
+                        choices=['keyword', 'header'], default=SCAN_CONFIG['detection'])
+    parser.add_argument('--readme-excel', help='With -r, also write READMEs to an XLSX file.', dest='README_EXCEL', action='store_true')
+    parser.add_argument('-s', '--search', help='Search the extracted policies for a substring (or regex with --regex).', dest='SEARCH')
+    parser.add_argument('--regex', help='With -s, treat the pattern as a regular expression.', dest='REGEX', action='store_true')
+    parser.add_argument('--ignore-case', help='With -s, match case-insensitively.', dest='IGNORE_CASE', action='store_true')
+    parser.add_argument('--tool', help='With -s, only this PaC tool (e.g. "Kyverno OSS").', dest='SEARCH_TOOL')
+    parser.add_argument('--repo', help='With -s, only this repository folder.', dest='SEARCH_REPO')
+    parser.add_argument('--limit', help='With -s, maximum number of matching lines.', dest='SEARCH_LIMIT', type=int, default=50)
     args = parser.parse_args()
+    SCAN_CONFIG['detection'] = args.DETECTION
+    SCAN_CONFIG['readme_excel'] = SCAN_CONFIG['readme_excel'] or args.README_EXCEL
+
+    from util import metrics
+
+    for dest, stage in STAGES:
+        if not getattr(args, dest):
+            continue
+        with metrics.stage_timer(dest.lower()):
+            if args.PROFILE:
+                with metrics.profile(dest.lower(), args.PROFILE):
+                    stage()
+            else:
+                stage()
+
+    if args.SEARCH:
+        with metrics.stage_timer("search"):
+            run_search(args)
 
-    if args.DATA:
-        collect_repo()
-    if args.METRICS:
-        # compile_repo_data_to_csv(PATH_FILE['data'], PATH_FILE['output'])
-        # enrich_repos_incrementally("pac_repos_Kubewarden.csv", "pac_repos_Kubewarden_enriched.csv", progress_file)
-        # enrich_with_contributor_count("pac_repos_Kubewarden.csv", "pac_repos_Kubewarden_enriched_contributor.csv", progress_file)
-        get_commit_dates_from_csv("./data_analysis/Dataset_PaC_Used.xlsx", "commit_dates.csv")
-    if args.IAC:
-        enrich_csv_with_iac_tools_code_search(PATH_FILE['output'], PATH_FILE['output_iac'])
-    if args.CLOUD:
-        process_repositories(PATH_FILE['gcp'], REPO_CONFIG['synonyms'], PATH_FILE['cloud'])
-    if args.PAC:
-        # enrich_csv_with_pac(PATH_FILE['output_iac'], PATH_FILE['output_iac'])
-        search_pac_repos_by_extension("PolicyServer in:file extension:yaml")
-        search_pac_repos_by_extension("ClusterAdmissionPolicy in:file extension:yaml")
-        # search_pac_repos_by_extension('"com.pulumi" in:file+extension:java"')
-        # search_pac_repos_by_extension("ClusterPolicy in:file extension:yaml")
-        # merge_pac_repo_outputs(
-        #     rego_file="pac_repos_PolicyText_AWS_Config.csv",
-        #     sentinel_file="pac_repos_PolicyRuntime_AWS_Config.csv",
-        #     output_file="merged_pac_repos_AWS_Config.csv"
-        # )
-    if args.ALL:
-        # clone_repos_from_csv("PaC_Repos_final_Dataset.csv")
-        clone_repos_from_csv("RQ2_Final_label.csv")
-    if args.USAGE:
-        scan_repositories_updated()
-    if args.README:
-        save_readmes_as_raw_files()
-    if args.OUTPUT:
-        extract_and_save_policy_files()
+    if args.REPORT:
+        logger.info(f"Run report written to {metrics.write_report(args.REPORT)}")
 # def print_hi(name):
 #     # Use a breakpoint in the code line below to debug your script.
 #     print(f'Hi, {name}')  # Press Ctrl+F8 to toggle the breakpoint.
@@ -0,0 +1,329 @@
+"""
+Tolerant JSON extraction from LLM replies and validation of the seven RQ4 taxonomy fields.
+
+Replies often wrap the JSON in prose or ```json fences, leave trailing commas, put raw
+newlines in strings or stop mid-object when the output is truncated. The scanner here finds
+brace-balanced JSON values anywhere in the text, emits objects as soon as they close (also
+when fed in chunks), and recovers the completed fields of a truncated object.
+"""
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from analysis.taxonomy_prompt import TAXONOMY_FIELDS
+
+_OPEN = {"{": "}", "[": "]"}
+_CLOSE = {"}", "]"}
+_SPECIAL = re.compile(r'[{}\[\]"]')
+_OPENING = re.compile(r"[{\[]")
+_STRING_STOP = re.compile(r'["\\]')
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+# Per-field rules of the taxonomy prompt: word limits ("Maximum 4 words") and whether an empty
+# value is acceptable (Cost Optimization and Workflow Automation have no sub-categories).
+TAXONOMY_SCHEMA = {
+    "Primary Purpose": {"max_words": None, "allow_empty": False},
+    "Sub-purpose": {"max_words": None, "allow_empty": False},
+    "Taxonomy Category": {"max_words": 4, "allow_empty": False},
+    "Taxonomy Sub-category": {"max_words": 4, "allow_empty": True},
+    "Policy Implemented": {"max_words": None, "allow_empty": False},
+    "Target Resource": {"max_words": None, "allow_empty": False},
+    "Rationale": {"max_words": None, "allow_empty": False},
+}
+assert list(TAXONOMY_SCHEMA) == TAXONOMY_FIELDS
+
+
+def loads_lenient(text: str) -> Any:
+    """ `json.loads` that accepts raw control characters in strings and trailing commas. """
+    try:
+        return json.loads(text, strict=False)
+    except ValueError:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", text), strict=False)
+
+
+class JsonStreamExtractor:
+    """
+    Incremental brace-balanced scanner: `feed()` text chunks and get back every JSON object
+    that closed in them, either at the top level or as an element of a top-level array (so a
+    batched reply yields its answers one by one, and the answers before a truncation survive).
+
+    Text outside JSON values (prose, fences) is skipped; an unparseable candidate is dropped
+    and scanning resumes after it.
+
+        extractor = JsonStreamExtractor()
+        for chunk in chunks:
+            for obj in extractor.feed(chunk):
+                ...
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.stack: List[Tuple[str, int]] = []  # (opening bracket, offset in buffer)
+        self.in_string = False
+        self.pos = 0
+        self.dropped = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        if not self.stack:
+            start = min((i for i in (chunk.find("{"), chunk.find("[")) if i >= 0), default=-1)
+            if start < 0:
+                return []
+            chunk = chunk[start:]
+        self.buffer += chunk
+        found: List[Any] = []
+        buffer = self.buffer
+        i = self.pos
+        while i < len(buffer):
+            if not self.stack:
+                match = _OPENING.search(buffer, i)
+                if match is None:
+                    i = len(buffer)
+                    break
+                i = match.start()
+                self.stack.append((buffer[i], i))
+                i += 1
+                continue
+            if self.in_string:
+                match = _STRING_STOP.search(buffer, i)
+                if match is None:
+                    i = len(buffer)
+                    break
+                i = match.start()
+                if buffer[i] == "\\":
+                    if i + 1 >= len(buffer):
+                        break  # escape split across chunks; resume here on the next feed
+                    i += 2
+                    continue
+                self.in_string = False
+                i += 1
+                continue
+            match = _SPECIAL.search(buffer, i)
+            if match is None:
+                i = len(buffer)
+                break
+            i = match.start()
+            char = buffer[i]
+            if char == '"':
+                self.in_string = True
+            elif char in _OPEN:
+                self.stack.append((char, i))
+            elif char in _CLOSE:
+                opening, start = self.stack.pop()
+                if _OPEN[opening] != char:
+                    self.dropped += 1
+                    self.stack = []  # mismatched bracket: abandon this candidate
+                elif opening == "{" and (not self.stack or (len(self.stack) == 1 and self.stack[0][0] == "[")):
+                    try:
+                        found.append(loads_lenient(buffer[start:i + 1]))
+                    except ValueError:
+                        self.dropped += 1
+            i += 1
+        if not self.stack:
+            self.buffer, i = "", 0
+        elif self.stack[0][1] > 0:
+            offset = self.stack[0][1]
+            self.buffer = buffer[offset:]
+            self.stack = [(c, s - offset) for c, s in self.stack]
+            i -= offset
+        self.pos = i
+        return found
+
+    @property
+    def open_value(self) -> Optional[str]:
+        """ Text of the value still open at the end of the input (a truncated reply), if any. """
+        return self.buffer if self.stack else None
+
+
+def _strip_fences(text: str) -> str:
+    return re.sub(r"```(?:json)?\s*|\s*```", "", text.strip(), flags=re.IGNORECASE)
+
+
+def find_json_values(text: str) -> List[Any]:
+    """ Every complete top-level JSON object or array in `text`, in order. """
+    values = []
+    depth_start: List[Tuple[str, int]] = []
+    in_string = escape = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif not depth_start:
+            if char in _OPEN:
+                depth_start.append((char, i))
+        elif char == '"':
+            in_string = True
+        elif char in _OPEN:
+            depth_start.append((char, i))
+        elif char in _CLOSE:
+            opening, start = depth_start.pop()
+            if _OPEN[opening] != char:
+                depth_start = []
+            elif not depth_start:
+                try:
+                    values.append(loads_lenient(text[start:i + 1]))
+                except ValueError:
+                    pass
+    return values
+
+
+def recover_partial(text: str) -> Optional[Any]:
+    """
+    Best-effort repair of a truncated JSON value: cut back to the last complete member (the
+    last comma outside strings, or the end when it closes a value) and close the brackets
+    still open there. Returns None when nothing can be recovered.
+    """
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return None
+    text = text[start:]
+    stack: List[str] = []
+    cuts: List[Tuple[int, str]] = []  # (cut offset, closers needed there)
+    in_string = escape = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _OPEN:
+            stack.append(_OPEN[char])
+        elif char in _CLOSE:
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                try:
+                    return loads_lenient(text[:i + 1])
+                except ValueError:
+                    break
+        elif char == ",":
+            cuts.append((i, "".join(reversed(stack))))
+    if not in_string and stack:
+        cuts.append((len(text.rstrip()), "".join(reversed(stack))))
+    for cut, closers in reversed(cuts):
+        try:
+            return loads_lenient(text[:cut] + closers)
+        except ValueError:
+            continue
+    return None
+
+
+def extract_json(text: str) -> Tuple[Any, bool]:
+    """
+    The first JSON value in an LLM reply.
+
+    :return: (value, complete) where complete is False for a value rebuilt by `recover_partial`.
+    :raises ValueError: When the reply holds no recoverable JSON.
+    """
+    cleaned = _strip_fences(text)
+    values = find_json_values(cleaned)
+    if values:
+        return values[0], True
+    recovered = recover_partial(cleaned)
+    if recovered is None:
+        raise ValueError("No JSON value found in reply")
+    return recovered, False
+
+
+def _field_key(name: str) -> str:
+    return re.sub(r"[^a-z]", "", name.lower())
+
+
+_CANONICAL = {_field_key(field): field for field in TAXONOMY_FIELDS}
+
+
+def normalize_taxonomy(entry: Dict) -> Dict:
+    """
+    Map key variants ("sub_purpose", "Sub-Purpose", "taxonomy category") to the canonical field
+    names and flatten list values; other keys (e.g. a batched "id") are kept as they are.
+    """
+    normalized = {}
+    for key, value in entry.items():
+        field = _CANONICAL.get(_field_key(str(key)), key)
+        if isinstance(value, list):
+            value = "; ".join(str(v) for v in value)
+        elif isinstance(value, str):
+            value = value.strip()
+        normalized[field] = value
+    return normalized
+
+
+def validate_taxonomy(entry: Any, schema: Dict[str, Dict] = TAXONOMY_SCHEMA) -> List[str]:
+    """ Schema violations of one (normalized) taxonomy entry; an empty list means valid. """
+    if not isinstance(entry, dict):
+        return [f"Expected a JSON object, got {type(entry).__name__}"]
+    errors = []
+    for field, rule in schema.items():
+        if field not in entry:
+            errors.append(f"Missing field '{field}'")
+            continue
+        value = entry[field]
+        if value is None:
+            value = ""
+        if not isinstance(value, str):
+            errors.append(f"Field '{field}' must be a string")
+        elif not value and not rule["allow_empty"]:
+            errors.append(f"Field '{field}' is empty")
+        elif rule["max_words"] and len(value.split()) > rule["max_words"]:
+            errors.append(f"Field '{field}' has {len(value.split())} words (maximum {rule['max_words']})")
+    return errors
+
+
+def parse_taxonomy(content: str) -> Tuple[Dict, List[str]]:
+    """
+    One taxonomy entry from a single-policy reply.
+
+    :return: (normalized entry, validation errors); the entry holds whatever fields were
+             recovered, so it is informative even when errors is non-empty.
+    """
+    try:
+        value, complete = extract_json(content)
+    except ValueError as e:
+        return {}, [str(e)]
+    if isinstance(value, list):
+        value = next((v for v in value if isinstance(v, dict)), value)
+    entry = normalize_taxonomy(value) if isinstance(value, dict) else value
+    errors = validate_taxonomy(entry)
+    if not complete:
+        errors.insert(0, "Reply was truncated")
+    return entry if isinstance(entry, dict) else {}, errors
+
+
+def parse_taxonomy_batch(content: str, expected_ids: Iterable[str]) -> Tuple[Dict[str, Dict], Dict[str, List[str]]]:
+    """
+    Per-id entries of a batched reply (a JSON array of objects with an "id"). Objects are
+    taken as they close, so the answers before a truncation are kept.
+
+    :return: (valid entries by id, validation errors by id for the invalid or missing ids).
+    """
+    expected = [str(i) for i in expected_ids]
+    extractor = JsonStreamExtractor()
+    objects = extractor.feed(_strip_fences(content))
+    if len(objects) == 1 and isinstance(objects[0], dict) and "id" not in objects[0]:
+        # {"results": [...]}-style wrapper around the array
+        objects = next((v for v in objects[0].values() if isinstance(v, list)), objects)
+    valid: Dict[str, Dict] = {}
+    errors: Dict[str, List[str]] = {}
+    for obj in objects:
+        if not isinstance(obj, dict) or str(obj.get("id")) not in expected:
+            continue
+        item_id = str(obj["id"])
+        entry = normalize_taxonomy(obj)
+        problems = validate_taxonomy(entry)
+        if problems:
+            errors[item_id] = problems
+        else:
+            errors.pop(item_id, None)
+            valid[item_id] = {field: entry[field] for field in TAXONOMY_FIELDS}
+    for item_id in expected:
+        if item_id not in valid and item_id not in errors:
+            errors[item_id] = ["No answer for this id"]
+    return valid, errors
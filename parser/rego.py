@@ -0,0 +1,323 @@
+"""
+Structural features of Rego policies (package, imports, rule heads, builtins called and
+`input.*` paths read), from a single-pass tokenizer rather than an LLM. Over the corpus they
+form a compact table that pre-classifies policies: test suites and rule-less files need no
+LLM judgement, and files with the same structural signature can share one.
+
+    features = analyze_rego(text)
+    features.rules        # {"deny": 2, "is_privileged": 1}
+    features.input_paths  # ["input.review.object.spec.containers[*].securityContext.privileged"]
+"""
+import argparse
+import hashlib
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.constant import PATH_FILE
+from util import metrics
+from util.log import configure_logger
+
+logger = configure_logger('github-data_logger', 'logging_file.log')
+
+_TOKEN = re.compile(r"""
+    (?P<comment>\#[^\n]*)
+  | (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+)
+  | (?P<string>"(?:[^"\\\n]|\\.)*")
+  | (?P<raw>`[^`]*`)
+  | (?P<number>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<op>:=|==|!=|<=|>=|[-+*/%<>=|&.,;:\[\]{}()!])
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+KEYWORDS = frozenset(["package", "import", "default", "else", "some", "every", "in", "if", "contains", "not",
+                      "with", "as", "true", "false", "null"])
+# Rule names that carry a policy decision, in the order used to pick a file's `decision`.
+DECISION_RULES = ("deny", "violation", "warn", "fail", "failed", "allow", "pass", "passed", "exception")
+_NOT_HEADS = KEYWORDS | {"input", "data"}
+_OPEN = {"[": "]", "{": "}", "(": ")"}
+_CLOSE = {"]", "}", ")"}
+
+
+@dataclass
+class RegoFeatures:
+    package: str = ""
+    imports: List[str] = field(default_factory=list)
+    rules: Dict[str, int] = field(default_factory=dict)  # head name -> definitions (incl. defaults)
+    functions: List[str] = field(default_factory=list)
+    defaults: List[str] = field(default_factory=list)
+    builtins: Dict[str, int] = field(default_factory=dict)  # call name -> calls
+    input_paths: List[str] = field(default_factory=list)
+    uses_v1: bool = False  # rego.v1 / future.keywords import or `if`/`contains` rule syntax
+    lines: int = 0
+    comment_lines: int = 0
+
+    @property
+    def is_test(self) -> bool:
+        """ A test suite: `*_test` package or only `test_*` rules. """
+        named = [name for name in self.rules if name not in self.functions]
+        return self.package.endswith("_test") or (bool(named) and all(n.startswith("test_") for n in named))
+
+    @property
+    def decision(self) -> str:
+        """ The first of DECISION_RULES this file defines ('' when none). """
+        return next((kind for kind in DECISION_RULES if kind in self.rules), "")
+
+
+def tokenize(text: str) -> Tuple[List[Tuple[str, str]], int]:
+    """ (kind, text) tokens without spaces and comments, and the number of comment tokens. """
+    tokens, comments = [], 0
+    for match in _TOKEN.finditer(text):
+        kind = match.lastgroup
+        if kind == "space":
+            continue
+        if kind == "comment":
+            comments += 1
+            continue
+        tokens.append((kind, match.group()))
+    return tokens, comments
+
+
+def _read_ref(tokens: List[Tuple[str, str]], i: int) -> Tuple[List[str], bool, int]:
+    """
+    The reference starting at identifier `tokens[i]`: its segments ('.name' for fields and
+    string keys, '[*]' for any other index), whether it is called, and the index after it.
+    """
+    segments = [tokens[i][1]]
+    j = i + 1
+    n = len(tokens)
+    while j < n:
+        kind, text = tokens[j]
+        if text == "." and j + 1 < n and tokens[j + 1][0] == "ident":
+            segments.append("." + tokens[j + 1][1])
+            j += 2
+        elif text == "[":
+            if j + 2 < n and tokens[j + 2][1] == "]" and tokens[j + 1][0] == "string":
+                key = tokens[j + 1][1][1:-1]
+                segments.append("." + key if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_-]*", key) else "[*]")
+                j += 3
+                continue
+            depth, k = 0, j
+            while k < n:  # skip to the matching bracket; the main loop still visits the inside
+                if tokens[k][1] in _OPEN:
+                    depth += 1
+                elif tokens[k][1] in _CLOSE:
+                    depth -= 1
+                    if depth == 0:
+                        break
+                k += 1
+            segments.append("[*]")
+            j = k + 1
+        else:
+            break
+    called = j < n and tokens[j][1] == "("
+    return segments, called, j
+
+
+def _dotted(segments: Sequence[str]) -> str:
+    return "".join(segments)
+
+
+def analyze_rego(text: str) -> RegoFeatures:
+    """ Structural features of one Rego module; never raises on malformed input. """
+    tokens, comments = tokenize(text)
+    features = RegoFeatures(lines=text.count("\n") + (1 if text and not text.endswith("\n") else 0),
+                            comment_lines=comments)
+    rules: Counter = Counter()
+    calls: Counter = Counter()
+    aliases: Dict[str, str] = {}  # import alias -> imported ref
+    input_refs: List[List[str]] = []
+    functions, defaults = set(), set()
+
+    depth = 0
+    at_start = True
+    n = len(tokens)
+    i = 0
+    while i < n:
+        kind, text_ = tokens[i]
+        if kind == "newline" or text_ == ";":
+            at_start = depth == 0 or at_start
+            i += 1
+            continue
+        starts_statement = at_start and depth == 0
+        at_start = False
+        if text_ in _OPEN:
+            depth += 1
+        elif text_ in _CLOSE:
+            depth = max(depth - 1, 0)
+
+        if starts_statement and text_ in ("package", "import") and i + 1 < n and tokens[i + 1][0] == "ident":
+            segments, _, j = _read_ref(tokens, i + 1)
+            ref = _dotted(segments)
+            if text_ == "package":
+                features.package = ref
+            else:
+                features.imports.append(ref)
+                alias = segments[-1].lstrip(".")
+                if j + 1 < n and tokens[j][1] == "as" and tokens[j + 1][0] == "ident":
+                    alias = tokens[j + 1][1]
+                    j += 2
+                if segments[0] in ("future", "rego"):
+                    features.uses_v1 = True
+                else:
+                    aliases[alias] = ref
+            i = j
+            continue
+
+        is_default = text_ == "default" and i + 1 < n and tokens[i + 1][0] == "ident"
+        if starts_statement and (is_default or kind == "ident" and text_ not in _NOT_HEADS):
+            head = i + 1 if is_default else i
+            segments, called, j = _read_ref(tokens, head)
+            name = _dotted([s for s in segments if s != "[*]"])
+            rules[name] += 1
+            if is_default:
+                defaults.add(name)
+            if called:
+                functions.add(name)
+            if j < n and tokens[j][1] in ("if", "contains"):
+                features.uses_v1 = True
+            # The head's own refs are not body references; continue after the name.
+            i = head + 1
+            continue
+
+        if kind == "ident" and text_ not in KEYWORDS and (i == 0 or tokens[i - 1][1] != "."):
+            segments, called, j = _read_ref(tokens, i)
+            root = segments[0]
+            if root in aliases and aliases[root].startswith("input"):
+                head, *rest = aliases[root].split(".")
+                segments = [head] + ["." + part for part in rest] + segments[1:]
+                root = "input"
+            if called:
+                calls[_dotted(segments)] += 1
+            elif root == "input":
+                input_refs.append(segments)
+            # Step over the dotted part only; bracket contents are scanned as usual.
+            k = i + 1
+            while k + 1 < n and tokens[k][1] == "." and tokens[k + 1][0] == "ident":
+                k += 2
+            i = k
+            continue
+        i += 1
+
+    features.rules = dict(rules)
+    features.functions = sorted(functions)
+    features.defaults = sorted(defaults)
+    user = functions | set(aliases)
+    features.builtins = {name: count for name, count in sorted(calls.items())
+                         if name not in user and name.split(".", 1)[0] not in user | {"data", "input"}}
+    features.input_paths = sorted({_dotted(segments) for segments in input_refs})
+    return features
+
+
+def signature(features: RegoFeatures) -> str:
+    """ Hash of the package-independent structure (decision rules, builtins, input paths). """
+    decisions = sorted((name, count) for name, count in features.rules.items() if name in DECISION_RULES)
+    payload = repr((decisions, sorted(features.builtins), features.input_paths, len(features.functions)))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def feature_row(features: RegoFeatures) -> Dict:
+    """ One flat table row; list-valued features are joined with ';'. """
+    prefixes = Counter(".".join(path.replace("[*]", "").split(".")[:3]) for path in features.input_paths
+                       if path.startswith("input."))
+    row = {
+        "package": features.package,
+        "imports": ";".join(features.imports),
+        "rules": ";".join(f"{name}:{count}" for name, count in sorted(features.rules.items())),
+        "n_rules": sum(features.rules.values()),
+        "n_functions": len(features.functions),
+        "decision": features.decision,
+        "builtins": ";".join(features.builtins),
+        "n_builtin_calls": sum(features.builtins.values()),
+        "input_paths": ";".join(features.input_paths),
+        "n_input_paths": len(features.input_paths),
+        "input_prefix": prefixes.most_common(1)[0][0] if prefixes else "",
+        "is_test": features.is_test,
+        "uses_v1": features.uses_v1,
+        "lines": features.lines,
+        "comment_lines": features.comment_lines,
+        "signature": signature(features),
+    }
+    for kind in DECISION_RULES:
+        row[kind] = features.rules.get(kind, 0)
+    return row
+
+
+def _analyze_files(paths: List[str]) -> List[Dict]:
+    rows = []
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                rows.append(feature_row(analyze_rego(f.read())))
+        except OSError as e:
+            logger.warning(f"[Skipping] Could not read {path}. Reason: {e}")
+            rows.append(None)
+    return rows
+
+
+def rego_feature_table(root: str = "./policies", tool: Optional[str] = None, workers: int = 4, chunk_size: int = 256,
+                       index_path: str = PATH_FILE['policy_index']):
+    """
+    Feature row for every `.rego` file under `root` (listed from the policy index), analysing
+    each distinct content once, in `workers` processes.
+
+    :param tool: Only files of this PaC tool (e.g. "Open Policy Agent (OPA)").
+    :return: pandas DataFrame with path, tool, repo, sha256 and the `feature_row` columns, plus
+             `needs_llm` (False for test suites and files without rules) and `signature_files`
+             (files sharing the signature, so one judgement can cover them).
+    """
+    import pandas as pd
+
+    from data_collection.policy_index import load_policy_index
+
+    files = load_policy_index(root, index_path, language="rego", tool=tool)
+    unique = files.drop_duplicates("sha256")
+    paths = [os.path.join(root, path) for path in unique["path"]]
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    with metrics.stage_timer("rego_features"):
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                rows = [row for part in pool.map(_analyze_files, chunks) for row in part]
+        else:
+            rows = [row for chunk in chunks for row in _analyze_files(chunk)]
+    by_hash = {sha: row for sha, row in zip(unique["sha256"], rows) if row is not None}
+    features = pd.DataFrame.from_records([{"sha256": sha, **row} for sha, row in by_hash.items()])
+    if features.empty:
+        return files.assign(needs_llm=pd.Series(dtype=bool))
+    table = files[["path", "tool", "repo", "sha256"]].merge(features, on="sha256", how="inner")
+    table["needs_llm"] = ~table["is_test"] & (table["n_rules"] > 0)
+    table["signature_files"] = table.groupby("signature")["path"].transform("size")
+    logger.info(f"Rego features: {len(table)} files, {len(by_hash)} distinct contents, "
+                f"{int(table['needs_llm'].sum())} need an LLM judgement, "
+                f"{table.loc[table['needs_llm'], 'signature'].nunique()} distinct signatures among them")
+    return table
+
+
+def one_hot(table, column: str, min_count: int = 5):
+    """ Bool matrix (files x values) of a ';'-joined feature column, keeping values seen in >= `min_count` files. """
+    dummies = table[column].str.get_dummies(sep=";").astype(bool)
+    dummies = dummies.drop(columns=[""], errors="ignore")
+    return dummies.loc[:, dummies.sum() >= min_count]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Extract structural features from the Rego policies.')
+    parser.add_argument('--root', default='./policies')
+    parser.add_argument('--tool', default=None, help='Only this PaC tool, e.g. "Open Policy Agent (OPA)".')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--index', default=PATH_FILE['policy_index'])
+    parser.add_argument('--output', default='./output/rego_features.parquet', help='.parquet or .csv')
+    args = parser.parse_args()
+
+    table = rego_feature_table(args.root, args.tool, args.workers, index_path=args.index)
+    if args.output.endswith(".csv"):
+        table.to_csv(args.output, index=False)
+    else:
+        table.to_parquet(args.output, index=False)
+    print(f"{len(table)} files -> {args.output}")
+    print(table["decision"].replace("", "(none)").value_counts().to_string())
@@ -0,0 +1,163 @@
+""" Byte-level keyword search over files without decoding them. """
+import mmap
+import os
+import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterable, Iterator, Tuple, Union
+
+# Files at or above this size are memory-mapped; smaller ones are read into a reusable buffer.
+MMAP_THRESHOLD = 1 << 20  # 1 MiB
+_MIN_BUFFER = 64 * 1024
+
+# Bytes inspected at the top of each YAML document (after leading comments) for apiVersion/kind.
+HEADER_WINDOW = 1024
+# Kubernetes-style policy kinds and the API group their apiVersion must belong to.
+KIND_API_GROUPS = {
+    "ClusterPolicy": "kyverno.io",
+    "ConstraintTemplate": "templates.gatekeeper.sh",
+    "PolicyServer": "policies.kubewarden.io",
+    "ClusterAdmissionPolicy": "policies.kubewarden.io",
+}
+
+_local = threading.local()
+
+
+@lru_cache(maxsize=256)
+def _encode(keywords: Tuple[str, ...]) -> Tuple[bytes, ...]:
+    return tuple(k.encode("utf-8") for k in keywords)
+
+
+def _buffer(size: int) -> bytearray:
+    """ Per-thread scratch buffer, grown on demand and reused across files. """
+    buf = getattr(_local, "buffer", None)
+    if buf is None or len(buf) < size:
+        buf = bytearray(max(size, _MIN_BUFFER, 2 * len(buf or b"")))
+        _local.buffer = buf
+    return buf
+
+
+@contextmanager
+def _file_bytes(file_path: str, mmap_threshold: int = MMAP_THRESHOLD) -> Iterator[Tuple[Union[mmap.mmap, bytearray], int]]:
+    """
+    Yield (data, size) for the whole file without decoding it: a read-only mmap for large files,
+    otherwise the per-thread buffer filled with `readinto` (only `data[:size]` is valid).
+    """
+    with open(file_path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            yield b"", 0
+            return
+        if size >= mmap_threshold:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield mm, size
+            return
+
+        buf = _buffer(size)
+        read = 0
+        with memoryview(buf) as view:
+            while read < size:
+                n = f.readinto(view[read:size])
+                if not n:
+                    break
+                read += n
+        yield buf, read
+
+
+def contains_any(file_path: str, keywords: Tuple[bytes, ...], mmap_threshold: int = MMAP_THRESHOLD) -> bool:
+    """
+    Return True as soon as one of `keywords` (raw bytes) is found in the file.
+
+    Large files are searched through a read-only mmap, so the OS pages them in and nothing is
+    copied or decoded; small files go through `readinto` on a per-thread buffer.
+    Keywords are tried in order and the search stops at the first hit.
+
+    :param file_path: Path to the file to inspect.
+    :param keywords: Byte strings to search for.
+    :param mmap_threshold: Size in bytes from which the file is memory-mapped.
+    """
+    with _file_bytes(file_path, mmap_threshold) as (data, size):
+        return any(data.find(keyword, 0, size) != -1 for keyword in keywords)
+
+
+# Start of a line, or just after a UTF-8 byte order mark at the start of the file (editors on
+# Windows save YAML with one; `pos` arguments do not make `^` match mid-line).
+_LINE_START = rb"(?:^|(?<=\A\xef\xbb\xbf))"
+
+
+@lru_cache(maxsize=64)
+def _kind_patterns(kinds: Tuple[str, ...]) -> Tuple[re.Pattern, dict]:
+    alternation = b"|".join(re.escape(kind.encode("utf-8")) for kind in kinds)
+    kind_pattern = re.compile(
+        _LINE_START + rb"kind[ \t]*:[ \t]*[\"']?(" + alternation + rb")[\"']?[ \t]*(?:#[^\n]*)?\r?$", re.M
+    )
+    api_patterns = {
+        kind.encode("utf-8"): re.compile(
+            _LINE_START + rb"apiVersion[ \t]*:[ \t]*[\"']?(?:" + re.escape(KIND_API_GROUPS[kind].encode("utf-8"))
+            + rb"/|\{\{)", re.M
+        )
+        for kind in kinds if kind in KIND_API_GROUPS
+    }
+    return kind_pattern, api_patterns
+
+
+_LEADING_NOISE = re.compile(rb"(?:\xef\xbb\xbf)?(?:[ \t]*(?:#[^\n]*)?\r?\n)*")
+
+
+def contains_kinds(file_path: str, kinds: Iterable[str], window: int = HEADER_WINDOW) -> bool:
+    """
+    Check whether any YAML document in the file declares one of `kinds` at the top level.
+
+    Only the header window of each document (the first `window` bytes after leading blank and
+    comment lines) is searched for `kind: <Kind>`; for kinds listed in KIND_API_GROUPS the window
+    must also carry an `apiVersion` from that API group (or a Helm `{{ ... }}` template). The rest
+    of each document is skipped by jumping to the next `---` separator, so a README or values file
+    that merely mentions ClusterPolicy does not match. A UTF-8 BOM at the start of the file is
+    skipped. This buys precision rather than speed: the substring pre-check is the same as
+    keyword mode's, so both scan at about the same rate.
+
+    :param file_path: Path to the YAML file.
+    :param kinds: Kinds to look for, e.g. ["ClusterPolicy"].
+    :param window: Header window size in bytes.
+    :return: True if a document header declares one of the kinds, False otherwise or if unreadable.
+    """
+    kinds = tuple(kinds)
+    kind_pattern, api_patterns = _kind_patterns(kinds)
+    try:
+        with _file_bytes(file_path) as (data, size):
+            # Most YAML files never mention the kind at all; a plain substring scan rejects them
+            # before any per-document regex work.
+            if not any(data.find(kind, 0, size) != -1 for kind in _encode(kinds)):
+                return False
+            start = 0
+            while start < size:
+                start = _LEADING_NOISE.match(data, start, size).end()
+                end = min(size, start + window)
+                match = kind_pattern.search(data, start, end)
+                if match:
+                    api_pattern = api_patterns.get(match.group(1))
+                    if api_pattern is None or api_pattern.search(data, start, end):
+                        return True
+                separator = data.find(b"\n---", start, size)
+                if separator == -1:
+                    return False
+                newline = data.find(b"\n", separator + 4, size)
+                if newline == -1:
+                    return False
+                start = newline + 1
+            return False
+    except (OSError, ValueError):
+        return False
+
+
+def contains_keywords(file_path: str, keywords: Iterable[str]) -> bool:
+    """
+    Check if the file at file_path contains any of the specified keywords (UTF-8 substring match).
+
+    Returns False if the file cannot be read.
+    """
+    try:
+        return contains_any(file_path, _encode(tuple(keywords)))
+    except (OSError, ValueError):
+        return False
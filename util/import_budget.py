@@ -0,0 +1,77 @@
+""" Import-time budget check for the CLI entry point (python -X importtime). """
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What `python main.py -r` / `-o` import before doing any work.
+LIGHT_IMPORTS = ("import main; import data_collection.get_pac_readme; import data_collection.get_pac_policy; "
+                 "import data_collection.policy_index")
+# Heavy dependencies that must only be imported by the stages that need them.
+FORBIDDEN_MODULES = ["pandas", "numpy", "requests"]
+BUDGET_MS = 100.0
+
+
+def _import_report(statement: str) -> Dict[str, float]:
+    """ {top-level module: cumulative ms} from `python -X importtime -c statement`. """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    modules: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented under their parent; keep outermost entries only.
+        if name.startswith("  "):
+            continue
+        modules[name.strip()] = int(cumulative) / 1000.0
+    return modules
+
+
+def measure_import_time(statement: str = LIGHT_IMPORTS) -> Tuple[float, Dict[str, float]]:
+    """
+    Run `statement` in a fresh interpreter with `-X importtime` and parse its report.
+
+    Entries that a bare `python -c pass` also reports (`site`, `encodings`, `io`, ...) are
+    interpreter startup, not the cost of `statement`, and are left out.
+
+    :param statement: Python source to execute, e.g. "import main".
+    :return: (total cumulative import time in ms, {top-level module: cumulative ms}).
+    """
+    startup = _import_report("pass")
+    modules = {name: ms for name, ms in _import_report(statement).items() if name not in startup}
+    return sum(modules.values()), modules
+
+
+def check_import_budget(statement: str = LIGHT_IMPORTS, budget_ms: float = BUDGET_MS) -> List[str]:
+    """
+    Check `statement` against the time budget and the list of forbidden heavy modules.
+
+    :return: List of human-readable violations (empty when within budget).
+    """
+    total_ms, modules = measure_import_time(statement)
+    proc = subprocess.run(
+        [sys.executable, "-c", f"{statement}; import sys; print(','.join(sys.modules))"],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    loaded = set(proc.stdout.strip().split(","))
+
+    violations = [f"'{name}' imported by: {statement}" for name in FORBIDDEN_MODULES if name in loaded]
+    if total_ms > budget_ms:
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]
+        detail = ", ".join(f"{name}={ms:.1f}ms" for name, ms in slowest)
+        violations.append(f"import time {total_ms:.1f}ms exceeds budget {budget_ms:.1f}ms ({detail})")
+    return violations
+
+
+if __name__ == '__main__':
+    problems = check_import_budget()
+    for problem in problems:
+        print(f"[IMPORT BUDGET] {problem}")
+    if not problems:
+        print("[IMPORT BUDGET] OK")
+    sys.exit(1 if problems else 0)
@@ -1,31 +1,188 @@
 """ Global logger. """
+import atexit
+import json
 import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
 
+from config.constant import LOG_CONFIG
 
-def configure_logger(name: str, log_file: str):
+# One (listener, queue handler) per configured logger name; makes configure_logger idempotent.
+# None for a logger that writes directly (configured inside a worker process).
+_listeners: Dict[str, Optional[Tuple[QueueListener, QueueHandler]]] = {}
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """ One JSON object per line; any `extra={...}` fields are carried over. """
+
+    _RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self._RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """ The plain-text line, plus the number of DEBUG records the rate limit dropped before it. """
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{line} [{suppressed} debug records suppressed]" if suppressed else line
+
+
+class ProcessAwareQueueHandler(QueueHandler):
+    """
+    QueueHandler that hands records straight to `handlers` in a forked child process, where
+    the parent's listener thread does not exist and queued records would never be written.
+    """
+
+    def __init__(self, log_queue, handlers):
+        super().__init__(log_queue)
+        self.pid = os.getpid()
+        self.direct = handlers
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if os.getpid() == self.pid:
+            super().emit(record)
+            return
+        for handler in self.direct:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def _in_child_process() -> bool:
+    """ True in a multiprocessing child (e.g. a spawned pool worker); multiprocessing is not imported for this. """
+    multiprocessing = sys.modules.get("multiprocessing")
+    return multiprocessing is not None and multiprocessing.parent_process() is not None
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """
+    Token bucket for DEBUG records, so per-file debug lines of a large scan cannot flood the queue.
+    Records above DEBUG always pass. The next DEBUG record let through carries the number of
+    records dropped before it as `record.suppressed`.
+    """
+
+    def __init__(self, per_second: float):
+        super().__init__()
+        self.per_second = per_second
+        self.tokens = per_second
+        self.last = time.monotonic()
+        self.suppressed = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.per_second, self.tokens + (now - self.last) * self.per_second)
+            self.last = now
+            if self.tokens < 1:
+                self.suppressed += 1
+                return False
+            self.tokens -= 1
+            if self.suppressed:
+                record.suppressed = self.suppressed
+                self.suppressed = 0
+        return True
+
+
+def configure_logger(name: str, log_file: str, structured: Optional[bool] = None,
+                     debug_per_second: Optional[float] = None):
     """
     Configure a named global logger.
     (see also [1])
+
+    Safe to call from every module: only the first call for a given name installs handlers.
+    Records are put on a queue by a QueueHandler and formatted/written by a QueueListener
+    thread, so console and file I/O stay off the scanning and request threads. Pool worker
+    processes write directly instead: forked ones through `ProcessAwareQueueHandler`, spawned
+    ones get the handlers attached (their listener would not be flushed when they exit).
+
     :param name: Name of global logger.
     :param log_file: Path to log file for FileHandler.
+    :param structured: Write JSON lines instead of plain text (default: LOG_CONFIG['structured']).
+    :param debug_per_second: Max DEBUG records per second, 0 for no limit
+                             (default: LOG_CONFIG['debug_per_second']).
     [1]: http://stackoverflow.com/a/7622029
     """
     logger = logging.getLogger(name)  # name is None => returns root logger
 
-    log_formatter = logging.Formatter(fmt='%(asctime)s %(name)s %(levelname)s: %(message)s')
+    with _lock:
+        if name in _listeners:
+            return logger
+
+        if structured is None:
+            structured = LOG_CONFIG['structured']
+        if debug_per_second is None:
+            debug_per_second = LOG_CONFIG['debug_per_second']
+
+        if structured:
+            log_formatter = JsonFormatter()
+        else:
+            log_formatter = TextFormatter(fmt='%(asctime)s %(name)s %(levelname)s: %(message)s')
 
-    # write log messages to console
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(log_formatter)
-    console_handler.setLevel(logging.INFO)
+        # write log messages to console
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(log_formatter)
+        console_handler.setLevel(logging.INFO)
 
-    # write log messages to log file
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(log_formatter)
-    file_handler.setLevel(logging.DEBUG)
+        # write log messages to log file
+        file_handler = logging.FileHandler(log_file, delay=True)
+        file_handler.setFormatter(log_formatter)
+        file_handler.setLevel(logging.DEBUG)
+
+        logger.setLevel(logging.DEBUG)
+        for log_filter in [f for f in logger.filters if isinstance(f, DebugRateLimitFilter)]:
+            logger.removeFilter(log_filter)
+        if debug_per_second:
+            logger.addFilter(DebugRateLimitFilter(debug_per_second))
+
+        if _in_child_process():
+            logger.addHandler(console_handler)
+            logger.addHandler(file_handler)
+            _listeners[name] = None
+            return logger
+
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+        listener.start()
+        queue_handler = ProcessAwareQueueHandler(log_queue, [console_handler, file_handler])
+        _listeners[name] = (listener, queue_handler)
+        logger.addHandler(queue_handler)
+
+    return logger
+
+
+def shutdown_logging() -> None:
+    """
+    Flush and stop every queue listener. Registered with atexit; call it directly
+    before forking or when a run must be sure its log lines have been written.
+    """
+    with _lock:
+        for name in [name for name, entry in _listeners.items() if entry is not None]:
+            listener, queue_handler = _listeners.pop(name)
+            logging.getLogger(name).removeHandler(queue_handler)
+            listener.stop()
 
-    logger.setLevel(logging.DEBUG)
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
 
-    return logger
\ No newline at end of file
+atexit.register(shutdown_logging)
@@ -0,0 +1,180 @@
+""" Lightweight run metrics: stage timers, counters, histograms and an end-of-run report. """
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+# Upper bounds (seconds) for HTTP latency histograms; +Inf is implicit.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_lock = threading.Lock()
+_counters: Dict[LabelKey, float] = {}
+_gauges: Dict[LabelKey, float] = {}
+_histograms: Dict[LabelKey, Dict] = {}
+
+
+def _key(name: str, labels: Dict[str, object]) -> LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def incr(name: str, value: float = 1, **labels) -> None:
+    """ Add `value` to the counter `name{labels}`. """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """ Set the gauge `name{labels}` to its latest value. """
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels) -> None:
+    """ Record one observation in the histogram `name{labels}`. """
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"buckets": buckets, "counts": [0] * (len(buckets) + 1), "sum": 0.0, "count": 0}
+        hist["counts"][bisect_left(hist["buckets"], value)] += 1
+        hist["sum"] += value
+        hist["count"] += 1
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """
+    Time a block of work; accumulates `stage_seconds_total{stage}` and `stage_calls_total{stage}`.
+
+        with stage_timer("csv_write"):
+            df.to_csv(...)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        incr("stage_seconds_total", elapsed, stage=stage)
+        incr("stage_calls_total", stage=stage)
+
+
+def reset() -> None:
+    """ Drop every recorded metric (e.g. between benchmark runs). """
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+
+def _labels_dict(labels: Tuple[Tuple[str, str], ...]) -> Dict[str, str]:
+    return dict(labels)
+
+
+def report() -> Dict[str, List[Dict]]:
+    """
+    Snapshot of all metrics as plain JSON-serialisable data.
+    """
+    with _lock:
+        return {
+            "counters": [{"name": n, "labels": _labels_dict(l), "value": v} for (n, l), v in sorted(_counters.items())],
+            "gauges": [{"name": n, "labels": _labels_dict(l), "value": v} for (n, l), v in sorted(_gauges.items())],
+            "histograms": [
+                {"name": n, "labels": _labels_dict(l), "buckets": list(h["buckets"]),
+                 "counts": list(h["counts"]), "sum": h["sum"], "count": h["count"]}
+                for (n, l), h in sorted(_histograms.items())
+            ],
+        }
+
+
+def _prometheus_labels(labels: Dict[str, str], **extra) -> str:
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    body = ",".join(f'{k}="{str(v)}"' for k, v in labels.items())
+    return "{" + body + "}"
+
+
+def to_prometheus() -> str:
+    """
+    Render all metrics in the Prometheus text exposition format.
+    """
+    snapshot = report()
+    lines = []
+    for kind, entries in (("counter", snapshot["counters"]), ("gauge", snapshot["gauges"])):
+        for name in dict.fromkeys(e["name"] for e in entries):
+            lines.append(f"# TYPE {name} {kind}")
+            for e in entries:
+                if e["name"] == name:
+                    lines.append(f"{name}{_prometheus_labels(e['labels'])} {e['value']}")
+    for name in dict.fromkeys(h["name"] for h in snapshot["histograms"]):
+        lines.append(f"# TYPE {name} histogram")
+        for h in snapshot["histograms"]:
+            if h["name"] != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(list(h["buckets"]) + ["+Inf"], h["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_prometheus_labels(h['labels'], le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{_prometheus_labels(h['labels'])} {h['sum']}")
+            lines.append(f"{name}_count{_prometheus_labels(h['labels'])} {h['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def write_report(path: str) -> str:
+    """
+    Write the end-of-run report; `.json` files get JSON, anything else Prometheus text.
+
+    :param path: Output file path.
+    :return: The path written.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            json.dump(report(), f, indent=2)
+        else:
+            f.write(to_prometheus())
+    return path
+
+
+@contextmanager
+def profile(name: str, engine: str = "cprofile", output_dir: str = "./output/profiles") -> Iterator[None]:
+    """
+    Profile a block with cProfile (`<name>.prof`, open with snakeviz/pstats)
+    or pyinstrument (`<name>.html`, requires `pip install pyinstrument`).
+
+    :param name: Base name of the profile file, e.g. the subcommand.
+    :param engine: "cprofile" or "pyinstrument".
+    :param output_dir: Directory for profile files.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if engine == "pyinstrument":
+        from pyinstrument import Profiler
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(os.path.join(output_dir, f"{name}.html"), "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+    elif engine == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(output_dir, f"{name}.prof"))
+    else:
+        raise ValueError(f"Unknown profiler engine '{engine}' (expected 'cprofile' or 'pyinstrument').")
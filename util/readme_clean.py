@@ -0,0 +1,131 @@
+""" README text cleaning for Excel export and LLM prompts. """
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, List, Optional
+
+# Control characters Excel XML rejects (everything below 0x20 except \t, \n, \r).
+_EXCEL_INVALID = re.compile(r"[\x00-\x08\x0B-\x0C\x0E-\x1F]")
+
+# Each rule is compiled once and only run when a cheap substring test says it can match.
+# Fusing them into alternations was measured slower (it defeats the engine's literal-prefix
+# scan) and changes results where matches overlap, so the rules stay separate and ordered.
+_CLUSTER_DOMAIN = re.compile(r"\bCLUSTER_DOMAIN\b", re.IGNORECASE)
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_EMAIL = re.compile(r"\b[\w\.-]+@[\w\.-]+\.\w+\b")
+_IP = re.compile(r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b")
+_IMAGE = re.compile(r"!\[.*?\]\(.*?\)")
+_LINK = re.compile(r"\[.*?\]\(.*?\)")
+_HTML = re.compile(r"<[^>]+>")
+_JSON_FENCE = re.compile(r"```json.*?```", re.DOTALL | re.IGNORECASE)
+_JSON_ARRAY = re.compile(r"\[\s*\{.*?\}\s*\]", re.DOTALL)
+_JSON_OBJECT = re.compile(r"\{\s*\".*?\".*?\}", re.DOTALL)
+# "critical" skews severity judgements. The notebook's follow-up pattern for a `"critical": {...}`
+# key can never match once the word itself is gone, so it is not kept.
+_CRITICAL = re.compile(r"\bcritical\b[.,;:!?\"]*", re.IGNORECASE)
+# Quotes, markdown/code symbols, brackets and ASCII digits, deleted in one translate call.
+_SYMBOLS = str.maketrans("", "", "\"'*#`~=|\\/[]{}()0123456789")
+# The notebook's `\d` also removes non-ASCII decimal digits (Arabic-Indic, full-width, ...).
+_DIGITS = re.compile(r"\d")
+_DASHES = re.compile(r"--+")
+
+# With max_chars set, only this many times max_chars of input are cleaned.
+INPUT_FACTOR = 4
+# Characters of input below which `clean_readmes` stays in-process: serial cleaning runs at
+# about 8M chars/s, so smaller columns finish before a process pool pays for itself.
+PARALLEL_MIN_CHARS = 32_000_000
+
+
+def clean_excel_string(s: str) -> str:
+    """
+    Remove characters not allowed in Excel XML (invalid control chars).
+    """
+    # Remove control characters except \n, \r, \t
+    return _EXCEL_INVALID.sub("", s)
+
+
+def clean_readme(readme: str, max_chars: Optional[int] = None) -> str:
+    """
+    Clean README text for LLM prompts: drop identifiers (CLUSTER_DOMAIN, URLs, emails, IPs),
+    markdown images/links, HTML, embedded JSON, the word "critical", symbols and digits, and
+    normalise whitespace. Same rules and order as `clean_readme` in the RQ2 judge notebook, with
+    precompiled patterns, substring guards that skip rules which cannot match, a single
+    translate for the symbol class (plus `\\d` for non-ASCII digits) and `str.split` for whitespace.
+
+    :param readme: Raw README text; anything that is not a str yields "".
+    :param max_chars: When set, the input is cut to `INPUT_FACTOR * max_chars` characters before
+                      the regex passes (which bounds the lazy DOTALL JSON patterns), and the
+                      result is truncated to `max_chars` with a trailing "...".
+    :return: Cleaned text.
+    """
+    if not isinstance(readme, str):
+        return ""
+    if max_chars is not None:
+        readme = readme[:INPUT_FACTOR * max_chars]
+    # IGNORECASE also folds some non-ASCII letters onto ASCII ones ("İ" -> i, "ſ" -> s), which a
+    # lower() substring test misses, so the case-insensitive guards only apply to ASCII text.
+    ascii_only = readme.isascii()
+    if not ascii_only or "cluster_domain" in readme.lower():
+        readme = _CLUSTER_DOMAIN.sub("", readme)
+    if "://" in readme or "www." in readme:
+        readme = _URL.sub("", readme)
+    if "@" in readme:
+        readme = _EMAIL.sub("", readme)
+    readme = _IP.sub("", readme)
+    if "](" in readme:
+        readme = _IMAGE.sub("", readme)
+        readme = _LINK.sub("", readme)
+    if "<" in readme:
+        readme = _HTML.sub("", readme)
+    if "```" in readme:
+        readme = _JSON_FENCE.sub("", readme)
+    if "{" in readme:
+        readme = _JSON_ARRAY.sub("", readme)
+        readme = _JSON_OBJECT.sub("", readme)
+    if not ascii_only or "critical" in readme.lower():
+        readme = _CRITICAL.sub("", readme)
+    readme = readme.translate(_SYMBOLS)
+    if not ascii_only:
+        readme = _DIGITS.sub("", readme)
+    if "--" in readme:
+        readme = _DASHES.sub(" ", readme)
+    readme = " ".join(readme.split())
+    if max_chars is not None and len(readme) > max_chars:
+        return readme[:max_chars] + "..."
+    return readme
+
+
+def _clean_chunk(chunk: List[str], max_chars: Optional[int]) -> List[str]:
+    return [clean_readme(readme, max_chars) for readme in chunk]
+
+
+def clean_readmes(values: Iterable, max_chars: Optional[int] = None, workers: int = 1,
+                  chunk_size: int = 64):
+    """
+    Apply `clean_readme` to a column of READMEs, optionally across `workers` processes.
+
+    The pool is only used for columns of at least `PARALLEL_MIN_CHARS` characters on a machine
+    with more than one CPU; anything smaller is cleaned in-process, which is faster.
+
+    :param values: A pandas Series or any iterable of README strings.
+    :param max_chars: Passed to `clean_readme`.
+    :param workers: Maximum worker processes (1 = always in-process).
+    :param chunk_size: READMEs sent to a worker per task.
+    :return: A Series with the same index when given a Series, otherwise a list.
+    """
+    items = list(values)
+    workers = min(workers, os.cpu_count() or 1)
+    if workers > 1 and len(items) > chunk_size and \
+            sum(len(text) for text in items if isinstance(text, str)) >= PARALLEL_MIN_CHARS:
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            cleaned = [text for part in pool.map(partial(_clean_chunk, max_chars=max_chars), chunks) for text in part]
+    else:
+        cleaned = _clean_chunk(items, max_chars)
+
+    if hasattr(values, "index") and hasattr(values, "name"):
+        import pandas as pd
+
+        return pd.Series(cleaned, index=values.index, name=values.name)
+    return cleaned
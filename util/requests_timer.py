@@ -1,8 +1,53 @@
 """ Helper functions for HTTP requests. """
 import random
+import re
 import time
+from urllib.parse import urlparse
+
+import requests
+
+from config.constant import GitHub_CONFIG
+from util import metrics
+
+
+def wait(seconds: float, reason: str) -> None:
+    """ Sleep and account the time as `wait_seconds_total{reason}`. """
+    time.sleep(seconds)
+    metrics.incr("wait_seconds_total", seconds, reason=reason)
 
 
 def delay_next_request() -> None:
     # reduce request frequency to prevent getting blocked
-    time.sleep(random.choice(list(range(60, 65))))
\ No newline at end of file
+    low, high = GitHub_CONFIG['request_delay']
+    wait(random.choice(list(range(low, high))) if high > low else low, "rate_limit")
+
+
+def endpoint_name(url: str) -> str:
+    """
+    Collapse a GitHub API URL into a low-cardinality endpoint label,
+    e.g. 'https://api.github.com/repos/a/b/contributors' -> '/repos/{repo}/contributors'.
+    """
+    path = urlparse(url).path
+    return re.sub(r"^/repos/[^/]+/[^/]+", "/repos/{repo}", path) or "/"
+
+
+def github_get(url: str, **kwargs) -> requests.Response:
+    """
+    `requests.get` that records latency and status code per endpoint,
+    plus the remaining rate-limit quota reported by GitHub.
+    """
+    endpoint = endpoint_name(url)
+    start = time.perf_counter()
+    try:
+        response = requests.get(url, **kwargs)
+    except requests.RequestException:
+        metrics.incr("http_requests_total", endpoint=endpoint, status="error")
+        raise
+    finally:
+        metrics.observe("http_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+
+    metrics.incr("http_requests_total", endpoint=endpoint, status=response.status_code)
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    if remaining is not None and remaining.isdigit():
+        metrics.set_gauge("rate_limit_remaining", int(remaining), resource=response.headers.get("X-RateLimit-Resource", "core"))
+    return response